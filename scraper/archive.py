@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+Compressed archive of every fetched page, with random access.
+
+scraper.fetch() appends the HTML of each page it fetches to the archive,
+so a parser fix can be applied by reprocessing the stored pages instead
+of re-crawling the site.
+
+Layout (data/archive/):
+  segment-00001.lar ...  append-only segments of at most SEGMENT_BYTES.
+                         Every record is a 12-byte header (magic "LAR1",
+                         codec, dictionary id, compressed length) and one
+                         independently compressed frame of
+                         "URL: ...\\nDate: ...\\n\\n" + HTML, so any record
+                         decompresses on its own
+  dict-<id>.<codec>      compression dictionaries trained on archived pages
+  dict.lock              held while a dictionary is trained
+  index.sqlite           url, product_id -> segment, offset, length (every
+                         version; the newest wins)
+
+Compression is zstd with a trained dictionary when `zstandard` is
+installed, otherwise zlib with a preset dictionary built from the markup
+lines most pages share. The first TRAIN_AFTER pages are compressed
+without a dictionary; after that a dictionary is trained from them and
+used for every new page (`archive train` retrains). Each record names
+its codec and dictionary, so old records stay readable.
+
+    python scraper/cli.py archive stats
+    python scraper/cli.py archive get 12345            # product id or URL
+    python scraper/cli.py archive reprocess [--category corals] [--workers 4]
+
+Reprocessing reads the newest page of every product in segment order,
+parses the pages in a process pool and replaces changed records. Unchanged
+descriptions keep their translation and local images their path; changed
+texts are left for `translate`. SCRAPER_ARCHIVE=0 turns archiving off.
+"""
+
+import os
+import sqlite3
+import struct
+import threading
+import time
+import zlib
+from collections import Counter
+
+import frontier
+
+try:
+    import fcntl
+except ImportError:  # Windows: single writer process only
+    fcntl = None
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+ARCHIVE_DIR = os.path.join(DATA_DIR, "archive")
+ENABLED = os.environ.get("SCRAPER_ARCHIVE", "1") != "0"
+
+SEGMENT_BYTES = 64 * 1024 * 1024
+TRAIN_AFTER = 200
+ZSTD_DICT_BYTES = 112 * 1024
+ZLIB_DICT_BYTES = 32 * 1024  # zlib window: a longer preset dictionary is not used
+ZSTD_LEVEL = 9
+
+MAGIC = b"LAR1"
+HEADER = struct.Struct("<4sBxHI")
+CODEC_ZLIB = 1
+CODEC_ZSTD = 2
+CODEC_NAMES = {CODEC_ZLIB: "zlib", CODEC_ZSTD: "zstd"}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pages (
+    id         INTEGER PRIMARY KEY,
+    url        TEXT NOT NULL,
+    product_id TEXT,
+    segment    INTEGER NOT NULL,
+    offset     INTEGER NOT NULL,
+    length     INTEGER NOT NULL,
+    raw_bytes  INTEGER NOT NULL,
+    codec      INTEGER NOT NULL,
+    dict_id    INTEGER NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS pages_url ON pages (url);
+CREATE INDEX IF NOT EXISTS pages_product ON pages (product_id);
+"""
+
+
+def _zstd():
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+# ---------------------------------------------------------------------------
+# Codecs and dictionaries
+# ---------------------------------------------------------------------------
+
+def train_zlib_dict(samples, size=ZLIB_DICT_BYTES):
+    """Preset dictionary of the markup lines shared by most samples.
+
+    The most common lines go last: zlib finds matches closest to the data
+    cheapest.
+    """
+    counts = Counter()
+    for sample in samples:
+        counts.update({line.strip() for line in sample.split(b"\n") if len(line.strip()) > 8})
+    shared = [line for line, n in counts.most_common() if n * 2 >= len(samples)]
+    out, total = [], 0
+    for line in shared:
+        if total + len(line) + 1 > size:
+            break
+        out.append(line)
+        total += len(line) + 1
+    return b"\n".join(reversed(out))
+
+
+class _Codec:
+    """Compress/decompress with one codec and (optional) dictionary."""
+
+    def __init__(self, codec, dict_data=b""):
+        self.codec = codec
+        self.dict_data = dict_data
+        self._local = threading.local()
+        if codec == CODEC_ZSTD:
+            zstandard = _zstd()
+            if zstandard is None:
+                raise RuntimeError("archive records use zstd: `pip install zstandard`")
+            self._zdict = zstandard.ZstdCompressionDict(dict_data) if dict_data else None
+
+    def _zstd_pair(self):
+        # zstandard (de)compressors are not thread-safe: one pair per thread
+        pair = getattr(self._local, "pair", None)
+        if pair is None:
+            zstandard = _zstd()
+            pair = (zstandard.ZstdCompressor(level=ZSTD_LEVEL, dict_data=self._zdict),
+                    zstandard.ZstdDecompressor(dict_data=self._zdict))
+            self._local.pair = pair
+        return pair
+
+    def compress(self, data):
+        if self.codec == CODEC_ZSTD:
+            return self._zstd_pair()[0].compress(data)
+        c = zlib.compressobj(9, zdict=self.dict_data) if self.dict_data else zlib.compressobj(9)
+        return c.compress(data) + c.flush()
+
+    def decompress(self, data):
+        if self.codec == CODEC_ZSTD:
+            return self._zstd_pair()[1].decompress(data)
+        d = zlib.decompressobj(zdict=self.dict_data) if self.dict_data else zlib.decompressobj()
+        return d.decompress(data) + d.flush()
+
+
+def _dict_path(directory, dict_id, codec):
+    return os.path.join(directory, f"dict-{dict_id}.{CODEC_NAMES[codec]}")
+
+
+# ---------------------------------------------------------------------------
+# Archive
+# ---------------------------------------------------------------------------
+
+def _record(url, html, fetched_at):
+    date = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(fetched_at))
+    return f"URL: {url}\nDate: {date}\n\n".encode("utf-8") + html.encode("utf-8")
+
+
+def _split_record(data):
+    head, _, body = data.partition(b"\n\n")
+    fields = dict(line.split(": ", 1) for line in head.decode("utf-8").split("\n"))
+    return fields, body.decode("utf-8")
+
+
+class Archive:
+    """Append-only page archive.
+
+    Thread-safe. Several processes (distributed workers) may append to the
+    same archive on POSIX: each write holds an exclusive lock on its segment.
+    """
+
+    def __init__(self, directory=ARCHIVE_DIR):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "index.sqlite"), timeout=30,
+                                   isolation_level=None, check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+        self._codecs = {(CODEC_ZLIB, 0): _Codec(CODEC_ZLIB)}
+        self._writer = None
+        self._segment = None
+        self.codec = CODEC_ZSTD if _zstd() else CODEC_ZLIB
+        self.dict_id = self._latest_dict(self.codec)
+
+    # -- dictionaries ----------------------------------------------------
+
+    def _dict_ids(self, codec):
+        suffix = "." + CODEC_NAMES[codec]
+        return sorted(int(f[5:-len(suffix)]) for f in os.listdir(self.directory)
+                      if f.startswith("dict-") and f.endswith(suffix))
+
+    def _latest_dict(self, codec):
+        ids = self._dict_ids(codec)
+        return ids[-1] if ids else 0
+
+    def _codec(self, codec, dict_id):
+        key = (codec, dict_id)
+        if key not in self._codecs:
+            data = b""
+            if dict_id:
+                with open(_dict_path(self.directory, dict_id, codec), "rb") as f:
+                    data = f.read()
+            self._codecs[key] = _Codec(codec, data)
+        return self._codecs[key]
+
+    def train(self, samples=TRAIN_AFTER, retrain=True):
+        """Train a new dictionary from the newest archived pages; returns its id.
+
+        Training holds an exclusive lock on dict.lock, and the dictionary id
+        is chosen after taking it, so two processes never write the same
+        dict-<id>. With retrain=False a dictionary another process trained
+        in the meantime is adopted instead of training a second one.
+        """
+        with open(os.path.join(self.directory, "dict.lock"), "a") as lock:
+            if fcntl:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+            try:
+                latest = self._latest_dict(self.codec)
+                if latest and not retrain:
+                    self.dict_id = latest
+                    return latest
+                rows = self._db.execute("SELECT * FROM pages ORDER BY id DESC LIMIT ?", (samples,)).fetchall()
+                if not rows:
+                    return 0
+                pages = [self._read(row) for row in rows]
+                if self.codec == CODEC_ZSTD:
+                    data = _zstd().train_dictionary(ZSTD_DICT_BYTES, pages).as_bytes()
+                else:
+                    data = train_zlib_dict(pages)
+                dict_id = max(self._dict_ids(CODEC_ZLIB) + self._dict_ids(CODEC_ZSTD) + [0]) + 1
+                tmp = _dict_path(self.directory, dict_id, self.codec) + ".tmp"
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, _dict_path(self.directory, dict_id, self.codec))
+            finally:
+                if fcntl:
+                    fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+        self.dict_id = dict_id
+        return dict_id
+
+    # -- writing ---------------------------------------------------------
+
+    def _open_segment(self, size):
+        """Open the newest segment with room for size bytes."""
+        if self._writer is not None and os.fstat(self._writer.fileno()).st_size + size <= SEGMENT_BYTES:
+            return
+        if self._writer is not None:
+            self._writer.close()
+        segment = max([1] + [int(f[8:13]) for f in os.listdir(self.directory)
+                             if f.startswith("segment-") and f.endswith(".lar")])
+        path = self.segment_path(segment)
+        if os.path.exists(path) and os.path.getsize(path) + size > SEGMENT_BYTES:
+            segment += 1
+            path = self.segment_path(segment)
+        self._writer = open(path, "ab")
+        self._segment = segment
+
+    def _append(self, blob):
+        """Write blob at the end of the current segment; returns its offset."""
+        f = self._writer
+        if fcntl:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            f.write(blob)
+            f.flush()
+        finally:
+            if fcntl:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+        return offset
+
+    def segment_path(self, segment):
+        return os.path.join(self.directory, f"segment-{segment:05d}.lar")
+
+    def store(self, url, html, fetched_at=None):
+        """Append a fetched page; returns the compressed size."""
+        fetched_at = fetched_at or time.time()
+        data = _record(url, html, fetched_at)
+        with self._lock:
+            if not self.dict_id and self.count() >= TRAIN_AFTER:
+                self.train(retrain=False)
+            frame = self._codec(self.codec, self.dict_id).compress(data)
+            self._open_segment(HEADER.size + len(frame))
+            offset = self._append(HEADER.pack(MAGIC, self.codec, self.dict_id, len(frame)) + frame)
+            self._db.execute(
+                "INSERT INTO pages (url, product_id, segment, offset, length, raw_bytes, codec,"
+                " dict_id, fetched_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, frontier.product_id_from_url(url), self._segment, offset,
+                 HEADER.size + len(frame), len(data), self.codec, self.dict_id, fetched_at),
+            )
+        return len(frame)
+
+    def close(self):
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+            self._db.close()
+
+    # -- reading ---------------------------------------------------------
+
+    def count(self):
+        return self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+
+    def _decode(self, blob):
+        magic, codec, dict_id, length = HEADER.unpack_from(blob)
+        if magic != MAGIC:
+            raise ValueError("not an archive record")
+        return self._codec(codec, dict_id).decompress(blob[HEADER.size:HEADER.size + length])
+
+    def _read(self, row, f=None):
+        if f is None:
+            with open(self.segment_path(row["segment"]), "rb") as seg:
+                seg.seek(row["offset"])
+                return self._decode(seg.read(row["length"]))
+        f.seek(row["offset"])
+        return self._decode(f.read(row["length"]))
+
+    def lookup(self, key):
+        """Newest index row for a URL or product id, or None."""
+        key = str(key)
+        if key.isdigit():
+            where, param = "product_id = ?", key
+        elif key.startswith("http"):
+            where, param = "url = ?", key
+        else:
+            where, param = "url LIKE ?", "%" + key  # site-relative path
+        return self._db.execute(f"SELECT * FROM pages WHERE {where} ORDER BY id DESC LIMIT 1",
+                                (param,)).fetchone()
+
+    def get(self, key):
+        """(headers, html) of the newest archived page for a URL or product id."""
+        row = self.lookup(key)
+        return _split_record(self._read(row)) if row else None
+
+    def latest_products(self):
+        """Index rows of the newest page of every product, in segment order."""
+        return self._db.execute(
+            "SELECT * FROM pages WHERE id IN (SELECT MAX(id) FROM pages"
+            " WHERE product_id IS NOT NULL GROUP BY product_id) ORDER BY segment, offset"
+        ).fetchall()
+
+    def iter_pages(self, rows):
+        """Yield (row, headers, html) for index rows, reading each segment once, in order."""
+        f, segment = None, None
+        try:
+            for row in rows:
+                if row["segment"] != segment:
+                    if f:
+                        f.close()
+                    segment = row["segment"]
+                    f = open(self.segment_path(segment), "rb")
+                headers, html = _split_record(self._read(row, f))
+                yield row, headers, html
+        finally:
+            if f:
+                f.close()
+
+    def stats(self):
+        row = self._db.execute(
+            "SELECT COUNT(*), COUNT(DISTINCT url), COALESCE(SUM(length), 0), COALESCE(SUM(raw_bytes), 0)"
+            " FROM pages").fetchone()
+        return {"pages": row[0], "urls": row[1], "stored_bytes": row[2], "raw_bytes": row[3],
+                "codec": CODEC_NAMES[self.codec], "dict_id": self.dict_id}
+
+
+_archive = None
+_archive_lock = threading.Lock()
+
+
+def get_archive():
+    """The process-wide archive, opened on first use."""
+    global _archive
+    with _archive_lock:
+        if _archive is None:
+            _archive = Archive()
+        return _archive
+
+
+def store(url, html):
+    """Archive a fetched page unless archiving is disabled; never raises."""
+    if not ENABLED:
+        return
+    try:
+        get_archive().store(url, html)
+    except Exception as e:
+        print(f"  [archive] {url}: {e}")
+
+
+# ---------------------------------------------------------------------------
+# Reprocessing
+# ---------------------------------------------------------------------------
+
+def _parse_job(job):
+    import scraper
+    from bs4 import BeautifulSoup
+
+    url, html, slug, subcategory = job
+    return scraper.parse_species_soup(BeautifulSoup(html, "lxml"), url, slug, subcategory)
+
+
+def reprocess(slugs=None, workers=None, archive=None):
+    """Re-parse the newest archived page of every stored product.
+
+    Records whose source fields changed are replaced; translations of
+    unchanged texts, the local image path and image_meta are kept.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    import record_io
+    import scraper
+
+    archive = archive or get_archive()
+    data = scraper.load_category_data(slugs)
+    index = {s["id"]: (slug, i) for slug, records in data.items()
+             for i, s in enumerate(records) if s.get("id")}
+    rows = [row for row in archive.latest_products() if row["product_id"] in index]
+
+    def jobs():
+        for row, headers, html in archive.iter_pages(rows):
+            slug, i = index[row["product_id"]]
+            yield headers["URL"], html, slug, data[slug][i]["subcategory"]
+
+    start = time.perf_counter()
+    workers = workers or os.cpu_count() or 1
+    counts = Counter()
+    dirty = set()
+    with ProcessPoolExecutor(workers) as pool:
+        for row, species in zip(rows, pool.map(_parse_job, jobs(), chunksize=16)):
+            slug, i = index[row["product_id"]]
+            old = data[slug][i]
+            if not species or not species.get("name") or species.get("id") != old["id"]:
+                counts["failed"] += 1
+                continue
+            scraper.carry_over(old, species)
+            if record_io.content_hash(species) == record_io.content_hash(old):
+                counts["unchanged"] += 1
+                continue
+            data[slug][i] = species
+            counts["changed"] += 1
+            dirty.add(slug)
+    elapsed = time.perf_counter() - start
+
+    for slug in dirty:
+        scraper.save_json(data[slug], f"{slug}.json")
+    raw = sum(row["raw_bytes"] for row in rows)
+    print(f"  [REPROCESS] {len(rows)} pages in {elapsed:.1f}s ({len(rows) / max(elapsed, 1e-9):.0f} pages/s, "
+          f"{raw / max(elapsed, 1e-9) / 1e6:.1f} MB/s of HTML): {counts['changed']} changed, "
+          f"{counts['unchanged']} unchanged, {counts['failed']} failed; "
+          f"{len(index) - len(rows)} stored products have no archived page")
+    return counts
+
+
+def main(action="stats", key=None):
+    archive = get_archive()
+    if action == "train":
+        dict_id = archive.train()
+        print(f"[OK] dictionary {dict_id} ({CODEC_NAMES[archive.codec]})" if dict_id
+              else "[SKIP] archive is empty")
+    elif action == "get":
+        found = archive.get(key)
+        if found is None:
+            print(f"[MISS] {key} not archived")
+            return False
+        headers, html = found
+        for name, value in headers.items():
+            print(f"{name}: {value}")
+        print()
+        print(html)
+    else:
+        s = archive.stats()
+        ratio = s["raw_bytes"] / s["stored_bytes"] if s["stored_bytes"] else 0
+        print(f"  Archive: {s['pages']} pages, {s['urls']} URLs, {s['raw_bytes'] / 1e6:.1f} MB HTML "
+              f"-> {s['stored_bytes'] / 1e6:.1f} MB ({ratio:.1f}x, {s['codec']}, dictionary {s['dict_id']})")
+    return True
+
+
+if __name__ == "__main__":
+    main()
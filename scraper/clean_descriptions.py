@@ -4,13 +4,13 @@ Remove "Approximate Purchase Size" and similar purchase/shipping text
 from description and description_tr fields in all JSON files.
 """
 
-import io
-import json
 import os
 import re
 import sys
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
+import record_io
+
+sys.stdout.reconfigure(encoding="utf-8", errors="replace")
 
 BASE_DIR = os.path.dirname(__file__)
 DATA_DIR = os.path.join(BASE_DIR, "data")
@@ -48,8 +48,7 @@ def process_file(filename):
         print(f"[SKIP] {filename}")
         return
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = record_io.load_species(filepath)
 
     cleaned_count = 0
     for species in data:
@@ -70,8 +69,7 @@ def process_file(filename):
         if changed:
             cleaned_count += 1
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    record_io.dump_species(data, filepath)
 
     print(f"[OK] {filename}: {cleaned_count}/{len(data)} descriptions cleaned")
 
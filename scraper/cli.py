@@ -0,0 +1,444 @@
+#!/usr/bin/env python3
+"""
+Unified command line for the scraper tools.
+
+    python scraper/cli.py crawl [--category marine-fish ...] [--workers 4 --budget 0.5]
+                                [--discovery listings|sitemap] [--translate-workers 4]
+    python scraper/cli.py translate|clean|convert|images|sync|meta|frontier|export|dedup|tm|water-report
+    python scraper/cli.py dist plan|worker|merge|status [--queue URL] [--shards DIR] [--replan]
+    python scraper/cli.py refresh [--category marine-fish ...] [--prune]
+    python scraper/cli.py recrawl [--budget 500] [--category ...] [--report]
+    python scraper/cli.py images [--revalidate --workers 8] [--category ...]
+    python scraper/cli.py lqip [--category ...] [--workers 4] [--force]
+    python scraper/cli.py similar [--k 6] [--full]
+    python scraper/cli.py archive stats|train|get KEY|reprocess [--category ...] [--workers 4]
+    python scraper/cli.py translate [--backend google|stand-in|local-model] [--workers 4 --rate 2]
+    python scraper/cli.py translate --status
+    python scraper/cli.py sync [--watch --debounce 1.0]
+    python scraper/cli.py bench-transport [--url URL] [-n 50]
+    python scraper/cli.py bench-translate [--backend stand-in] [-n 200]
+    python scraper/cli.py bench-json
+    python scraper/cli.py synth generate --scale 10 [--pages] [--images] [--out DIR]
+    python scraper/cli.py synth bench [--scales 1 10 100] [--out DIR]
+    python scraper/cli.py importtime [subcommand ...]
+
+Each subcommand imports its module (and that module's heavy dependencies such
+as requests, bs4, lxml and tqdm) only when it runs, so offline maintenance
+tasks like `meta` start without loading the HTTP/HTML stack.
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+if BASE_DIR not in sys.path:
+    sys.path.insert(0, BASE_DIR)
+
+# Module each subcommand imports; used by `importtime` to measure startup cost
+SUBCOMMAND_MODULES = {
+    "crawl": "scraper",
+    "translate": "translate_queue",
+    "refresh": "scraper",
+    "recrawl": "recrawl",
+    "meta": "scraper",
+    "clean": "clean_descriptions",
+    "convert": "convert_units",
+    "images": "download_images",
+    "lqip": "lqip",
+    "similar": "similar",
+    "archive": "archive",
+    "sync": "sync_to_site",
+    "frontier": "frontier",
+    "sitemap": "sitemap",
+    "dist": "distributed",
+    "bench-transport": "transport",
+    "bench-translate": "translators",
+    "bench-json": "record_io",
+    "synth": "synthetic",
+    "export": "columnar",
+    "dedup": "dedup",
+    "tm": "translation_memory",
+    "water-report": "water_params",
+}
+
+HEAVY_MODULES = ["requests", "bs4", "lxml", "tqdm"]
+
+# Names of translators.BACKENDS, listed here so building the parser does not
+# import the backends
+TRANSLATORS = ["google", "stand-in", "local-model"]
+
+
+# ---------------------------------------------------------------------------
+# Subcommands
+# ---------------------------------------------------------------------------
+
+def _select_translator(args):
+    if args.backend:
+        import translators
+        translators.set_backend(args.backend)
+
+
+def cmd_crawl(args):
+    import scraper
+    _select_translator(args)
+    scraper.main(args.category, args.workers, args.budget, args.discovery, args.translate_workers)
+
+
+def cmd_translate(args):
+    import translate_queue
+    if args.status:
+        translate_queue.print_progress()
+        return
+    import scraper
+    _select_translator(args)
+    scraper.load_known_species_names()
+    translate_queue.run(args.category, args.workers, args.rate)
+
+
+def cmd_refresh(args):
+    import scraper
+    import translate_queue
+    scraper.load_known_species_names()
+    stage = translate_queue.Stage().start()
+    try:
+        for category in scraper.CATEGORIES:
+            if args.category and category["slug"] not in args.category:
+                continue
+            scraper.refresh_category(category, args.prune)
+    finally:
+        stage.finish()
+    scraper.create_categories_meta(scraper.load_category_data())
+
+
+def cmd_recrawl(args):
+    import recrawl
+    if args.report:
+        recrawl.main(args.category)
+        return
+    import scraper
+    import translate_queue
+    scraper.load_known_species_names()
+    stage = translate_queue.Stage().start()
+    try:
+        result = recrawl.run(args.category, args.budget)
+    finally:
+        stage.finish()
+    if result["saved"]:
+        scraper.create_categories_meta(scraper.load_category_data())
+
+
+def cmd_meta(args):
+    import scraper
+    scraper.create_categories_meta(scraper.load_category_data())
+
+
+def cmd_clean(args):
+    import clean_descriptions
+    clean_descriptions.main()
+
+
+def cmd_convert(args):
+    import convert_units
+    convert_units.main()
+
+
+def cmd_images(args):
+    import download_images
+    if args.revalidate:
+        download_images.revalidate(args.category, args.workers)
+    else:
+        download_images.main()
+
+
+def cmd_lqip(args):
+    import lqip
+    lqip.main(args.category, args.workers, args.force)
+
+
+def cmd_similar(args):
+    import similar
+    similar.main(args.k, args.full)
+
+
+def cmd_archive(args):
+    import archive
+    if args.action == "reprocess":
+        if archive.reprocess(args.category, args.workers)["changed"]:
+            import scraper
+            scraper.create_categories_meta(scraper.load_category_data())
+    elif not archive.main(args.action, args.key):
+        sys.exit(1)
+
+
+def cmd_sync(args):
+    import sync_to_site
+    if args.watch:
+        sync_to_site.watch(args.debounce)
+    else:
+        sync_to_site.main()
+
+
+def cmd_frontier(args):
+    import frontier
+    frontier.main()
+
+
+def cmd_sitemap(args):
+    import sitemap
+    if args.record:
+        sitemap.record(args.record, args.url or sitemap.SITEMAP_URL)
+    else:
+        sitemap.main(args.url or sitemap.SITEMAP_URL)
+
+
+def cmd_dist(args):
+    import distributed
+    shards = args.shards or distributed.DEFAULT_SHARDS
+    if args.action == "merge":
+        distributed.merge(shards)
+        return
+    queue = distributed.open_queue(args.queue or distributed.DEFAULT_QUEUE)
+    if args.action == "plan":
+        distributed.plan(queue, args.category, args.replan)
+    elif args.action == "worker":
+        distributed.run_worker(queue, shards, args.max_units)
+    else:
+        print(queue.stats())
+
+
+def cmd_tm(args):
+    import translation_memory
+    translation_memory.main()
+
+
+def cmd_water_report(args):
+    import water_params
+    water_params.main()
+
+
+def cmd_dedup(args):
+    import dedup
+    dedup.main(apply=not args.report_only)
+
+
+def cmd_export(args):
+    import columnar
+    columnar.main(args.parquet)
+
+
+def cmd_bench_transport(args):
+    import transport
+    transport.bench(args.url, args.n, args.handshake_ms)
+
+
+def cmd_bench_translate(args):
+    import translators
+    translators.bench(args.backend, args.n, args.latency_ms, args.workers)
+
+
+def cmd_bench_json(args):
+    import record_io
+    record_io.bench(args.repeat)
+
+
+def cmd_synth(args):
+    import synthetic
+    scales = args.scales or ([args.scale] if args.action == "generate" else synthetic.SCALES)
+    synthetic.main(args.action, scales, args.out or synthetic.OUT_DIR, args.seed, args.pages, args.images)
+
+
+def measure_import(module):
+    """Import `module` in a fresh interpreter with -X importtime.
+
+    Returns (module_us, heavy_loaded) where module_us is the cumulative import
+    time of the module itself (interpreter startup excluded) and heavy_loaded
+    lists HEAVY_MODULES that were pulled in.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BASE_DIR, capture_output=True, text=True,
+    )
+    module_us = 0
+    loaded = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue
+        name = parts[2].strip()
+        loaded.add(name)
+        if name == module:
+            module_us = int(parts[1])
+    return module_us, [m for m in HEAVY_MODULES if m in loaded]
+
+
+def cmd_importtime(args):
+    names = args.subcommand or list(SUBCOMMAND_MODULES)
+    unknown = [n for n in names if n not in SUBCOMMAND_MODULES]
+    if unknown:
+        sys.exit(f"Unknown subcommand: {', '.join(unknown)}")
+    print(f"{'subcommand':<16} {'module':<20} {'import ms':>10}  heavy deps")
+    for name in names:
+        module = SUBCOMMAND_MODULES[name]
+        module_us, heavy = measure_import(module)
+        print(f"{name:<16} {module:<20} {module_us / 1000:>10.1f}  {', '.join(heavy) or '-'}")
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="scraper", description="LiveAquaria scraper tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("crawl", help="scrape species pages")
+    p.add_argument("--category", action="append", help="category slug (repeatable)")
+    p.add_argument("--workers", type=int, default=1, help="subcategories scraped in parallel")
+    p.add_argument("--budget", type=float, default=None,
+                   help="combined request rate cap in requests/sec when --workers > 1")
+    p.add_argument("--backend", default=None, help=f"translation backend ({', '.join(TRANSLATORS)})")
+    p.add_argument("--discovery", choices=["listings", "sitemap"], default="listings",
+                   help="find products by walking listings or from the sitemap's lastmod")
+    p.add_argument("--translate-workers", type=int, default=None,
+                   help="background translation threads (default: the backend's workers)")
+    p.set_defaults(func=cmd_crawl)
+
+    p = sub.add_parser("translate", help="fill missing Turkish text fields from the translation queue")
+    p.add_argument("--category", action="append", help="category slug (repeatable)")
+    p.add_argument("--backend", default=None, help=f"translation backend ({', '.join(TRANSLATORS)})")
+    p.add_argument("--workers", type=int, default=None, help="translation threads (default: the backend's)")
+    p.add_argument("--rate", type=float, default=None,
+                   help="translation requests/sec (default: from the backend's delay)")
+    p.add_argument("--status", action="store_true", help="only print the queue counts")
+    p.set_defaults(func=cmd_translate)
+
+    p = sub.add_parser("refresh", help="update names/images and find removed products from listings")
+    p.add_argument("--category", action="append", help="category slug (repeatable)")
+    p.add_argument("--prune", action="store_true", help="drop products no longer listed")
+    p.set_defaults(func=cmd_refresh)
+
+    p = sub.add_parser("recrawl", help="refetch new and likely-changed products under a fetch budget")
+    p.add_argument("--budget", type=int, default=500, help="product pages to fetch (default 500)")
+    p.add_argument("--category", action="append", help="category slug (repeatable)")
+    p.add_argument("--report", action="store_true", help="only print freshness percentiles")
+    p.set_defaults(func=cmd_recrawl)
+
+    p = sub.add_parser("meta", help="rebuild categories.json from data files")
+    p.set_defaults(func=cmd_meta)
+
+    p = sub.add_parser("clean", help="strip purchase-size text from descriptions")
+    p.set_defaults(func=cmd_clean)
+
+    p = sub.add_parser("convert", help="convert units to metric")
+    p.set_defaults(func=cmd_convert)
+
+    p = sub.add_parser("images", help="download species images")
+    p.add_argument("--revalidate", action="store_true",
+                   help="refetch downloaded images that changed (conditional requests)")
+    p.add_argument("--workers", type=int, default=8, help="concurrent requests with --revalidate")
+    p.add_argument("--category", action="append", help="category slug (repeatable)")
+    p.set_defaults(func=cmd_images)
+
+    p = sub.add_parser("lqip", help="blurhash, dominant color and aspect ratio of downloaded images")
+    p.add_argument("--category", action="append", help="category slug (repeatable)")
+    p.add_argument("--workers", type=int, default=None, help="processes (default: CPU count)")
+    p.add_argument("--force", action="store_true", help="recompute images whose hash did not change")
+    p.set_defaults(func=cmd_lqip)
+
+    p = sub.add_parser("similar", help="precompute similar-species neighbours (TF-IDF + attributes)")
+    p.add_argument("--k", type=int, default=6, help="neighbours per species")
+    p.add_argument("--full", action="store_true", help="rebuild the model and every row")
+    p.set_defaults(func=cmd_similar)
+
+    p = sub.add_parser("archive", help="compressed archive of fetched pages; reprocess it")
+    p.add_argument("action", choices=["stats", "train", "get", "reprocess"])
+    p.add_argument("key", nargs="?", help="with get: product id or URL")
+    p.add_argument("--category", action="append", help="with reprocess: category slug (repeatable)")
+    p.add_argument("--workers", type=int, default=None, help="with reprocess: processes (default: CPU count)")
+    p.set_defaults(func=cmd_archive)
+
+    p = sub.add_parser("sync", help="copy data and images to site/public")
+    p.add_argument("--watch", action="store_true",
+                   help="keep running and sync changed files as they are written (inotify)")
+    p.add_argument("--debounce", type=float, default=1.0,
+                   help="seconds without events before a batch is synced")
+    p.set_defaults(func=cmd_sync)
+
+    p = sub.add_parser("frontier", help="show crawl frontier state counts")
+    p.set_defaults(func=cmd_frontier)
+
+    p = sub.add_parser("sitemap", help="sync product lastmods from the sitemap")
+    p.add_argument("--url", default=None, help="sitemap URL (default: site sitemap.xml)")
+    p.add_argument("--record", metavar="DIR", help="save the live sitemap files to DIR")
+    p.set_defaults(func=cmd_sitemap)
+
+    p = sub.add_parser("dist", help="distributed crawl: plan, worker, merge, status")
+    p.add_argument("action", choices=["plan", "worker", "merge", "status"])
+    p.add_argument("--queue", default=None, help="queue URL, sqlite:PATH or dir:PATH")
+    p.add_argument("--shards", default=None, help="result shard directory")
+    p.add_argument("--category", action="append", help="category slug (plan only, repeatable)")
+    p.add_argument("--max-units", type=int, default=None, help="stop a worker after N units")
+    p.add_argument("--replan", action="store_true", help="queue done and failed units again (plan only)")
+    p.set_defaults(func=cmd_dist)
+
+    p = sub.add_parser("tm", help="show translation memory size and most reused sentences")
+    p.set_defaults(func=cmd_tm)
+
+    p = sub.add_parser("water-report", help="water conditions parse coverage of the last crawl")
+    p.set_defaults(func=cmd_water_report)
+
+    p = sub.add_parser("dedup", help="cluster near-duplicate descriptions, share translations")
+    p.add_argument("--report-only", action="store_true", help="do not write shared translations")
+    p.set_defaults(func=cmd_dedup)
+
+    p = sub.add_parser("export", help="write the columnar species corpus (species.col)")
+    p.add_argument("--parquet", action="store_true", help="also write Parquet (needs pyarrow)")
+    p.set_defaults(func=cmd_export)
+
+    p = sub.add_parser("bench-transport", help="per-request overhead: fresh vs pooled connections")
+    p.add_argument("--url", default=None, help="target URL (default: local stand-in server)")
+    p.add_argument("-n", type=int, default=50, help="requests per mode")
+    p.add_argument("--handshake-ms", type=float, default=30,
+                   help="simulated connection setup of the stand-in server")
+    p.set_defaults(func=cmd_bench_transport)
+
+    p = sub.add_parser("bench-translate", help="texts/sec through the full translation stack")
+    p.add_argument("--backend", default="stand-in", choices=TRANSLATORS)
+    p.add_argument("-n", type=int, default=200, help="number of texts")
+    p.add_argument("--latency-ms", type=float, default=40,
+                   help="per-request latency of the stand-in server")
+    p.add_argument("--workers", type=int, default=None, help="override the backend's concurrency")
+    p.set_defaults(func=cmd_bench_translate)
+
+    p = sub.add_parser("bench-json", help="load/dump time of the category files per JSON backend")
+    p.add_argument("--repeat", type=int, default=5)
+    p.set_defaults(func=cmd_bench_json)
+
+    p = sub.add_parser("synth", help="synthetic corpus at N x the real size; pipeline scaling benchmark")
+    p.add_argument("action", choices=["generate", "bench"])
+    p.add_argument("--scale", type=float, default=10, help="with generate: corpus size / real size")
+    p.add_argument("--scales", type=float, nargs="+", help="with bench: scales to run (default: 1 10 100)")
+    p.add_argument("--out", default=None, help="output directory (default: scraper/data/synthetic)")
+    p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--pages", action="store_true", help="with generate: write one HTML page per record")
+    p.add_argument("--images", action="store_true", help="with generate: write one image per record")
+    p.set_defaults(func=cmd_synth)
+
+    p = sub.add_parser("importtime", help="measure subcommand startup with -X importtime")
+    p.add_argument("subcommand", nargs="*", help=", ".join(SUBCOMMAND_MODULES))
+    p.set_defaults(func=cmd_importtime)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
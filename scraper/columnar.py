@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Columnar export of the species corpus.
+
+Writes all category files into one compact binary file (data/species.col)
+with one column per field:
+  - categorical fields (care_level, temperament, diet, family, ...) are
+    dictionary-encoded: a small string table plus a uint16 code per row
+  - water parameters, size and tank volume are typed float32 columns
+    (NaN = missing), parsed from the converted metric strings
+  - free text (name, description, ...) is an offsets + UTF-8 blob column
+
+The reader memory-maps the file; numeric and code columns are zero-copy
+memoryviews, and strings are decoded only for the rows that are touched, so
+filtering the whole corpus never parses JSON. With pyarrow installed,
+`--parquet` additionally writes data/species.parquet.
+
+Layout (little-endian; arrays are written in native order, so export and read
+on little-endian hosts; sections 8-byte aligned):
+  magic "SPCOL1\\0\\0", u32 rows, u32 columns,
+  per column: u16 name length, name, u8 kind, u64 offset, u64 length
+  KIND_DICT:    u32 entries, u32 offsets[entries+1], blob, pad to 2, u16 codes[rows]
+  KIND_STRING:  u32 offsets[rows+1], blob
+  KIND_FLOAT32: f32 values[rows]
+"""
+
+import math
+import mmap
+import os
+import re
+import struct
+from array import array
+
+import record_io
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+FILES = ["marine-fish.json", "corals.json", "marine-invertebrates.json"]
+EXPORT_PATH = os.path.join(DATA_DIR, "species.col")
+
+MAGIC = b"SPCOL1\0\0"
+KIND_DICT = 0
+KIND_STRING = 1
+KIND_FLOAT32 = 2
+
+DICT_COLUMNS = [
+    "category", "subcategory", "family", "care_level", "temperament", "diet",
+    "reef_compatible", "color_form",
+]
+STRING_COLUMNS = [
+    "id", "name", "scientific_name", "url", "image_url",
+    "description", "description_tr", "feeding", "feeding_tr",
+]
+# column -> (record path, range index: 0 = low end, 1 = high end)
+FLOAT_COLUMNS = {
+    "temperature_min_c": (("water_params", "temperature"), 0),
+    "temperature_max_c": (("water_params", "temperature"), 1),
+    "sg_min": (("water_params", "sg"), 0),
+    "sg_max": (("water_params", "sg"), 1),
+    "ph_min": (("water_params", "ph"), 0),
+    "ph_max": (("water_params", "ph"), 1),
+    "dkh_min": (("water_params", "dkh"), 0),
+    "dkh_max": (("water_params", "dkh"), 1),
+    "max_size_cm": (("max_size",), 1),
+    "min_tank_l": (("min_tank_size",), 0),
+}
+
+_NUMBER = re.compile(r"\d+(?:[.,]\d+)?")
+
+
+def parse_range(text):
+    """'22,2-25,6°C' -> (22.2, 25.6); '115 L' -> (115.0, 115.0); '' -> (nan, nan)."""
+    nums = [float(n.replace(",", ".")) for n in _NUMBER.findall(text or "")]
+    if not nums:
+        return math.nan, math.nan
+    return nums[0], nums[-1] if len(nums) > 1 else nums[0]
+
+
+def _field(record, path):
+    value = record
+    for key in path:
+        value = (value or {}).get(key, "")
+    return value or ""
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+def _string_section(values):
+    blobs = [v.encode("utf-8") for v in values]
+    offsets = array("I", [0])
+    total = 0
+    for b in blobs:
+        total += len(b)
+        offsets.append(total)
+    return offsets.tobytes() + b"".join(blobs)
+
+
+def _dict_section(values):
+    table = {}
+    codes = array("H", (table.setdefault(v, len(table)) for v in values))
+    if len(table) > 0xFFFF:
+        raise ValueError("too many distinct values for a dictionary column")
+    head = struct.pack("<I", len(table)) + _string_section(list(table))
+    # Keep the codes array 2-byte aligned after the variable-length blob
+    return _align(head, 2) + codes.tobytes()
+
+
+def _align(buf, size=8):
+    return buf + b"\0" * (-len(buf) % size)
+
+
+def load_corpus_records():
+    records = []
+    for fname in FILES:
+        fpath = os.path.join(DATA_DIR, fname)
+        if os.path.exists(fpath):
+            records.extend(record_io.load_species(fpath))
+    return records
+
+
+def write_columnar(records, path=EXPORT_PATH):
+    """Write records to the columnar file; returns the file size in bytes."""
+    sections = []
+    for name in DICT_COLUMNS:
+        sections.append((name, KIND_DICT, _dict_section([str(r.get(name) or "") for r in records])))
+    for name in STRING_COLUMNS:
+        sections.append((name, KIND_STRING, _string_section([str(r.get(name) or "") for r in records])))
+    for name, (field_path, idx) in FLOAT_COLUMNS.items():
+        values = array("f", (parse_range(_field(r, field_path))[idx] for r in records))
+        sections.append((name, KIND_FLOAT32, values.tobytes()))
+
+    directory_size = sum(2 + len(n.encode()) + 1 + 8 + 8 for n, _, _ in sections)
+    offset = len(_align(b"\0" * (len(MAGIC) + 8 + directory_size)))
+    header = MAGIC + struct.pack("<II", len(records), len(sections))
+    body = b""
+    for name, kind, data in sections:
+        name_b = name.encode()
+        header += struct.pack("<H", len(name_b)) + name_b
+        header += struct.pack("<BQQ", kind, offset + len(body), len(data))
+        body = _align(body + data)
+
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_align(header))
+        f.write(body)
+    os.replace(tmp, path)
+    return os.path.getsize(path)
+
+
+def write_parquet(records, path):
+    """Write the same columns as Parquet (requires pyarrow)."""
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    columns = {}
+    for name in DICT_COLUMNS:
+        columns[name] = pa.array([str(r.get(name) or "") for r in records]).dictionary_encode()
+    for name in STRING_COLUMNS:
+        columns[name] = pa.array([str(r.get(name) or "") for r in records])
+    for name, (field_path, idx) in FLOAT_COLUMNS.items():
+        columns[name] = pa.array([parse_range(_field(r, field_path))[idx] for r in records],
+                                 type=pa.float32())
+    pq.write_table(pa.table(columns), path, compression="zstd")
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+class Corpus:
+    """Memory-mapped reader for species.col.
+
+        corpus = Corpus()
+        rows = corpus.where(care_level="Easy", reef_compatible="Yes")
+        temps = corpus.floats("temperature_max_c")
+        names = [corpus.value("name", i) for i in rows]
+    """
+
+    def __init__(self, path=EXPORT_PATH):
+        self._file = open(path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._view = memoryview(self._mm)
+        if self._mm[:8] != MAGIC:
+            raise ValueError(f"{path} is not a species columnar file")
+        self.rows, ncols = struct.unpack_from("<II", self._mm, 8)
+        self.columns = {}
+        pos = 16
+        for _ in range(ncols):
+            (name_len,) = struct.unpack_from("<H", self._mm, pos)
+            name = self._mm[pos + 2:pos + 2 + name_len].decode()
+            pos += 2 + name_len
+            kind, offset, length = struct.unpack_from("<BQQ", self._mm, pos)
+            pos += 17
+            self.columns[name] = (kind, offset, length)
+        self._dicts = {}
+
+    def close(self):
+        self._view.release()
+        self._mm.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return self.rows
+
+    def _strings(self, offset, count):
+        """(offsets view, blob start) of a string table at offset."""
+        offsets = self._view[offset:offset + 4 * (count + 1)].cast("I")
+        return offsets, offset + 4 * (count + 1)
+
+    def _string_at(self, offsets, blob, i):
+        return bytes(self._view[blob + offsets[i]:blob + offsets[i + 1]]).decode("utf-8")
+
+    def dictionary(self, name):
+        """Distinct values of a dictionary column, indexed by code."""
+        if name not in self._dicts:
+            kind, offset, _ = self.columns[name]
+            if kind != KIND_DICT:
+                raise TypeError(f"{name} is not a dictionary column")
+            (count,) = struct.unpack_from("<I", self._mm, offset)
+            offsets, blob = self._strings(offset + 4, count)
+            values = [self._string_at(offsets, blob, i) for i in range(count)]
+            codes_at = blob + offsets[count]
+            codes_at += codes_at % 2
+            self._dicts[name] = (values, codes_at)
+        return self._dicts[name][0]
+
+    def codes(self, name):
+        """Zero-copy uint16 codes of a dictionary column."""
+        self.dictionary(name)
+        codes_at = self._dicts[name][1]
+        return self._view[codes_at:codes_at + 2 * self.rows].cast("H")
+
+    def floats(self, name):
+        """Zero-copy float32 values of a numeric column (NaN = missing)."""
+        kind, offset, length = self.columns[name]
+        if kind != KIND_FLOAT32:
+            raise TypeError(f"{name} is not a numeric column")
+        return self._view[offset:offset + length].cast("f")
+
+    def value(self, name, i):
+        kind, offset, _ = self.columns[name]
+        if kind == KIND_DICT:
+            return self.dictionary(name)[self.codes(name)[i]]
+        if kind == KIND_FLOAT32:
+            return self.floats(name)[i]
+        offsets, blob = self._strings(offset, self.rows)
+        return self._string_at(offsets, blob, i)
+
+    def row(self, i):
+        return {name: self.value(name, i) for name in self.columns}
+
+    def where(self, **equals):
+        """Row indices whose dictionary columns equal the given values."""
+        rows = range(self.rows)
+        for name, wanted in equals.items():
+            values = self.dictionary(name)
+            if wanted not in values:
+                return []
+            code = values.index(wanted)
+            codes = self.codes(name)
+            rows = [i for i in rows if codes[i] == code]
+        return list(rows)
+
+    def between(self, name, lo=None, hi=None, rows=None):
+        """Row indices whose numeric column lies in [lo, hi] (NaN excluded)."""
+        values = self.floats(name)
+        rows = range(self.rows) if rows is None else rows
+        return [i for i in rows
+                if values[i] == values[i]
+                and (lo is None or values[i] >= lo) and (hi is None or values[i] <= hi)]
+
+
+def main(parquet=False):
+    records = load_corpus_records()
+    size = write_columnar(records)
+    json_size = sum(os.path.getsize(os.path.join(DATA_DIR, f)) for f in FILES
+                    if os.path.exists(os.path.join(DATA_DIR, f)))
+    print(f"[OK] {len(records)} species -> {os.path.basename(EXPORT_PATH)} "
+          f"({size / 1024:.0f} KB, JSON {json_size / 1024:.0f} KB)")
+    if parquet:
+        path = os.path.splitext(EXPORT_PATH)[0] + ".parquet"
+        try:
+            write_parquet(records, path)
+            print(f"[OK] -> {os.path.basename(path)} ({os.path.getsize(path) / 1024:.0f} KB)")
+        except ImportError:
+            print("[SKIP] pyarrow not installed, Parquet export skipped")
+
+
+if __name__ == "__main__":
+    main()
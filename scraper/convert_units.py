@@ -4,16 +4,27 @@ Convert American units to metric in species JSON files.
   inches  -> cm   (1 in = 2.54 cm)
   gallons -> L    (1 gal = 3.785 L)
   °F      -> °C   ((F-32) * 5/9)
+
+Converted records are stamped with units_version. Stamped records are
+skipped without looking at their fields, so re-running the converter only
+touches new or re-scraped species (the scraper converts each species as it
+is parsed, so crawl output is already stamped). Bump UNITS_VERSION when a
+converter changes; the converters are idempotent on already-metric strings,
+so older records are simply re-stamped.
 """
 
-import json
 import re
 import os
 import math
 
+import record_io
+
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 FILES = ["marine-fish.json", "corals.json", "marine-invertebrates.json"]
 
+UNITS_KEY = "units_version"
+UNITS_VERSION = 1
+
 
 # ---------------------------------------------------------------------------
 # Conversion helpers
@@ -179,10 +190,18 @@ def convert_water_params(wp):
 # Process one species record
 # ---------------------------------------------------------------------------
 
+def needs_conversion(s):
+    return s.get(UNITS_KEY) != UNITS_VERSION
+
+
 def convert_species(s):
+    """Convert a record in place; no-op for records already stamped."""
+    if not needs_conversion(s):
+        return s
     s["max_size"] = convert_max_size(s.get("max_size", ""))
     s["min_tank_size"] = convert_tank_size(s.get("min_tank_size", ""))
     s["water_params"] = convert_water_params(s.get("water_params", {}))
+    s[UNITS_KEY] = UNITS_VERSION
     return s
 
 
@@ -197,18 +216,22 @@ def main():
             print(f"[SKIP] {filename} not found")
             continue
 
-        with open(filepath, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = record_io.load_species(filepath)
 
-        converted = [convert_species(s) for s in data]
+        pending = [s for s in data if needs_conversion(s)]
+        if not pending:
+            print(f"[OK] {filename}: {len(data)} species already metric")
+            continue
+        for s in pending:
+            convert_species(s)
 
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(converted, f, ensure_ascii=False, indent=2)
+        record_io.dump_species(data, filepath)
 
-        print(f"[OK] {filename}: {len(converted)} species converted")
+        print(f"[OK] {filename}: {len(pending)} species converted, "
+              f"{len(data) - len(pending)} already metric")
 
         # Print a few samples
-        samples = [s for s in converted if s.get("max_size") or s.get("min_tank_size")][:3]
+        samples = [s for s in pending if s.get("max_size") or s.get("min_tank_size")][:3]
         for s in samples:
             print(f"  {s['name']}")
             print(f"    max_size:      {s.get('max_size')}")
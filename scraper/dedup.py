@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Near-duplicate clustering of species records.
+
+Color-form variants and re-listed products often carry the same (or almost
+the same) description. Descriptions are normalized, split into word 3-gram
+shingles and MinHashed; LSH banding finds candidate pairs, which are kept
+when their exact shingle Jaccard similarity reaches THRESHOLD. Pairs are
+joined into clusters with a union-find.
+
+Per cluster, the canonical record is the first one (in file order) that has
+a Turkish description. Members with the same normalized text share its
+translations, so only one of them is ever sent to the translator. The
+clusters are written to data/dedup-clusters.json with canonical links.
+"""
+
+import hashlib
+import os
+import re
+import struct
+
+import record_io
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+FILES = ["marine-fish.json", "corals.json", "marine-invertebrates.json"]
+CLUSTERS_PATH = os.path.join(DATA_DIR, "dedup-clusters.json")
+
+SHINGLE_WORDS = 3
+NUM_PERM = 64
+BANDS = 8          # 8 bands x 8 rows -> ~0.77 similarity threshold
+ROWS = NUM_PERM // BANDS
+THRESHOLD = 0.8
+
+# Each shingle is hashed once per salt into 16 32-bit values; NUM_PERM
+# independent hash functions come from NUM_PERM / 16 salted blake2b digests.
+_SALTS = [f"minhash{i}".encode() for i in range(NUM_PERM // 16)]
+_UNPACK = struct.Struct(f"<{NUM_PERM}I").unpack
+
+
+_NON_WORD = re.compile(r"[^\w]+", re.UNICODE)
+
+
+def normalize(text):
+    """Lowercase, drop punctuation and collapse whitespace."""
+    return " ".join(_NON_WORD.sub(" ", (text or "").lower()).split())
+
+
+def shingles(text):
+    """Set of word n-grams of normalized text."""
+    words = normalize(text).split()
+    if len(words) < SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def minhash(shingle_set):
+    """NUM_PERM-value MinHash signature of a shingle set."""
+    rows = []
+    for gram in shingle_set:
+        g = gram.encode()
+        rows.append(_UNPACK(b"".join(
+            hashlib.blake2b(g, digest_size=64, salt=salt).digest() for salt in _SALTS
+        )))
+    return list(map(min, zip(*rows)))
+
+
+def jaccard(a, b):
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def find_clusters(records, field="description", threshold=THRESHOLD):
+    """Return clusters as lists of record indices (size >= 2)."""
+    sets = [shingles(r.get(field, "")) for r in records]
+    buckets = {}
+    for i, sh in enumerate(sets):
+        if not sh:
+            continue
+        sig = minhash(sh)
+        for band in range(BANDS):
+            key = (band, tuple(sig[band * ROWS:(band + 1) * ROWS]))
+            buckets.setdefault(key, []).append(i)
+
+    parent = list(range(len(records)))
+    checked = set()
+    for members in buckets.values():
+        # Every pair of a bucket is a candidate; pairs already joined
+        # (through this or another bucket) are not compared again
+        for n, i in enumerate(members):
+            for j in members[n + 1:]:
+                root_i, root_j = _find(parent, i), _find(parent, j)
+                if root_i == root_j or (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                if jaccard(sets[i], sets[j]) >= threshold:
+                    parent[root_j] = root_i
+
+    groups = {}
+    for i in range(len(records)):
+        if sets[i]:
+            groups.setdefault(_find(parent, i), []).append(i)
+    clusters = [sorted(g) for g in groups.values() if len(g) > 1]
+    clusters.sort(key=lambda g: g[0])
+    return clusters
+
+
+def choose_canonical(records, cluster):
+    """First member with a Turkish description, else the first member."""
+    for i in cluster:
+        if records[i].get("description_tr"):
+            return i
+    return cluster[0]
+
+
+def share_translations(records, clusters, fields=("description", "feeding")):
+    """Copy canonical translations to members with identical normalized text.
+
+    Returns (translations_shared, chars_not_sent), counting both members that
+    were missing a translation and members whose translation would otherwise
+    be requested separately.
+    """
+    shared = 0
+    chars = 0
+    for cluster in clusters:
+        canon = records[choose_canonical(records, cluster)]
+        for i in cluster:
+            member = records[i]
+            if member is canon:
+                continue
+            for field in fields:
+                source = canon.get(field, "")
+                translated = canon.get(f"{field}_tr", "")
+                if not source or not translated:
+                    continue
+                if normalize(member.get(field, "")) != normalize(source):
+                    continue
+                if not member.get(f"{field}_tr"):
+                    member[f"{field}_tr"] = translated
+                shared += 1
+                chars += len(member.get(field, ""))
+    return shared, chars
+
+
+def cluster_report(records, clusters):
+    """Summary dict plus the per-cluster canonical links."""
+    links = []
+    exact_members = 0
+    near_chars = 0
+    for cluster in clusters:
+        ci = choose_canonical(records, cluster)
+        canon = records[ci]
+        canon_shingles = shingles(canon.get("description", ""))
+        members = []
+        for i in cluster:
+            if i == ci:
+                continue
+            same = normalize(records[i].get("description", "")) == normalize(canon.get("description", ""))
+            exact_members += same
+            if not same:
+                near_chars += len(records[i].get("description", ""))
+            members.append({
+                "id": records[i].get("id", ""),
+                "category": records[i].get("category", ""),
+                "identical": same,
+                "similarity": round(jaccard(shingles(records[i].get("description", "")), canon_shingles), 3),
+            })
+        links.append({
+            "canonical_id": canon.get("id", ""),
+            "canonical_category": canon.get("category", ""),
+            "canonical_name": canon.get("name", ""),
+            "members": members,
+        })
+    summary = {
+        "records": len(records),
+        "clusters": len(clusters),
+        "clustered_records": sum(len(c) for c in clusters),
+        "identical_members": exact_members,
+        "near_duplicate_chars": near_chars,
+    }
+    return summary, links
+
+
+def load_records():
+    data = {}
+    for fname in FILES:
+        fpath = os.path.join(DATA_DIR, fname)
+        if os.path.exists(fpath):
+            data[fname] = record_io.load_species(fpath)
+    return data
+
+
+def main(apply=True):
+    print("=" * 50)
+    print("  Near-duplicate clustering of descriptions")
+    print("=" * 50)
+    data = load_records()
+    records = [r for fname in FILES for r in data.get(fname, [])]
+
+    clusters = find_clusters(records)
+    summary, links = cluster_report(records, clusters)
+    missing_before = sum(1 for r in records for f in ("description", "feeding")
+                         if r.get(f) and not r.get(f"{f}_tr"))
+    shared, chars = share_translations(records, clusters)
+    missing_after = sum(1 for r in records for f in ("description", "feeding")
+                        if r.get(f) and not r.get(f"{f}_tr"))
+    summary.update({
+        "translation_calls_saved": shared,
+        "translation_chars_saved": chars,
+        "missing_translations_filled": missing_before - missing_after,
+    })
+
+    record_io.dump({"summary": summary, "clusters": links}, CLUSTERS_PATH, pretty=True)
+
+    if apply and missing_before != missing_after:
+        for fname, species_list in data.items():
+            record_io.dump_species(species_list, os.path.join(DATA_DIR, fname))
+
+    print(f"  Records:              {summary['records']}")
+    print(f"  Clusters:             {summary['clusters']} ({summary['clustered_records']} records)")
+    print(f"  Identical members:    {summary['identical_members']}")
+    print(f"  Translation calls saved: {shared} ({chars / 1024:.0f} KB of text not sent)")
+    print(f"  Missing translations filled: {summary['missing_translations_filled']}")
+    print(f"  Near-duplicate text not shared: {summary['near_duplicate_chars'] / 1024:.0f} KB")
+    print(f"  [SAVED] {os.path.basename(CLUSTERS_PATH)}")
+    return summary
+
+
+if __name__ == "__main__":
+    main()
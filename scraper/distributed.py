@@ -0,0 +1,311 @@
+#!/usr/bin/env python3
+"""
+Distributed crawl: a coordinator splits CATEGORIES into per-subcategory work
+units, workers on any number of hosts claim units from a shared queue and
+write their species to result shards, and a merge step folds the shards into
+the category JSON files (deduplicated by product id).
+
+Queue backends (selected by URL):
+  sqlite:PATH  -> SQLite database file in WAL mode, for workers on one host
+                  (WAL needs shared memory, so not on a network filesystem)
+  dir:PATH     -> plain directory; claims are atomic os.rename() moves, so it
+                  works on any shared filesystem without external services
+
+Units stay in the queue once done, so running plan again only adds new
+subcategories. A later crawl on the same queue uses `plan --replan`, which
+queues done and failed units again.
+
+    python scraper/cli.py dist plan   --queue dir:/mnt/shared/queue [--replan]
+    python scraper/cli.py dist worker --queue dir:/mnt/shared/queue --shards /mnt/shared/shards
+    python scraper/cli.py dist merge  --shards /mnt/shared/shards
+    python scraper/cli.py translate
+
+Workers do not translate: their records reach the shards in English, and
+merge queues the untranslated texts in the coordinator's translation queue
+(translate_queue), which `translate` then drains and applies.
+"""
+
+import os
+import sqlite3
+import time
+
+import frontier
+import record_io
+import scraper
+import shards
+
+DATA_DIR = scraper.DATA_DIR
+DEFAULT_QUEUE = "sqlite:" + os.path.join(DATA_DIR, "queue.sqlite")
+DEFAULT_SHARDS = os.path.join(DATA_DIR, "shards")
+
+STALE_AFTER_SEC = 60 * 60
+
+
+# ---------------------------------------------------------------------------
+# Queue backends
+# ---------------------------------------------------------------------------
+
+class SqliteQueue:
+    """Work-unit queue in a SQLite file."""
+
+    def __init__(self, path):
+        self.conn = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS units ("
+            " id TEXT PRIMARY KEY, payload TEXT NOT NULL, state TEXT NOT NULL,"
+            " worker TEXT, attempts INTEGER NOT NULL DEFAULT 0, error TEXT,"
+            " updated_at REAL NOT NULL)"
+        )
+
+    def put(self, unit, replan=False):
+        payload = record_io.dumps(unit).decode("utf-8")
+        self.conn.execute(
+            "INSERT OR IGNORE INTO units (id, payload, state, updated_at) VALUES (?, ?, ?, ?)",
+            (unit["id"], payload, frontier.PENDING, time.time()),
+        )
+        if replan:
+            self.conn.execute(
+                "UPDATE units SET state = ?, payload = ?, worker = NULL, attempts = 0,"
+                " error = NULL, updated_at = ? WHERE id = ? AND state IN (?, ?)",
+                (frontier.PENDING, payload, time.time(), unit["id"], frontier.DONE, frontier.FAILED),
+            )
+
+    def claim(self, worker):
+        self.conn.execute("BEGIN IMMEDIATE")
+        try:
+            self.conn.execute(
+                "UPDATE units SET state = ? WHERE state = ? AND updated_at < ?",
+                (frontier.PENDING, frontier.IN_FLIGHT, time.time() - STALE_AFTER_SEC),
+            )
+            row = self.conn.execute(
+                "SELECT id, payload FROM units WHERE state = ? ORDER BY id LIMIT 1",
+                (frontier.PENDING,),
+            ).fetchone()
+            if row:
+                self.conn.execute(
+                    "UPDATE units SET state = ?, worker = ?, attempts = attempts + 1,"
+                    " updated_at = ? WHERE id = ?",
+                    (frontier.IN_FLIGHT, worker, time.time(), row[0]),
+                )
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return record_io.loads(row[1]) if row else None
+
+    def ack(self, unit):
+        self.conn.execute(
+            "UPDATE units SET state = ?, error = NULL, updated_at = ? WHERE id = ?",
+            (frontier.DONE, time.time(), unit["id"]),
+        )
+
+    def nack(self, unit, error=""):
+        self.conn.execute(
+            "UPDATE units SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END,"
+            " error = ?, updated_at = ? WHERE id = ?",
+            (frontier.MAX_ATTEMPTS, frontier.FAILED, frontier.PENDING, error,
+             time.time(), unit["id"]),
+        )
+
+    def stats(self):
+        return dict(self.conn.execute("SELECT state, COUNT(*) FROM units GROUP BY state"))
+
+
+class DirQueue:
+    """Work-unit queue as one JSON file per unit, moved between state dirs."""
+
+    STATES = (frontier.PENDING, frontier.IN_FLIGHT, frontier.DONE, frontier.FAILED)
+
+    def __init__(self, path):
+        self.path = path
+        for state in self.STATES:
+            os.makedirs(os.path.join(path, state), exist_ok=True)
+
+    def _file(self, state, uid):
+        return os.path.join(self.path, state, f"{uid}.json")
+
+    def _exists(self, uid):
+        return any(os.path.exists(self._file(s, uid)) for s in self.STATES)
+
+    def put(self, unit, replan=False):
+        if replan:
+            for state in (frontier.DONE, frontier.FAILED):
+                try:
+                    os.remove(self._file(state, unit["id"]))
+                except FileNotFoundError:
+                    pass
+        if self._exists(unit["id"]):
+            return
+        unit = dict(unit, attempts=0)
+        record_io.dump(unit, self._file(frontier.PENDING, unit["id"]))
+
+    def _requeue_stale(self):
+        inflight = os.path.join(self.path, frontier.IN_FLIGHT)
+        cutoff = time.time() - STALE_AFTER_SEC
+        for fname in os.listdir(inflight):
+            src = os.path.join(inflight, fname)
+            try:
+                if os.path.getmtime(src) < cutoff:
+                    os.rename(src, os.path.join(self.path, frontier.PENDING, fname))
+            except FileNotFoundError:
+                pass
+
+    def claim(self, worker):
+        self._requeue_stale()
+        pending = os.path.join(self.path, frontier.PENDING)
+        for fname in sorted(os.listdir(pending)):
+            if not fname.endswith(".json"):
+                continue
+            dst = os.path.join(self.path, frontier.IN_FLIGHT, fname)
+            try:
+                os.rename(os.path.join(pending, fname), dst)
+            except FileNotFoundError:
+                continue  # another worker won the race
+            unit = record_io.load(dst)
+            unit["attempts"] = unit.get("attempts", 0) + 1
+            unit["worker"] = worker
+            with open(dst, "wb") as f:
+                f.write(record_io.dumps(unit))
+            return unit
+        return None
+
+    def _move(self, unit, state):
+        with open(self._file(frontier.IN_FLIGHT, unit["id"]), "wb") as f:
+            f.write(record_io.dumps(unit))
+        os.replace(self._file(frontier.IN_FLIGHT, unit["id"]), self._file(state, unit["id"]))
+
+    def ack(self, unit):
+        self._move(unit, frontier.DONE)
+
+    def nack(self, unit, error=""):
+        unit = dict(unit, error=error)
+        if unit.get("attempts", 0) >= frontier.MAX_ATTEMPTS:
+            self._move(unit, frontier.FAILED)
+        else:
+            self._move(unit, frontier.PENDING)
+
+    def stats(self):
+        return {
+            state: len([f for f in os.listdir(os.path.join(self.path, state)) if f.endswith(".json")])
+            for state in self.STATES
+        }
+
+
+QUEUE_BACKENDS = {
+    "sqlite": SqliteQueue,
+    "dir": DirQueue,
+}
+
+
+def open_queue(url=DEFAULT_QUEUE):
+    """Open a queue from a 'backend:path' URL."""
+    backend, _, path = url.partition(":")
+    if backend not in QUEUE_BACKENDS or not path:
+        raise ValueError(f"Unknown queue URL: {url} (expected one of "
+                         f"{', '.join(b + ':PATH' for b in QUEUE_BACKENDS)})")
+    return QUEUE_BACKENDS[backend](path)
+
+
+# ---------------------------------------------------------------------------
+# Coordinator / worker / merge
+# ---------------------------------------------------------------------------
+
+def plan(queue, slugs=None, replan=False):
+    """Discover subcategories and enqueue one work unit per subcategory.
+
+    Units already in the queue are left as they are; with replan, done and
+    failed ones are queued again for a new crawl.
+    """
+    seq = 0
+    for category in scraper.CATEGORIES:
+        if slugs and category["slug"] not in slugs:
+            continue
+        subcats = scraper.get_subcategories(category)
+        if not subcats:
+            subcats = [{"name": category["name"], "url": category["url"]}]
+        for subcat in subcats:
+            seq += 1
+            queue.put({
+                "id": shards.unit_id(seq, category["slug"], subcat["url"]),
+                "seq": seq,
+                "category": category["slug"],
+                "subcategory": subcat["name"],
+                "url": subcat["url"],
+            }, replan=replan)
+        print(f"  [PLAN] {category['slug']}: {len(subcats)} units")
+        scraper.rate_limit()
+    stats = queue.stats()
+    print(f"  Queue: {stats}")
+    if not replan and stats.get(frontier.DONE):
+        print(f"  {stats[frontier.DONE]} units are already done; `dist plan --replan` queues them again")
+
+
+def scrape_unit(unit, known_ids):
+    """Walk one subcategory listing and parse its products not in known_ids."""
+    species_list = []
+    for url in scraper.get_all_product_urls(unit["url"]):
+        pid = frontier.product_id_from_url(url)
+        if not pid or pid in known_ids:
+            continue
+        species = scraper.parse_species_page(url, unit["category"], unit["subcategory"],
+                                             queue_translation=False)
+        if species and species.get("name") and species.get("id"):
+            species_list.append(species)
+            known_ids.add(species["id"])
+            print(f"    [OK] {species['name']}")
+        else:
+            print(f"    [FAIL] {url}")
+        scraper.rate_limit()
+    return species_list
+
+
+def run_worker(queue, shard_dir=DEFAULT_SHARDS, max_units=None):
+    """Claim and process units until the queue is drained."""
+    scraper.load_known_species_names()
+    known = {slug: {s["id"] for s in data if s.get("id")}
+             for slug, data in scraper.load_category_data().items()}
+    worker = frontier.worker_id()
+    processed = 0
+
+    while max_units is None or processed < max_units:
+        unit = queue.claim(worker)
+        if unit is None:
+            break
+        print(f"\n  [UNIT] {unit['id']} {unit['subcategory']}")
+        try:
+            species_list = scrape_unit(unit, known.setdefault(unit["category"], set()))
+            shards.write_shard(shard_dir, unit, species_list)
+            queue.ack(unit)
+            print(f"    [SHARD] {len(species_list)} species")
+        except KeyboardInterrupt:
+            queue.nack(unit, "interrupted")
+            raise
+        except Exception as e:
+            queue.nack(unit, str(e))
+            print(f"    [ERROR] {e}")
+        processed += 1
+
+    print(f"\n  Worker {worker} processed {processed} units; queue: {queue.stats()}")
+
+
+def merge(shard_dir=DEFAULT_SHARDS):
+    """Fold result shards into the category JSON files, deduplicating by id,
+    and queue the merged records' texts for translation."""
+    import translate_queue
+
+    categories_data = scraper.load_category_data()
+    merged = []
+    for category in scraper.CATEGORIES:
+        slug = category["slug"]
+        species_list = categories_data.setdefault(slug, [])
+        added = shards.merge_shards(species_list, shard_dir, slug)
+        if added:
+            scraper.save_json(species_list, f"{slug}.json")
+            merged.append(slug)
+        print(f"  [MERGE] {slug}: +{added}")
+    scraper.create_categories_meta(categories_data)
+    if merged:
+        queued, shared = translate_queue.enqueue_missing(merged)
+        print(f"  [TRANSLATE] {queued} texts queued, {shared} fields shared; "
+              f"run `translate` to translate them")
@@ -5,20 +5,27 @@ to local relative paths served by the site.
 
 Images saved to: scraper/data/images/{category}/{id}.jpg
 image_url updated to: /images/{category}/{id}.jpg
+
+Each download stores the response's ETag, Last-Modified and Content-Length
+in the manifest with the source URL. `images --revalidate` sends
+conditional requests for every downloaded image concurrently: a 304 (or
+the same bytes) keeps the file, a changed image replaces it through a
+.part file and an atomic rename. Without ETag/Last-Modified, a HEAD with
+the stored Content-Length counts as unchanged.
 """
 
-import io
-import json
 import os
 import sys
+import threading
 import time
 import random
 
-import requests
-from tqdm import tqdm
+import image_probe
+import record_io
+import transport
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
-sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
+sys.stdout.reconfigure(encoding="utf-8", errors="replace")
+sys.stderr.reconfigure(encoding="utf-8", errors="replace")
 
 BASE_DIR = os.path.dirname(__file__)
 DATA_DIR = os.path.join(BASE_DIR, "data")
@@ -35,33 +42,191 @@ HEADERS = {
     "Referer": "https://www.liveaquaria.com/",
 }
 
-SESSION = requests.Session()
-SESSION.headers.update(HEADERS)
+MANIFEST_PATH = os.path.join(IMG_DIR, "manifest.json")
+_manifest_lock = threading.Lock()
+
+UNCHANGED = "unchanged"
+REPLACED = "replaced"
+FAILED = "failed"
+
+
+def get_session():
+    """Return the pooled keep-alive session for image downloads."""
+    return transport.get_session("images", HEADERS, http2=False)
+
+
+def _validators(resp):
+    """ETag, Last-Modified and Content-Length of a response, for revalidation."""
+    validators = {}
+    if resp.headers.get("etag"):
+        validators["etag"] = resp.headers["etag"]
+    if resp.headers.get("last-modified"):
+        validators["last_modified"] = resp.headers["last-modified"]
+    length = resp.headers.get("content-length")
+    if length and length.isdigit():
+        validators["content_length"] = int(length)
+    return validators
+
+
+def _stream_to(resp, part_path):
+    """Write a validated image response to part_path; returns the manifest entry.
+
+    Raises image_probe.InvalidImage for non-image or truncated payloads.
+    """
+    content_type = resp.headers.get("content-type", "")
+    if "image" not in content_type and "jpeg" not in content_type:
+        raise image_probe.InvalidImage(f"content-type {content_type or 'missing'}")
+    # Content-Length is only comparable for un-encoded bodies
+    length = resp.headers.get("content-length")
+    encoded = resp.headers.get("content-encoding", "identity") != "identity"
+    stream = image_probe.ImageStream(
+        int(length) if length and length.isdigit() and not encoded else None
+    )
+    with open(part_path, "wb") as f:
+        for chunk in resp.iter_content(chunk_size=8192):
+            stream.feed(chunk)
+            f.write(chunk)
+    return dict(stream.finish(), **_validators(resp))
 
 
 def download_image(url, dest_path, retries=3):
-    """Download an image URL to dest_path. Returns True on success."""
+    """Download an image URL to dest_path.
+
+    The payload is validated while it streams: non-image payloads (HTML error
+    pages) are rejected on the first chunk, dimensions are probed from the
+    header bytes and the SHA-256 is computed during the write. The file only
+    replaces dest_path once complete. Returns the manifest entry, or None.
+    """
+    session = get_session()
+    part_path = dest_path + ".part"
     for attempt in range(retries):
         try:
-            resp = SESSION.get(url, timeout=20, stream=True)
+            resp = session.get(url, timeout=20, stream=True)
             resp.raise_for_status()
-            content_type = resp.headers.get("content-type", "")
-            if "image" not in content_type and "jpeg" not in content_type:
-                return False
-            with open(dest_path, "wb") as f:
-                for chunk in resp.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            # Verify file is a valid image (at least 1KB)
-            if os.path.getsize(dest_path) < 1000:
-                os.remove(dest_path)
-                return False
-            return True
+            entry = _stream_to(resp, part_path)
+            os.replace(part_path, dest_path)
+            return entry
+        except image_probe.InvalidImage as e:
+            print(f"  [INVALID] {url}: {e}")
+            if os.path.exists(part_path):
+                os.remove(part_path)
+            return None
         except Exception as e:
+            if os.path.exists(part_path):
+                os.remove(part_path)
             if attempt < retries - 1:
                 time.sleep(2)
             else:
-                return False
-    return False
+                return None
+    return None
+
+
+def revalidate_image(url, dest_path, entry):
+    """Conditionally refetch an image downloaded before.
+
+    Returns (status, entry): UNCHANGED (304, matching HEAD length or the same
+    bytes), REPLACED (the new image was renamed over dest_path) or FAILED
+    (dest_path untouched).
+    """
+    session = get_session()
+    part_path = dest_path + ".part"
+    headers = {}
+    if os.path.exists(dest_path):
+        if entry.get("etag"):
+            headers["If-None-Match"] = entry["etag"]
+        if entry.get("last_modified"):
+            headers["If-Modified-Since"] = entry["last_modified"]
+    try:
+        if os.path.exists(dest_path) and not headers and entry.get("content_length"):
+            head = session.head(url, timeout=20, allow_redirects=True)
+            if head.ok and head.headers.get("content-length") == str(entry["content_length"]):
+                return UNCHANGED, entry
+        resp = session.get(url, timeout=20, stream=True, headers=headers)
+        if resp.status_code == 304:
+            resp.close()
+            return UNCHANGED, entry
+        resp.raise_for_status()
+        new = _stream_to(resp, part_path)
+        if new["sha256"] == entry.get("sha256") and os.path.exists(dest_path):
+            # Same image, new validators (e.g. a server without 304 support)
+            os.remove(part_path)
+            return UNCHANGED, dict(entry, **_validators(resp))
+        os.replace(part_path, dest_path)
+        return REPLACED, new
+    except Exception as e:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+        print(f"  [FAIL] {url}: {e}")
+        return FAILED, entry
+
+
+# ---------------------------------------------------------------------------
+# Manifest: validated images keyed by site path
+# ---------------------------------------------------------------------------
+
+def load_manifest():
+    if not os.path.exists(MANIFEST_PATH):
+        return {}
+    return record_io.load(MANIFEST_PATH)
+
+
+def save_manifest(manifest):
+    # Sorted by path and field so the file diffs cleanly between runs
+    record_io.dump({rel: dict(sorted(entry.items())) for rel, entry in sorted(manifest.items())},
+                   MANIFEST_PATH, pretty=True)
+
+
+def record_entry(manifest, relative_url, local_path, entry, source_url=""):
+    stat = os.stat(local_path)
+    entry = dict(entry, mtime=stat.st_mtime, validated_at=time.time())
+    if source_url:
+        entry["source_url"] = source_url
+    manifest[relative_url] = entry
+    return entry
+
+
+def record_source(relative_url, source_url):
+    """Remember the remote URL of a local image downloaded before source URLs
+    were recorded. A known source is left as it is; returns True if stored."""
+    with _manifest_lock:
+        manifest = load_manifest()
+        entry = manifest.setdefault(relative_url, {})
+        if entry.get("source_url"):
+            return False
+        # check_local validates an entry without size/mtime from disk
+        entry["source_url"] = source_url
+        save_manifest(manifest)
+    return True
+
+
+def check_local(manifest, relative_url, local_path):
+    """Return True if local_path holds a valid image.
+
+    Files whose size and mtime match their manifest entry are trusted without
+    reading them; others are validated from disk and recorded.
+    """
+    if not os.path.exists(local_path):
+        return False
+    stat = os.stat(local_path)
+    entry = manifest.get(relative_url)
+    if entry and entry.get("bytes") == stat.st_size and entry.get("mtime") == stat.st_mtime:
+        return True
+    try:
+        fresh = image_probe.validate_file(local_path)
+        if entry and entry.get("sha256") == fresh["sha256"]:
+            # Same bytes as downloaded: the HTTP validators still apply
+            fresh.update({k: entry[k] for k in ("etag", "last_modified", "content_length") if k in entry})
+        record_entry(manifest, relative_url, local_path, fresh, (entry or {}).get("source_url", ""))
+        return True
+    except image_probe.InvalidImage as e:
+        print(f"  [INVALID] {relative_url}: {e}")
+        manifest.pop(relative_url, None)
+        return False
+
+
+def local_path_of(relative_url):
+    """/images/{category}/{file} -> path under IMG_DIR."""
+    return os.path.join(IMG_DIR, *relative_url.split("/")[2:])
 
 
 def get_ext(url):
@@ -73,7 +238,9 @@ def get_ext(url):
     return ".jpg"
 
 
-def process_category(filename, category_slug):
+def process_category(filename, category_slug, manifest):
+    from tqdm import tqdm
+
     filepath = os.path.join(DATA_DIR, filename)
     if not os.path.exists(filepath):
         print(f"[SKIP] {filename} not found")
@@ -83,13 +250,13 @@ def process_category(filename, category_slug):
     cat_img_dir = os.path.join(IMG_DIR, category_slug)
     os.makedirs(cat_img_dir, exist_ok=True)
 
-    with open(filepath, "r", encoding="utf-8") as f:
-        data = json.load(f)
+    data = record_io.load_species(filepath)
 
     total = len(data)
     downloaded = 0
     skipped = 0
     failed = 0
+    invalid = 0
 
     print(f"\n[{category_slug}] {total} species")
 
@@ -101,9 +268,24 @@ def process_category(filename, category_slug):
             failed += 1
             continue
 
-        # Already converted to local path
+        # Already converted to local path: validate once, then trust the manifest;
+        # a missing or corrupt file is fetched again from its manifest source URL
         if image_url.startswith("/images/"):
-            skipped += 1
+            local_path = local_path_of(image_url)
+            source_url = (manifest.get(image_url) or {}).get("source_url", "")
+            if check_local(manifest, image_url, local_path):
+                skipped += 1
+                continue
+            if not source_url:
+                invalid += 1
+                continue
+            entry = download_image(source_url, local_path)
+            if entry:
+                record_entry(manifest, image_url, local_path, entry, source_url)
+                downloaded += 1
+            else:
+                failed += 1
+            time.sleep(random.uniform(0.3, 0.8))
             continue
 
         ext = get_ext(image_url)
@@ -111,15 +293,19 @@ def process_category(filename, category_slug):
         local_path = os.path.join(cat_img_dir, local_filename)
         relative_url = f"/images/{category_slug}/{local_filename}"
 
-        # Skip if already downloaded
-        if os.path.exists(local_path) and os.path.getsize(local_path) > 1000:
+        # Skip if already downloaded from this URL and valid; a different
+        # source URL means the product photo changed
+        stored_source = (manifest.get(relative_url) or {}).get("source_url")
+        if stored_source in (None, "", image_url) and check_local(manifest, relative_url, local_path):
+            manifest[relative_url]["source_url"] = image_url
             species["image_url"] = relative_url
             skipped += 1
             continue
 
         # Download
-        success = download_image(image_url, local_path)
-        if success:
+        entry = download_image(image_url, local_path)
+        if entry:
+            record_entry(manifest, relative_url, local_path, entry, image_url)
             species["image_url"] = relative_url
             downloaded += 1
         else:
@@ -130,13 +316,62 @@ def process_category(filename, category_slug):
         time.sleep(random.uniform(0.3, 0.8))
 
     # Save updated JSON
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    record_io.dump_species(data, filepath)
+
+    save_manifest(manifest)
 
     print(f"  Downloaded: {downloaded}, Skipped (cached): {skipped}, Failed: {failed}")
+    if invalid:
+        print(f"  Missing or invalid local images without a source URL: {invalid}")
     print(f"  [SAVED] {filename} updated")
 
 
+def revalidate(slugs=None, workers=8):
+    """Revalidate downloaded images with conditional requests, `workers` at a time.
+
+    Only images whose manifest entry has a source URL can be checked; a
+    missing local file is downloaded again.
+    """
+    from collections import Counter
+    from concurrent.futures import ThreadPoolExecutor
+
+    from tqdm import tqdm
+
+    manifest = load_manifest()
+    todo = [(rel, entry) for rel, entry in manifest.items()
+            if not slugs or rel.split("/")[2] in slugs]
+    no_source = sum(1 for _, entry in todo if not entry.get("source_url"))
+    todo = [(rel, entry) for rel, entry in todo if entry.get("source_url")]
+
+    def check(item):
+        rel, entry = item
+        return rel, revalidate_image(entry["source_url"], local_path_of(rel), entry)
+
+    print(f"  Revalidating {len(todo)} images with {workers} workers")
+    transport.set_pool_size("images", workers)
+    counts = Counter()
+    start = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(workers) as pool:
+            for rel, (status, entry) in tqdm(pool.map(check, todo), total=len(todo),
+                                             desc="  Revalidating", unit="img"):
+                counts[status] += 1
+                if status != FAILED:
+                    record_entry(manifest, rel, local_path_of(rel), entry, manifest[rel]["source_url"])
+                if status == REPLACED:
+                    tqdm.write(f"    [REPLACED] {rel}")
+    except KeyboardInterrupt:
+        print("\n[INTERRUPT] Saving progress...")
+    finally:
+        save_manifest(manifest)
+    elapsed = time.perf_counter() - start
+    print(f"  Unchanged: {counts[UNCHANGED]}, Replaced: {counts[REPLACED]}, Failed: {counts[FAILED]}"
+          f" in {elapsed:.1f}s")
+    if no_source:
+        print(f"  No source URL in the manifest (not checked): {no_source}")
+    return counts
+
+
 def main():
     print("=" * 60)
     print("  LiveAquaria Image Downloader")
@@ -144,12 +379,14 @@ def main():
     print("=" * 60)
 
     os.makedirs(IMG_DIR, exist_ok=True)
+    manifest = load_manifest()
 
     for filename, slug in FILES:
         try:
-            process_category(filename, slug)
+            process_category(filename, slug, manifest)
         except KeyboardInterrupt:
             print("\n[INTERRUPT] Saving progress...")
+            save_manifest(manifest)
             break
         except Exception as e:
             print(f"[ERROR] {filename}: {e}")
@@ -163,7 +400,8 @@ def main():
     for _, slug in FILES:
         cat_dir = os.path.join(IMG_DIR, slug)
         if os.path.exists(cat_dir):
-            count = len([f for f in os.listdir(cat_dir) if os.path.isfile(os.path.join(cat_dir, f))])
+            count = len([f for f in os.listdir(cat_dir)
+                         if os.path.isfile(os.path.join(cat_dir, f)) and not f.endswith(".part")])
             print(f"  {slug}: {count} images")
             total_imgs += count
     print(f"  Total: {total_imgs} images")
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Facet and aggregate index for the category pages.
+
+For each category, create_categories_meta stores:
+  - facet value counts (care level, temperament, diet, reef compatibility,
+    family, subcategory) and numeric histograms (max size, tank size,
+    temperature) in categories.json, so the filter sidebar needs no pass
+    over the species list
+  - one bitmap per facet value in facet-index.json: bit i is set when the
+    i-th species of the category file has that value. Filtering is then a
+    bitwise AND of a few small base64 strings.
+"""
+
+import base64
+import math
+
+from columnar import parse_range
+
+FACET_FIELDS = ["care_level", "temperament", "diet", "reef_compatible", "family", "subcategory"]
+
+# name -> (field path, range index, bin edges); the last bin is open-ended
+HISTOGRAMS = {
+    "max_size_cm": (("max_size",), 1, [0, 5, 10, 15, 20, 30, 45, 60]),
+    "min_tank_l": (("min_tank_size",), 0, [0, 40, 75, 115, 200, 300, 500]),
+    "temperature_c": (("water_params", "temperature"), None, [20, 22, 23, 24, 25, 26, 27]),
+}
+
+
+def _value(record, path, idx):
+    value = record
+    for key in path:
+        value = (value or {}).get(key, "")
+    lo, hi = parse_range(value or "")
+    if idx is None:  # range midpoint
+        return (lo + hi) / 2
+    return hi if idx else lo
+
+
+def histogram(values, edges):
+    """Count values into [edges[i], edges[i+1]) bins plus a final open bin."""
+    counts = [0] * len(edges)
+    for v in values:
+        if math.isnan(v) or v < edges[0]:
+            continue
+        i = len(edges) - 1
+        while v < edges[i]:
+            i -= 1
+        counts[i] += 1
+    bins = []
+    for i, lo in enumerate(edges):
+        hi = edges[i + 1] if i + 1 < len(edges) else None
+        bins.append({"min": lo, "max": hi, "count": counts[i]})
+    return bins
+
+
+def facet_counts(species_list):
+    """{field: {value: count}} sorted by descending count, then value."""
+    facets = {}
+    for field in FACET_FIELDS:
+        counts = {}
+        for s in species_list:
+            v = (s.get(field) or "").strip()
+            if v:
+                counts[v] = counts.get(v, 0) + 1
+        facets[field] = dict(sorted(counts.items(), key=lambda kv: (-kv[1], kv[0])))
+    return facets
+
+
+def histograms(species_list):
+    result = {}
+    for name, (path, idx, edges) in HISTOGRAMS.items():
+        values = [_value(s, path, idx) for s in species_list]
+        known = [v for v in values if not math.isnan(v)]
+        result[name] = {
+            "min": min(known) if known else None,
+            "max": max(known) if known else None,
+            "bins": histogram(values, edges),
+        }
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Bitmaps
+# ---------------------------------------------------------------------------
+
+def encode_bitmap(positions, size):
+    bits = bytearray((size + 7) // 8)
+    for i in positions:
+        bits[i >> 3] |= 1 << (i & 7)
+    return base64.b64encode(bytes(bits)).decode("ascii")
+
+
+def decode_bitmap(encoded):
+    return int.from_bytes(base64.b64decode(encoded), "little")
+
+
+def bitmap_positions(bits):
+    """Row positions set in an int bitmap."""
+    positions = []
+    i = 0
+    while bits:
+        if bits & 1:
+            positions.append(i)
+        bits >>= 1
+        i += 1
+    return positions
+
+
+def facet_bitmaps(species_list):
+    """{"ids": [...], "facets": {field: {value: base64 bitmap}}} for a category."""
+    size = len(species_list)
+    index = {}
+    for field in FACET_FIELDS:
+        positions = {}
+        for i, s in enumerate(species_list):
+            v = (s.get(field) or "").strip()
+            if v:
+                positions.setdefault(v, []).append(i)
+        index[field] = {v: encode_bitmap(p, size) for v, p in sorted(positions.items())}
+    return {"ids": [s.get("id", "") for s in species_list], "facets": index}
+
+
+def select(category_index, **equals):
+    """Species ids matching all field=value filters, by bitmap intersection."""
+    ids = category_index["ids"]
+    bits = (1 << len(ids)) - 1
+    for field, value in equals.items():
+        encoded = category_index["facets"].get(field, {}).get(value)
+        if encoded is None:
+            return []
+        bits &= decode_bitmap(encoded)
+    return [ids[i] for i in bitmap_positions(bits)]
@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Persistent URL frontier for the scraper, backed by SQLite.
+
+Every discovered product URL is stored with its state:
+  pending   -> discovered, not fetched yet
+  in_flight -> claimed by a worker (worker id + claim timestamp)
+  done      -> parsed and saved
+  failed    -> gave up after MAX_ATTEMPTS
+
+Subcategory listing walks are recorded too, so a crashed or interrupted run
+resumes with the remaining products instead of re-walking every listing.
+The last seen listing tile of every product (name, thumbnail, price) is kept
+in `tiles`, so a refresh can tell changed tiles from unchanged ones, and
+every product page fetch is counted in `history` (fetches, detected content
+changes, first/last fetch time) for the recrawl scheduler.
+Claims run inside BEGIN IMMEDIATE transactions, so several processes can pull
+work from the same database file safely.
+"""
+
+import os
+import socket
+import sqlite3
+import time
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+FRONTIER_PATH = os.path.join(DATA_DIR, "frontier.sqlite")
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+MAX_ATTEMPTS = 3
+# In-flight claims older than this are assumed to belong to a dead worker
+STALE_AFTER_SEC = 15 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS urls (
+    url         TEXT PRIMARY KEY,
+    product_id  TEXT,
+    category    TEXT NOT NULL,
+    subcategory TEXT NOT NULL DEFAULT '',
+    seq         INTEGER NOT NULL,
+    state       TEXT NOT NULL DEFAULT 'pending',
+    attempts    INTEGER NOT NULL DEFAULT 0,
+    worker      TEXT,
+    error       TEXT,
+    created_at  REAL NOT NULL,
+    updated_at  REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS urls_claim ON urls (category, state, seq);
+CREATE TABLE IF NOT EXISTS listings (
+    url       TEXT PRIMARY KEY,
+    category  TEXT NOT NULL,
+    walked_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tiles (
+    product_id  TEXT PRIMARY KEY,
+    category    TEXT NOT NULL,
+    subcategory TEXT NOT NULL DEFAULT '',
+    url         TEXT NOT NULL,
+    name        TEXT NOT NULL DEFAULT '',
+    image_url   TEXT NOT NULL DEFAULT '',
+    price       TEXT NOT NULL DEFAULT '',
+    seen_at     REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tiles_category ON tiles (category);
+CREATE TABLE IF NOT EXISTS history (
+    product_id    TEXT PRIMARY KEY,
+    category      TEXT NOT NULL,
+    subcategory   TEXT NOT NULL DEFAULT '',
+    url           TEXT NOT NULL,
+    content_hash  TEXT NOT NULL,
+    fetches       INTEGER NOT NULL DEFAULT 1,
+    changes       INTEGER NOT NULL DEFAULT 0,
+    first_fetched REAL NOT NULL,
+    last_fetched  REAL NOT NULL,
+    last_changed  REAL
+);
+CREATE INDEX IF NOT EXISTS history_category ON history (category);
+"""
+
+
+def worker_id():
+    """Identify this process as host:pid for claim bookkeeping."""
+    return f"{socket.gethostname()}:{os.getpid()}"
+
+
+def open_frontier(path=None):
+    """Open (and create if needed) the frontier database."""
+    conn = sqlite3.connect(path or FRONTIER_PATH, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def product_id_from_url(url):
+    """Return the numeric id from a /product/<id>/... URL, or None."""
+    parts = url.split("/product/", 1)
+    if len(parts) == 2:
+        pid = parts[1].split("/", 1)[0]
+        if pid.isdigit():
+            return pid
+    return None
+
+
+# ---------------------------------------------------------------------------
+# Listings
+# ---------------------------------------------------------------------------
+
+def listing_walked(conn, url):
+    """True if this subcategory listing was already walked in the current crawl."""
+    row = conn.execute("SELECT 1 FROM listings WHERE url = ?", (url,)).fetchone()
+    return row is not None
+
+
+def mark_listing_walked(conn, url, category):
+    conn.execute(
+        "INSERT OR REPLACE INTO listings (url, category, walked_at) VALUES (?, ?, ?)",
+        (url, category, time.time()),
+    )
+
+
+def finish_crawl(conn, category):
+    """Close a completed crawl of a category.
+
+    Listing walks are forgotten so the next crawl re-discovers new products,
+    and failed URLs get a fresh set of attempts.
+    """
+    conn.execute("DELETE FROM listings WHERE category = ?", (category,))
+    conn.execute(
+        "UPDATE urls SET state = ?, attempts = 0 WHERE category = ? AND state = ?",
+        (PENDING, category, FAILED),
+    )
+
+
+def store_tiles(conn, tiles, category, subcategory=""):
+    """Remember the latest listing tile of each product."""
+    now = time.time()
+    conn.executemany(
+        "INSERT OR REPLACE INTO tiles (product_id, category, subcategory, url, name,"
+        " image_url, price, seen_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [(t["id"], category, subcategory, t["url"], t["name"], t["image_url"], t["price"], now)
+         for t in tiles if t.get("id")],
+    )
+
+
+def tile_snapshot(conn, category):
+    """{product_id: row} of the tiles last seen for a category."""
+    rows = conn.execute("SELECT * FROM tiles WHERE category = ?", (category,)).fetchall()
+    return {row["product_id"]: row for row in rows}
+
+
+# ---------------------------------------------------------------------------
+# Fetch history
+# ---------------------------------------------------------------------------
+
+def record_fetch(conn, product_id, category, subcategory, url, content_hash, fetched_at=None):
+    """Count a product page fetch; returns True if its content changed.
+
+    The first fetch of a product only sets the baseline hash.
+    """
+    now = fetched_at or time.time()
+    row = conn.execute("SELECT content_hash FROM history WHERE product_id = ?",
+                       (product_id,)).fetchone()
+    if row is None:
+        conn.execute(
+            "INSERT INTO history (product_id, category, subcategory, url, content_hash,"
+            " first_fetched, last_fetched) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (product_id, category, subcategory, url, content_hash, now, now),
+        )
+        return False
+    changed = row["content_hash"] != content_hash
+    conn.execute(
+        "UPDATE history SET category = ?, subcategory = ?, url = ?, content_hash = ?,"
+        " fetches = fetches + 1, changes = changes + ?, last_fetched = ?,"
+        " last_changed = CASE WHEN ? THEN ? ELSE last_changed END WHERE product_id = ?",
+        (category, subcategory, url, content_hash, int(changed), now, changed, now, product_id),
+    )
+    return changed
+
+
+def fetch_history(conn, category=None):
+    """{product_id: row} of the fetch history, optionally for one category."""
+    query, params = "SELECT * FROM history", ()
+    if category:
+        query, params = query + " WHERE category = ?", (category,)
+    return {row["product_id"]: row for row in conn.execute(query, params)}
+
+
+# ---------------------------------------------------------------------------
+# URLs
+# ---------------------------------------------------------------------------
+
+def add_urls(conn, urls, category, subcategory="", known_ids=()):
+    """Record discovered URLs; already-known URLs keep their state.
+
+    URLs whose product id is in known_ids are stored as done. Returns the
+    number of newly inserted URLs.
+    """
+    now = time.time()
+    added = 0
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM urls").fetchone()[0]
+        for url in urls:
+            pid = product_id_from_url(url)
+            state = DONE if pid in known_ids else PENDING
+            seq += 1
+            cur = conn.execute(
+                "INSERT OR IGNORE INTO urls (url, product_id, category, subcategory, seq,"
+                " state, created_at, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, pid, category, subcategory, seq, state, now, now),
+            )
+            added += cur.rowcount
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return added
+
+
+def claim_next(conn, category, worker=None, subcategory=None):
+    """Atomically move the oldest pending URL to in_flight and return its row."""
+    worker = worker or worker_id()
+    query = "SELECT * FROM urls WHERE category = ? AND state = ?"
+    params = [category, PENDING]
+    if subcategory is not None:
+        query += " AND subcategory = ?"
+        params.append(subcategory)
+    query += " ORDER BY seq LIMIT 1"
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(query, params).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE urls SET state = ?, worker = ?, attempts = attempts + 1,"
+                " updated_at = ? WHERE url = ?",
+                (IN_FLIGHT, worker, time.time(), row["url"]),
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return row
+
+
+def mark_done(conn, url):
+    conn.execute(
+        "UPDATE urls SET state = ?, error = NULL, updated_at = ? WHERE url = ?",
+        (DONE, time.time(), url),
+    )
+
+
+def mark_failed(conn, url, error=""):
+    """Return a URL to pending, or mark it failed once MAX_ATTEMPTS is reached."""
+    conn.execute(
+        "UPDATE urls SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END,"
+        " error = ?, updated_at = ? WHERE url = ?",
+        (MAX_ATTEMPTS, FAILED, PENDING, error, time.time(), url),
+    )
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def release_worker(conn, worker):
+    """Return all in-flight URLs claimed by worker to pending."""
+    cur = conn.execute(
+        "UPDATE urls SET state = ? WHERE state = ? AND worker = ?",
+        (PENDING, IN_FLIGHT, worker),
+    )
+    return cur.rowcount
+
+
+def reclaim_stale(conn, max_age=STALE_AFTER_SEC):
+    """Return in-flight URLs of dead workers to pending.
+
+    Claims by processes on this host that are no longer running are released
+    immediately; claims from other hosts only once older than max_age.
+    """
+    host = socket.gethostname()
+    released = 0
+    workers = conn.execute(
+        "SELECT DISTINCT worker FROM urls WHERE state = ? AND worker LIKE ?",
+        (IN_FLIGHT, f"{host}:%"),
+    ).fetchall()
+    for (worker,) in workers:
+        pid = worker.rsplit(":", 1)[1]
+        if pid.isdigit() and not _pid_alive(int(pid)):
+            released += release_worker(conn, worker)
+    cur = conn.execute(
+        "UPDATE urls SET state = ? WHERE state = ? AND updated_at < ?",
+        (PENDING, IN_FLIGHT, time.time() - max_age),
+    )
+    return released + cur.rowcount
+
+
+def requeue_missing(conn, category, known_ids):
+    """Reset done URLs whose product is missing from the saved JSON to pending."""
+    rows = conn.execute(
+        "SELECT url, product_id FROM urls WHERE category = ? AND state = ?",
+        (category, DONE),
+    ).fetchall()
+    missing = [(PENDING, url) for url, pid in rows if pid not in known_ids]
+    conn.executemany("UPDATE urls SET state = ?, attempts = 0 WHERE url = ?", missing)
+    return len(missing)
+
+
+def counts(conn, category=None):
+    """Return {state: count}, optionally for one category."""
+    query = "SELECT state, COUNT(*) FROM urls"
+    params = ()
+    if category:
+        query += " WHERE category = ?"
+        params = (category,)
+    query += " GROUP BY state"
+    return dict(conn.execute(query, params).fetchall())
+
+
+def main():
+    conn = open_frontier()
+    print("=" * 50)
+    print(f"  Frontier: {FRONTIER_PATH}")
+    print("=" * 50)
+    rows = conn.execute(
+        "SELECT category, state, COUNT(*) FROM urls GROUP BY category, state ORDER BY category, state"
+    ).fetchall()
+    for category, state, n in rows:
+        print(f"  {category:<22} {state:<10} {n}")
+    if not rows:
+        print("  (empty)")
+
+
+if __name__ == "__main__":
+    main()
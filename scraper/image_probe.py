@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Streaming image validation: magic-byte sniffing, dimension probing from the
+header bytes (no decoding) and hashing while the file is written.
+
+Supported formats: JPEG, PNG, GIF, WebP.
+"""
+
+import hashlib
+import struct
+
+MIN_BYTES = 1000
+# Header bytes kept for dimension probing (JPEG EXIF blocks can be large)
+PROBE_LIMIT = 256 * 1024
+
+
+class InvalidImage(Exception):
+    pass
+
+
+def sniff_format(head):
+    """Return the image format from the first bytes, or None."""
+    if head.startswith(b"\xff\xd8\xff"):
+        return "jpeg"
+    if head.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if head[:6] in (b"GIF87a", b"GIF89a"):
+        return "gif"
+    if head[:4] == b"RIFF" and head[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def _jpeg_dimensions(buf):
+    i = 2
+    n = len(buf)
+    while i + 4 <= n:
+        if buf[i] != 0xFF:
+            return None  # corrupt marker stream
+        marker = buf[i + 1]
+        if marker == 0xFF:  # fill byte
+            i += 1
+            continue
+        if marker in (0xD8, 0x01) or 0xD0 <= marker <= 0xD7:
+            i += 2
+            continue
+        seg_len = struct.unpack(">H", buf[i + 2:i + 4])[0]
+        if 0xC0 <= marker <= 0xCF and marker not in (0xC4, 0xC8, 0xCC):
+            if i + 9 > n:
+                return None
+            height, width = struct.unpack(">HH", buf[i + 5:i + 9])
+            return width, height
+        i += 2 + seg_len
+    return None
+
+
+def probe_dimensions(buf, fmt):
+    """Return (width, height) from header bytes, or None if not yet known."""
+    if fmt == "png" and len(buf) >= 24 and buf[12:16] == b"IHDR":
+        return struct.unpack(">II", buf[16:24])
+    if fmt == "gif" and len(buf) >= 10:
+        return struct.unpack("<HH", buf[6:10])
+    if fmt == "webp" and len(buf) >= 30:
+        chunk = buf[12:16]
+        if chunk == b"VP8 ":
+            w, h = struct.unpack("<HH", buf[26:30])
+            return w & 0x3FFF, h & 0x3FFF
+        if chunk == b"VP8L":
+            b = buf[21:25]
+            w = 1 + (((b[1] & 0x3F) << 8) | b[0])
+            h = 1 + (((b[3] & 0x0F) << 10) | (b[2] << 2) | ((b[1] & 0xC0) >> 6))
+            return w, h
+        if chunk == b"VP8X":
+            w = 1 + int.from_bytes(buf[24:27], "little")
+            h = 1 + int.from_bytes(buf[27:30], "little")
+            return w, h
+    if fmt == "jpeg":
+        return _jpeg_dimensions(buf)
+    return None
+
+
+def has_valid_trailer(tail, fmt):
+    """True if the last bytes look like a complete file of this format."""
+    tail = tail.rstrip(b"\x00")
+    if fmt == "jpeg":
+        return tail.endswith(b"\xff\xd9")
+    if fmt == "png":
+        return tail.endswith(b"IEND\xaeB`\x82")
+    if fmt == "gif":
+        return tail.endswith(b";")
+    return True  # WebP: RIFF size is checked in finish()
+
+
+class ImageStream:
+    """Validate an image while it streams to disk.
+
+    feed() raises InvalidImage on the first chunk if the magic bytes are not
+    an image (HTML error pages, etc.), so the download can stop early.
+    finish() checks size and trailer and returns the manifest entry.
+    """
+
+    def __init__(self, expected_length=None):
+        self.expected_length = expected_length
+        self.format = None
+        self.dimensions = None
+        self.size = 0
+        self._sha = hashlib.sha256()
+        self._head = b""
+        self._tail = b""
+
+    def feed(self, chunk):
+        if not chunk:
+            return
+        self._sha.update(chunk)
+        self.size += len(chunk)
+        self._tail = (self._tail + chunk)[-16:]
+        if self.format is None:
+            self._head += chunk
+            if len(self._head) < 12:
+                return
+            self.format = sniff_format(self._head)
+            if self.format is None:
+                raise InvalidImage(f"not an image (starts with {self._head[:16]!r})")
+        elif self.dimensions is None and len(self._head) < PROBE_LIMIT:
+            self._head += chunk
+        if self.dimensions is None:
+            self.dimensions = probe_dimensions(self._head, self.format)
+
+    def finish(self):
+        if self.format is None:
+            raise InvalidImage("empty or too short")
+        if self.size < MIN_BYTES:
+            raise InvalidImage(f"too small ({self.size} bytes)")
+        if self.expected_length and self.size != self.expected_length:
+            raise InvalidImage(f"truncated ({self.size}/{self.expected_length} bytes)")
+        if self.format == "webp":
+            riff_size = struct.unpack("<I", self._head[4:8])[0] + 8
+            if self.size < riff_size:
+                raise InvalidImage(f"truncated ({self.size}/{riff_size} bytes)")
+        elif not has_valid_trailer(self._tail, self.format):
+            raise InvalidImage("truncated (missing end marker)")
+        if self.dimensions is None:
+            raise InvalidImage("image dimensions not found in header")
+        width, height = self.dimensions
+        return {
+            "format": self.format,
+            "width": width,
+            "height": height,
+            "bytes": self.size,
+            "sha256": self._sha.hexdigest(),
+        }
+
+
+def validate_file(path, chunk_size=65536):
+    """Run a file already on disk through ImageStream; returns the entry."""
+    stream = ImageStream()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            stream.feed(chunk)
+    return stream.finish()
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Low-quality image placeholders for the species records.
+
+For every species with a downloaded image (/images/{category}/{id}.jpg) this
+stage stores image_meta in the record:
+
+    "image_meta": {"blurhash": "LKO2?U%2Tw=w]~RBVZRi};RPxuwH", "color": "#3a6f8c",
+                   "aspect": 1.3333, "hash": "<first 16 hex of the SHA-256>"}
+
+  - blurhash  4x3 components (~28 characters), decoded by the site into a
+              blurred preview while the real image lazy-loads
+  - color     dominant color: the most common 3-bit-per-channel bucket of a
+              32 px thumbnail, averaged, black/white backdrops skipped
+  - aspect    width / height of the full image
+
+Images are decoded (Pillow, JPEG draft mode) in a process pool. The file
+hash is checked first, so images whose content did not change since
+image_meta was computed are not decoded again.
+
+    python scraper/cli.py lqip [--category corals] [--workers 4] [--force]
+"""
+
+import hashlib
+import math
+import os
+import time
+from collections import Counter
+
+import download_images
+import record_io
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+# Images already synced to the site are used when scraper/data/images is absent
+SITE_IMG_DIR = os.path.join(os.path.dirname(__file__), "..", "site", "public", "images")
+
+META_KEY = "image_meta"
+COMPONENTS = (4, 3)
+THUMB = 32
+HASH_CHARS = 16
+
+_B83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+# ---------------------------------------------------------------------------
+# Blurhash encoder (https://github.com/woltapp/blurhash)
+# ---------------------------------------------------------------------------
+
+def _encode83(value, length):
+    return "".join(_B83[(value // 83 ** (length - i - 1)) % 83] for i in range(length))
+
+
+def _to_linear(value):
+    v = value / 255
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def _to_srgb(value):
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def _sign_pow(value, exp):
+    return math.copysign(abs(value) ** exp, value)
+
+
+def blurhash(pixels, width, height, components=COMPONENTS):
+    """Blurhash of row-major (r, g, b) pixels."""
+    nx, ny = components
+    linear = [(_to_linear(r), _to_linear(g), _to_linear(b)) for r, g, b in pixels]
+    cos_x = [[math.cos(math.pi * i * x / width) for x in range(width)] for i in range(nx)]
+    cos_y = [[math.cos(math.pi * j * y / height) for y in range(height)] for j in range(ny)]
+
+    factors = []
+    for j in range(ny):
+        for i in range(nx):
+            scale = (1 if i == 0 and j == 0 else 2) / (width * height)
+            r = g = b = 0.0
+            for y in range(height):
+                row = y * width
+                cy = cos_y[j][y]
+                for x in range(width):
+                    basis = cos_x[i][x] * cy
+                    pr, pg, pb = linear[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    out = _encode83((nx - 1) + (ny - 1) * 9, 1)
+    if ac:
+        quant_max = max(0, min(82, int(max(abs(v) for f in ac for v in f) * 166 - 0.5)))
+        max_value = (quant_max + 1) / 166
+        out += _encode83(quant_max, 1)
+    else:
+        max_value = 1.0
+        out += _encode83(0, 1)
+    out += _encode83((_to_srgb(dc[0]) << 16) + (_to_srgb(dc[1]) << 8) + _to_srgb(dc[2]), 4)
+    for f in ac:
+        q = [max(0, min(18, int(math.floor(_sign_pow(v / max_value, 0.5) * 9 + 9.5)))) for v in f]
+        out += _encode83(q[0] * 19 * 19 + q[1] * 19 + q[2], 2)
+    return out
+
+
+def _backdrop(bucket):
+    # Near-black or near-white: the studio background of most product photos
+    return max(bucket) == 0 or min(bucket) == 7
+
+
+def dominant_color(pixels):
+    """Average of the most common 3-bit-per-channel color bucket, as #rrggbb.
+
+    Black and white backdrop buckets only win when less than an eighth of
+    the pixels are anything else.
+    """
+    buckets = Counter((r >> 5, g >> 5, b >> 5) for r, g, b in pixels)
+    subject = Counter({k: n for k, n in buckets.items() if not _backdrop(k)})
+    top = (subject if sum(subject.values()) * 8 >= len(pixels) else buckets).most_common(1)[0][0]
+    members = [p for p in pixels if (p[0] >> 5, p[1] >> 5, p[2] >> 5) == top]
+    return "#" + "".join(f"{sum(p[c] for p in members) // len(members):02x}" for c in range(3))
+
+
+# ---------------------------------------------------------------------------
+# Stage
+# ---------------------------------------------------------------------------
+
+def _pillow():
+    try:
+        from PIL import Image
+    except ImportError as e:
+        raise RuntimeError("lqip needs Pillow: `pip install Pillow`") from e
+    return Image
+
+
+def analyze(path):
+    """image_meta (without hash) of one image file."""
+    Image = _pillow()
+    with Image.open(path) as img:
+        width, height = img.size
+        # JPEG: let the decoder downscale by up to 8x instead of decoding full size
+        img.draft("RGB", (THUMB * 2, THUMB * 2))
+        thumb = img.convert("RGB")
+        thumb.thumbnail((THUMB, THUMB))
+        raw = thumb.tobytes()
+        w, h = thumb.size
+    pixels = list(zip(raw[0::3], raw[1::3], raw[2::3]))
+    return {
+        "blurhash": blurhash(pixels, w, h),
+        "color": dominant_color(pixels),
+        "aspect": round(width / height, 4),
+    }
+
+
+def _analyze_job(job):
+    key, path, digest = job
+    try:
+        return key, dict(analyze(path), hash=digest), None
+    except Exception as e:
+        return key, None, f"{type(e).__name__}: {e}"
+
+
+def file_hash(path):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    return h.hexdigest()[:HASH_CHARS]
+
+
+def image_path(relative_url):
+    """Local file of an /images/... URL, from scraper/data/images or the site."""
+    for root in (download_images.IMG_DIR, SITE_IMG_DIR):
+        path = os.path.join(root, *relative_url.split("/")[2:])
+        if os.path.exists(path):
+            return path
+    return None
+
+
+def process(slugs=None, workers=None, force=False):
+    """Compute image_meta for changed images of the category files."""
+    from concurrent.futures import ProcessPoolExecutor
+
+    _pillow()
+    start = time.perf_counter()
+    files = {}
+    jobs = []
+    counts = Counter()
+    for filename in record_io.FILES:
+        slug = filename[:-len(".json")]
+        path = os.path.join(DATA_DIR, filename)
+        if (slugs and slug not in slugs) or not os.path.exists(path):
+            continue
+        data = files[slug] = record_io.load_species(path)
+        for i, species in enumerate(data):
+            url = species.get("image_url", "")
+            local = image_path(url) if url.startswith("/images/") else None
+            if local is None:
+                counts["no image"] += 1
+                continue
+            digest = file_hash(local)
+            if not force and species.get(META_KEY, {}).get("hash") == digest:
+                counts["unchanged"] += 1
+                continue
+            jobs.append(((slug, i), local, digest))
+
+    print(f"  {len(jobs)} images to process, {counts['unchanged']} unchanged, "
+          f"{counts['no image']} without a local image")
+    dirty = set()
+    if jobs:
+        workers = workers or os.cpu_count() or 1
+        with ProcessPoolExecutor(workers) as pool:
+            for (slug, i), meta, error in pool.map(_analyze_job, jobs,
+                                                   chunksize=max(1, len(jobs) // (workers * 4))):
+                if meta is None:
+                    counts["failed"] += 1
+                    print(f"    [FAIL] {files[slug][i].get('image_url')}: {error}")
+                    continue
+                files[slug][i][META_KEY] = meta
+                counts["processed"] += 1
+                dirty.add(slug)
+
+    for slug in dirty:
+        record_io.dump_species(files[slug], os.path.join(DATA_DIR, f"{slug}.json"))
+        print(f"  [SAVED] {slug}.json")
+    print(f"  [OK] {counts['processed']} processed, {counts['failed']} failed "
+          f"in {time.perf_counter() - start:.1f}s")
+    return counts
+
+
+def main(slugs=None, workers=None, force=False):
+    print("=" * 50)
+    print("  Image placeholders (blurhash, dominant color, aspect)")
+    print("=" * 50)
+    process(slugs, workers, force)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Species-name placeholders used to protect names from the translator.
+
+_protect_names replaces each known species name with SPNAME<n>X. The
+translator returns them more or less intact: lower/upper case, spaces or
+non-breaking spaces inside ("SPNAME 3 X", "SP NAME3X"), hyphens, or a
+Turkish suffix glued on ("SPNAME0X'in"). MANGLED matches all of these
+in one compiled pattern, and restore() resolves every match through a dict
+lookup in a single pass over the text.
+
+Anything still looking like a placeholder after restoration (unknown index,
+a fragment such as "SPNAME" without its number) is reported by unrestored(),
+so the caller can keep the original text instead of publishing "SPNAME".
+tests/test_placeholders.py checks restoration against randomized, realistic
+mangling.
+"""
+
+import re
+
+# Separators the translator may insert inside a placeholder (no newlines)
+_SEP = r"[ \t\u00a0\u202f_\-]*"
+MANGLED = re.compile(rf"S{_SEP}P{_SEP}N{_SEP}A{_SEP}M{_SEP}E{_SEP}(\d+){_SEP}X", re.IGNORECASE)
+# Leftovers: a mangled placeholder or just the "SPNAME" stem
+RESIDUE = re.compile(rf"S{_SEP}P{_SEP}N{_SEP}A{_SEP}M{_SEP}E", re.IGNORECASE)
+
+
+def placeholder(idx):
+    return f"SPNAME{idx}X"
+
+
+def normalize(text):
+    """Rewrite mangled placeholders to their canonical SPNAME<n>X form."""
+    return MANGLED.sub(lambda m: placeholder(int(m.group(1))), text)
+
+
+def restore(text, placeholder_map):
+    """Replace every (possibly mangled) placeholder with its name, in one pass.
+
+    Placeholders whose index is not in placeholder_map are left as they are
+    (see unrestored()).
+    """
+    if not placeholder_map or not text:
+        return text
+
+    def repl(m):
+        return placeholder_map.get(placeholder(int(m.group(1))), m.group(0))
+
+    return MANGLED.sub(repl, text)
+
+
+def unrestored(text):
+    """Placeholder remnants left in text after restore()."""
+    return [m.group(0) for m in RESIDUE.finditer(text or "")]
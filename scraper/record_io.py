@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+"""
+Shared JSON I/O for species records.
+
+Serialization uses the fastest backend installed: orjson, then msgspec, then
+the stdlib json module (SCRAPER_JSON=json|orjson|msgspec forces one). Pretty
+output matches json.dump(ensure_ascii=False, indent=2) byte for byte and is
+used for the category files people read and diff; compact output is used for
+machine-only files (shards, checkpoints, queue units, the facet index).
+
+load_species() decodes a category file and then checks every record
+against SPECIES_SCHEMA, the shape parse_species_page produces, in a separate
+pass over the decoded list, so a malformed file fails with the file, record
+index and field instead of surfacing later as a KeyError in another tool.
+dump_species() validates before writing, and writes atomically (.tmp + rename).
+
+    python scraper/cli.py bench-json     # load/dump times per backend
+"""
+
+import json
+import os
+import time
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+FILES = ["marine-fish.json", "corals.json", "marine-invertebrates.json"]
+
+# field -> type of every species record, in parse_species_page order
+SPECIES_SCHEMA = {
+    "id": str, "url": str, "name": str, "name_tr": str, "scientific_name": str,
+    "family": str, "category": str, "subcategory": str,
+    "care_level": str, "care_level_tr": str, "temperament": str, "temperament_tr": str,
+    "diet": str, "diet_tr": str, "max_size": str, "min_tank_size": str,
+    "reef_compatible": str, "reef_compatible_tr": str, "color_form": str,
+    "water_params": dict,
+    "description": str, "description_tr": str, "feeding": str, "feeding_tr": str,
+    "image_url": str,
+}
+# Fields added by later pipeline steps
+OPTIONAL_FIELDS = {"units_version": int, "image_meta": dict}
+WATER_PARAM_FIELDS = ("temperature", "sg", "ph", "dkh")
+IMAGE_META_FIELDS = {"blurhash": str, "color": str, "aspect": float, "hash": str}
+
+
+class SchemaError(ValueError):
+    pass
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+
+def _stdlib_backend():
+    def loads(data):
+        return json.loads(data)
+
+    def dumps(obj, pretty):
+        if pretty:
+            return json.dumps(obj, ensure_ascii=False, indent=2).encode("utf-8")
+        return json.dumps(obj, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    return "json", loads, dumps
+
+
+def _orjson_backend():
+    import orjson
+
+    def dumps(obj, pretty):
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+
+    return "orjson", orjson.loads, dumps
+
+
+def _msgspec_backend():
+    import msgspec
+
+    encoder = msgspec.json.Encoder()
+    decoder = msgspec.json.Decoder()
+
+    def dumps(obj, pretty):
+        data = encoder.encode(obj)
+        # msgspec's format() indents with ", " / ": " like json.dumps(indent=2)
+        return msgspec.json.format(data, indent=2) if pretty else data
+
+    return "msgspec", decoder.decode, dumps
+
+
+BACKENDS = {"orjson": _orjson_backend, "msgspec": _msgspec_backend, "json": _stdlib_backend}
+
+
+def _select_backend(preferred=None):
+    names = [preferred] if preferred in BACKENDS else list(BACKENDS)
+    for name in names:
+        try:
+            return BACKENDS[name]()
+        except ImportError:
+            continue
+    return _stdlib_backend()
+
+
+BACKEND, _loads, _dumps = _select_backend(os.environ.get("SCRAPER_JSON") or None)
+
+
+def loads(data):
+    return _loads(data)
+
+
+def dumps(obj, pretty=False):
+    """Serialize to UTF-8 bytes; pretty = 2-space indent like json.dump(indent=2)."""
+    return _dumps(obj, pretty)
+
+
+def load(path):
+    with open(path, "rb") as f:
+        return _loads(f.read())
+
+
+def dump(obj, path, pretty=False):
+    """Write obj to path atomically."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(_dumps(obj, pretty))
+    os.replace(tmp, path)
+
+
+# ---------------------------------------------------------------------------
+# Species records
+# ---------------------------------------------------------------------------
+
+def validate_species(record):
+    """List of schema problems of one record (empty if valid)."""
+    if not isinstance(record, dict):
+        return [f"record is {type(record).__name__}, not an object"]
+    problems = []
+    for field, kind in SPECIES_SCHEMA.items():
+        if field not in record:
+            problems.append(f"missing {field}")
+        elif not isinstance(record[field], kind):
+            problems.append(f"{field} is {type(record[field]).__name__}, not {kind.__name__}")
+    for field, value in record.items():
+        if field in SPECIES_SCHEMA:
+            continue
+        kind = OPTIONAL_FIELDS.get(field)
+        if kind is None:
+            problems.append(f"unknown field {field}")
+        elif not isinstance(value, kind):
+            problems.append(f"{field} is {type(value).__name__}, not {kind.__name__}")
+    params = record.get("water_params")
+    if isinstance(params, dict):
+        for field, value in params.items():
+            if field not in WATER_PARAM_FIELDS:
+                problems.append(f"unknown water_params.{field}")
+            elif not isinstance(value, str):
+                problems.append(f"water_params.{field} is {type(value).__name__}, not str")
+    meta = record.get("image_meta")
+    if isinstance(meta, dict):
+        for field, value in meta.items():
+            kind = IMAGE_META_FIELDS.get(field)
+            if kind is None:
+                problems.append(f"unknown image_meta.{field}")
+            elif not isinstance(value, kind):
+                problems.append(f"image_meta.{field} is {type(value).__name__}, not {kind.__name__}")
+    return problems
+
+
+def check_species(species_list, source="records"):
+    """Raise SchemaError if any record does not match SPECIES_SCHEMA."""
+    if not isinstance(species_list, list):
+        raise SchemaError(f"{source}: expected a list of species, got {type(species_list).__name__}")
+    errors = []
+    for i, record in enumerate(species_list):
+        for problem in validate_species(record):
+            errors.append(f"  [{i}] {record.get('id', '?') if isinstance(record, dict) else '?'}: {problem}")
+    if errors:
+        shown = "\n".join(errors[:10])
+        more = f"\n  ... {len(errors) - 10} more" if len(errors) > 10 else ""
+        raise SchemaError(f"{source}: {len(errors)} schema problems\n{shown}{more}")
+
+
+def load_species(path, validate=True):
+    """Decode a category file and validate its records."""
+    species_list = load(path)
+    if validate:
+        check_species(species_list, os.path.basename(path))
+    return species_list
+
+
+def dump_species(species_list, path, pretty=True, validate=True):
+    if validate:
+        check_species(species_list, os.path.basename(path))
+    dump(species_list, path, pretty)
+
+
+# Fields taken from the product page; the *_tr fields are derived from them
+SOURCE_FIELDS = tuple(f for f in SPECIES_SCHEMA if not f.endswith("_tr"))
+
+
+def content_hash(record):
+    """Digest of a record's source fields, to tell whether a product changed."""
+    import hashlib
+
+    params = record.get("water_params") or {}
+    values = [record.get(f) if f != "water_params" else [params.get(k, "") for k in WATER_PARAM_FIELDS]
+              for f in SOURCE_FIELDS]
+    return hashlib.sha1(dumps(values)).hexdigest()
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _best(fn, repeat):
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times) * 1000
+
+
+def bench(repeat=5):
+    """Load/dump times of the category files for every installed backend."""
+    paths = [os.path.join(DATA_DIR, f) for f in FILES if os.path.exists(os.path.join(DATA_DIR, f))]
+    raws = [open(p, "rb").read() for p in paths]
+    objs = [json.loads(r) for r in raws]
+    size = sum(len(r) for r in raws) / 1024 / 1024
+    print(f"  {len(paths)} category files, {size:.1f} MB, best of {repeat}")
+    print(f"  {'backend':<9} {'load ms':>8} {'validate ms':>12} {'dump ms':>8} {'compact ms':>11} {'compact MB':>11}")
+    for name, factory in BACKENDS.items():
+        try:
+            _, loads_, dumps_ = factory()
+        except ImportError:
+            print(f"  {name:<9} not installed")
+            continue
+        load_ms = _best(lambda: [loads_(r) for r in raws], repeat)
+        check_ms = _best(lambda: [check_species(o) for o in objs], repeat)
+        dump_ms = _best(lambda: [dumps_(o, True) for o in objs], repeat)
+        compact_ms = _best(lambda: [dumps_(o, False) for o in objs], repeat)
+        compact_mb = sum(len(dumps_(o, False)) for o in objs) / 1024 / 1024
+        same = all(dumps_(o, True) == r for o, r in zip(objs, raws))
+        print(f"  {name:<9} {load_ms:>8.1f} {check_ms:>12.1f} {dump_ms:>8.1f} {compact_ms:>11.1f} "
+              f"{compact_mb:>11.1f}{'' if same else '  (pretty output differs from file)'}")
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Change-rate-aware recrawl scheduler.
+
+A crawl skips products already in a category file, so a product page is
+otherwise fetched once and never again. Every product page fetch (crawl,
+refresh, sitemap refetch and this module) is counted in the frontier
+`history` table, together with whether the page's source fields changed
+since the previous fetch (record_io.content_hash).
+
+From that history each product gets an estimated change rate
+
+    rate = (changes + PRIOR_CHANGES) / (observed days + PRIOR_DAYS)
+
+i.e. a Poisson rate with a prior of one change per PRIOR_DAYS, so a product
+fetched only once starts at the prior and the estimate sharpens with every
+fetch. The probability that a product changed since its last fetch is
+1 - exp(-rate * age).
+
+A run spends a fixed budget of product page fetches:
+  1. new products: listed (frontier tiles, pending URLs) but in no category file
+  2. products whose sitemap lastmod moved since their last fetch
+  3. the rest, highest probability of having changed first
+
+Refetched records replace the stored ones; unchanged description/feeding
+texts keep their translation. Products fetched before the history existed
+are seeded with their category file's modification time.
+
+    python scraper/cli.py recrawl --budget 500
+    python scraper/cli.py recrawl --report        # freshness percentiles only
+"""
+
+import math
+import os
+import time
+
+import frontier
+import scraper
+
+DAY = 86400
+PRIOR_CHANGES = 1.0
+PRIOR_DAYS = 30.0
+PERCENTILES = (50, 90, 99)
+
+NEW = "new"
+SITEMAP = "sitemap"
+STALE = "stale"
+
+
+def change_rate(row):
+    """Estimated changes per day of a history row."""
+    observed = max(0.0, row["last_fetched"] - row["first_fetched"]) / DAY
+    return (row["changes"] + PRIOR_CHANGES) / (observed + PRIOR_DAYS)
+
+
+def prob_changed(row, now):
+    """Probability the product changed since its last fetch."""
+    age = max(0.0, now - row["last_fetched"]) / DAY
+    return 1.0 - math.exp(-change_rate(row) * age)
+
+
+def seed(conn, categories_data):
+    """Add history rows for stored products that have none; returns the count."""
+    history = frontier.fetch_history(conn)
+    seeded = 0
+    for slug, records in categories_data.items():
+        fetched_at = os.path.getmtime(os.path.join(scraper.DATA_DIR, f"{slug}.json"))
+        for species in records:
+            if species.get("id") and species["id"] not in history:
+                scraper.record_fetch(conn, species, fetched_at)
+                seeded += 1
+    return seeded
+
+
+def _has_sitemap(conn):
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'sitemap'").fetchone()
+
+
+def plan(conn, slugs, known_ids, budget, now=None):
+    """Choose up to `budget` products to fetch, in fetch order.
+
+    Returns a list of dicts with product_id, category, subcategory, url,
+    reason (NEW, SITEMAP or STALE) and priority.
+    """
+    now = now or time.time()
+    marks = ",".join("?" * len(slugs))
+    queue = {}
+
+    def add(pid, category, subcategory, url, reason, priority):
+        if pid and pid not in queue:
+            queue[pid] = {"product_id": pid, "category": category, "subcategory": subcategory,
+                          "url": url, "reason": reason, "priority": priority}
+
+    rows = conn.execute(
+        f"SELECT product_id, category, subcategory, url FROM tiles WHERE category IN ({marks})"
+        f" UNION ALL SELECT product_id, category, subcategory, url FROM urls"
+        f" WHERE category IN ({marks}) AND state = ?",
+        (*slugs, *slugs, frontier.PENDING),
+    ).fetchall()
+    for row in rows:
+        if row["product_id"] not in known_ids:
+            add(row["product_id"], row["category"], row["subcategory"], row["url"], NEW, 1.0)
+
+    history = {pid: row for pid, row in frontier.fetch_history(conn).items()
+               if row["category"] in slugs and pid in known_ids}
+    if _has_sitemap(conn):
+        import sitemap
+        _, changed = sitemap.pending_products(conn, known_ids)
+        for pid in changed:
+            if pid in history:
+                row = history[pid]
+                add(pid, row["category"], row["subcategory"], row["url"], SITEMAP, 1.0)
+
+    stale = sorted(history.values(), key=lambda row: prob_changed(row, now), reverse=True)
+    for row in stale[:budget]:
+        add(row["product_id"], row["category"], row["subcategory"], row["url"], STALE,
+            prob_changed(row, now))
+    return list(queue.values())[:budget]
+
+
+def _percentile(values, q):
+    """Nearest-rank percentile of sorted values."""
+    return values[min(len(values) - 1, max(0, math.ceil(q / 100 * len(values)) - 1))]
+
+
+def freshness(conn, slugs, now=None):
+    """Freshness of the stored products, per category and overall.
+
+    {scope: {"products", "age_days": {p50, p90, p99, max}, "expected_fresh"}},
+    where expected_fresh is the mean probability a record still matches its page.
+    """
+    now = now or time.time()
+    rows = [row for row in frontier.fetch_history(conn).values() if row["category"] in slugs]
+    scopes = {slug: [r for r in rows if r["category"] == slug] for slug in slugs}
+    scopes["all"] = rows
+    report = {}
+    for scope, scope_rows in scopes.items():
+        if not scope_rows:
+            continue
+        ages = sorted(max(0.0, now - r["last_fetched"]) / DAY for r in scope_rows)
+        age_days = {f"p{q}": round(_percentile(ages, q), 1) for q in PERCENTILES}
+        age_days["max"] = round(ages[-1], 1)
+        report[scope] = {
+            "products": len(scope_rows),
+            "age_days": age_days,
+            "expected_fresh": round(sum(1 - prob_changed(r, now) for r in scope_rows) / len(scope_rows), 4),
+        }
+    return report
+
+
+def print_freshness(report):
+    print(f"  {'':<22} {'products':>8} " + " ".join(f"{k:>6}" for k in ("p50", "p90", "p99", "max"))
+          + "  fresh (est.)")
+    for scope, entry in report.items():
+        ages = " ".join(f"{entry['age_days'][k]:>6}" for k in ("p50", "p90", "p99", "max"))
+        print(f"  {scope:<22} {entry['products']:>8} {ages}  {entry['expected_fresh']:.1%}")
+    print("  (ages in days since the last fetch)")
+
+
+def run(slugs=None, budget=500):
+    """Spend `budget` product page fetches on new, changed and stalest products."""
+    slugs = [c["slug"] for c in scraper.CATEGORIES if not slugs or c["slug"] in slugs]
+    data = scraper.load_category_data(slugs)
+    all_ids = {s["id"] for records in scraper.load_category_data().values() for s in records if s.get("id")}
+    index = {s["id"]: (slug, i) for slug, records in data.items()
+             for i, s in enumerate(records) if s.get("id")}
+
+    conn = frontier.open_frontier()
+    seeded = seed(conn, data)
+    queue = plan(conn, slugs, all_ids, budget)
+    by_reason = {r: sum(1 for item in queue if item["reason"] == r) for r in (NEW, SITEMAP, STALE)}
+    print(f"  [PLAN] {len(queue)}/{budget} fetches: {by_reason[NEW]} new, "
+          f"{by_reason[SITEMAP]} sitemap-changed, {by_reason[STALE]} stale"
+          f"{f' ({seeded} products seeded)' if seeded else ''}")
+
+    dirty = set()
+    fetched, added, changed, failed = [], 0, 0, 0
+    try:
+        for item in queue:
+            slug = item["category"]
+            pid = item["product_id"]
+            previous = None
+            if pid in index:
+                slug, i = index[pid]
+                previous = data[slug][i]
+            elif pid in all_ids:
+                continue  # stored under a category outside this run
+            species = scraper.parse_species_page(item["url"], slug, item["subcategory"], previous)
+            scraper.rate_limit()
+            if not species or not species.get("name") or species.get("id") != pid:
+                failed += 1
+                print(f"    [FAIL] {item['url']}")
+                continue
+            fetched.append(pid)
+            records = data.setdefault(slug, [])
+            if scraper.record_fetch(conn, species) and previous is not None:
+                records[i] = species
+                changed += 1
+                dirty.add(slug)
+                print(f"    [CHANGED] {species['name']}")
+            elif previous is None:
+                index[pid] = (slug, len(records))
+                records.append(species)
+                added += 1
+                dirty.add(slug)
+                print(f"    [NEW] {species['name']}")
+    except KeyboardInterrupt:
+        print("\n[INTERRUPT] Saving what was fetched")
+    finally:
+        for slug in dirty:
+            scraper.save_json(data[slug], f"{slug}.json")
+        if fetched and _has_sitemap(conn):
+            import sitemap
+            sitemap.mark_fetched(conn, fetched)
+
+    print(f"  [RECRAWL] {len(fetched)} fetched: {added} new, {changed} changed, "
+          f"{len(fetched) - added - changed} unchanged, {failed} failed")
+    print_freshness(freshness(conn, slugs))
+    conn.close()
+    return {"fetched": len(fetched), "new": added, "changed": changed, "failed": failed, "saved": sorted(dirty)}
+
+
+def main(slugs=None):
+    slugs = [c["slug"] for c in scraper.CATEGORIES if not slugs or c["slug"] in slugs]
+    conn = frontier.open_frontier()
+    seed(conn, scraper.load_category_data(slugs))
+    print_freshness(freshness(conn, slugs))
+    conn.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,29 +9,37 @@ Changes:
 - Proper parsing of LiveAquaria's quick_stat_entry structure
 """
 
-import json
 import os
 import re
 import sys
 import time
 import random
-import urllib.parse
-import urllib.request
+import threading
 from urllib.parse import urljoin
 
+import archive
+import convert_units
+import facets
+import frontier
+import placeholders
+import record_io
+import shards
+import translate_queue
+import translation_memory
+import translators
+import transport
+import water_params
+
 # Fix Windows console encoding
 if sys.platform == "win32":
     import io
     sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
     sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding="utf-8", errors="replace")
 
-import requests
-from bs4 import BeautifulSoup
-from tqdm import tqdm
-
 BASE_URL = "https://www.liveaquaria.com"
 DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
 os.makedirs(DATA_DIR, exist_ok=True)
+CHECKPOINT_DIR = os.path.join(DATA_DIR, "checkpoints")
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
@@ -40,8 +48,10 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.5",
 }
 
-SESSION = requests.Session()
-SESSION.headers.update(HEADERS)
+
+def get_session():
+    """Return the pooled keep-alive session for LiveAquaria pages."""
+    return transport.get_session("liveaquaria", HEADERS)
 
 # ---------------------------------------------------------------------------
 # Turkish Translation Dictionaries (structured fields only - NOT species names)
@@ -110,6 +120,9 @@ SKIP_SUBCATEGORY_PATTERNS = [
     "africa", "brackish", "popular",
 ]
 
+# refresh --prune refuses to drop more than this share of a category file
+PRUNE_MAX_FRACTION = 0.05
+
 
 # ---------------------------------------------------------------------------
 # Translation via Google Translate free endpoint
@@ -131,8 +144,7 @@ def load_known_species_names():
         if not os.path.exists(fpath):
             continue
         try:
-            with open(fpath, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            data = record_io.load_species(fpath)
             for s in data:
                 name = s.get("name", "")
                 if name:
@@ -141,6 +153,17 @@ def load_known_species_names():
             pass
 
 
+_name_patterns = {}
+
+
+def _name_pattern(name):
+    """Compiled case-insensitive pattern for a name (compiled once per name)."""
+    pattern = _name_patterns.get(name)
+    if pattern is None:
+        pattern = _name_patterns[name] = re.compile(re.escape(name), re.IGNORECASE)
+    return pattern
+
+
 def _protect_names(text, extra_names=None):
     """Replace known species names in text with numbered placeholders.
 
@@ -162,7 +185,7 @@ def _protect_names(text, extra_names=None):
         if not name or len(name) < 4:
             continue
         # Case-insensitive search, preserve placeholder as non-translatable token
-        pattern = re.compile(re.escape(name), re.IGNORECASE)
+        pattern = _name_pattern(name)
         if pattern.search(protected):
             placeholder = f"SPNAME{idx}X"
             # Store the first matched casing for restoration
@@ -175,22 +198,21 @@ def _protect_names(text, extra_names=None):
 
 
 def _restore_names(text, placeholder_map):
-    """Restore species names from placeholders after translation."""
-    result = text
-    for placeholder, original in placeholder_map.items():
-        # Google Translate may add spaces around or alter casing of placeholders
-        # Try a few variants
-        for variant in [placeholder, placeholder.lower(), placeholder.upper(),
-                        placeholder.replace("X", " X"), placeholder.replace("X", "x")]:
-            result = result.replace(variant, original)
-    return result
+    """Restore species names from placeholders after translation.
+
+    Google Translate may add spaces inside or alter the casing of
+    placeholders; all tolerated variants are matched in one pass.
+    """
+    return placeholders.restore(text, placeholder_map)
 
 
-def translate_to_turkish(text, retries=3, extra_names=None):
-    """Translate English text to Turkish using Google Translate free API.
+def translate_to_turkish(text, extra_names=None):
+    """Translate English text to Turkish with the active translation backend.
 
     Species names (from _known_species_names + extra_names) are protected
-    from translation using placeholders.
+    from translation using placeholders. Returns None if the translation
+    failed, so callers can tell a failure from a text that translates to
+    itself.
     """
     if not text or not text.strip():
         return text
@@ -200,46 +222,25 @@ def translate_to_turkish(text, retries=3, extra_names=None):
     # Protect known species names with placeholders before translating
     protected_text, placeholder_map = _protect_names(text, extra_names)
 
-    # Check cache (use protected text as key)
-    cache_key = protected_text
+    # Check cache (use backend and protected text as key)
+    backend = translators.get_backend()
+    cache_key = (backend.name, protected_text)
     if cache_key in _translate_cache:
         translated = _translate_cache[cache_key]
         return _restore_names(translated, placeholder_map)
 
-    # Limit text length
-    send_text = protected_text
-    if len(send_text) > 4000:
-        send_text = send_text[:4000]
-
-    for attempt in range(retries):
-        try:
-            encoded = urllib.parse.quote(send_text)
-            url = (
-                f"https://translate.googleapis.com/translate_a/single"
-                f"?client=gtx&sl=en&tl=tr&dt=t&q={encoded}"
-            )
-            req = urllib.request.Request(url, headers={"User-Agent": "Mozilla/5.0"})
-            with urllib.request.urlopen(req, timeout=15) as resp:
-                data = json.loads(resp.read().decode("utf-8"))
-
-            # Response structure: [[[translated, original, ...], ...], ...]
-            translated_parts = []
-            if data and data[0]:
-                for segment in data[0]:
-                    if segment and segment[0]:
-                        translated_parts.append(segment[0])
-            translated = "".join(translated_parts)
-            _translate_cache[cache_key] = translated
-            return _restore_names(translated, placeholder_map)
-
-        except Exception as e:
-            if attempt < retries - 1:
-                time.sleep(2)
-            else:
-                print(f"    [Translation error]: {e}")
-                return text  # Return original on failure
-
-    return text
+    # Sentence-level memory: only sentences never translated before are sent
+    translated = translation_memory.translate_protected(
+        protected_text, backend.translate, backend.batch_chars, backend.name)
+    if translated is None:
+        return None
+    restored = _restore_names(translated, placeholder_map)
+    leftover = placeholders.unrestored(restored)
+    if leftover:
+        print(f"    [Translation error]: unrestored placeholders {leftover[:3]}")
+        return None
+    _translate_cache[cache_key] = translated
+    return restored
 
 
 def translate_field(value, dictionary):
@@ -259,13 +260,32 @@ def translate_field(value, dictionary):
 # Rate limiting
 # ---------------------------------------------------------------------------
 
-def rate_limit(min_sec=1.0, max_sec=2.5):
-    time.sleep(random.uniform(min_sec, max_sec))
+# Global request budget shared by parallel subcategory workers. When set,
+# rate_limit() hands out request slots spaced 1/budget seconds apart across
+# all threads instead of sleeping per caller.
+DEFAULT_RATE_BUDGET = 0.5
+
+_budget_lock = threading.Lock()
+_budget_interval = None
+_budget_next = 0.0
+
 
+def set_rate_budget(requests_per_sec):
+    """Cap the combined request rate of all threads (None disables the cap)."""
+    global _budget_interval
+    _budget_interval = 1.0 / requests_per_sec if requests_per_sec else None
 
-def translate_delay():
-    """Small delay after translation to be polite to Google."""
-    time.sleep(random.uniform(0.3, 0.7))
+
+def rate_limit(min_sec=1.0, max_sec=2.5):
+    global _budget_next
+    if _budget_interval is None:
+        time.sleep(random.uniform(min_sec, max_sec))
+        return
+    with _budget_lock:
+        now = time.monotonic()
+        slot = max(now, _budget_next)
+        _budget_next = slot + _budget_interval * random.uniform(0.8, 1.2)
+    time.sleep(slot - now)
 
 
 # ---------------------------------------------------------------------------
@@ -274,11 +294,15 @@ def translate_delay():
 
 def fetch(url, retries=3):
     """Fetch a URL and return BeautifulSoup, or None on failure."""
+    from bs4 import BeautifulSoup
+
     full_url = urljoin(BASE_URL, url) if not url.startswith("http") else url
+    session = get_session()
     for attempt in range(retries):
         try:
-            resp = SESSION.get(full_url, timeout=30)
+            resp = session.get(full_url, timeout=30)
             resp.raise_for_status()
+            archive.store(full_url, resp.text)
             return BeautifulSoup(resp.text, "lxml")
         except Exception as e:
             print(f"  [Attempt {attempt+1}/{retries}] Error fetching {full_url}: {e}")
@@ -348,10 +372,34 @@ def get_subcategories(category):
 # Product listing
 # ---------------------------------------------------------------------------
 
-def get_product_urls_from_page(soup):
-    """Extract product URLs from a category listing page."""
-    seen = set()
-    urls = []
+_PRICE = re.compile(r"\$\s?\d[\d,]*(?:\.\d{2})?")
+# Link texts that are buttons, not product names
+_GENERIC_LINK_TEXT = {"shop now", "more info", "details", "view details", "buy now", "add to cart"}
+
+
+def _tile_of(link):
+    """Largest ancestor of a product link that holds only this product."""
+    base = link.get("href", "").split("?")[0]
+    tile = link
+    for _ in range(5):
+        parent = tile.parent
+        if parent is None or parent.name in ("body", "html"):
+            break
+        hrefs = {a.get("href", "").split("?")[0] for a in parent.select("a[href*='/product/']")}
+        if hrefs != {base}:
+            break
+        tile = parent
+    return tile
+
+
+def parse_listing_tiles(soup):
+    """Extract product tiles from a category listing page.
+
+    Returns one dict per product, in page order, with the fields the tile
+    already shows: url, id, name, image_url (thumbnail) and price. Fields a
+    tile does not show are empty.
+    """
+    tiles = {}
     for link in soup.select("a[href*='/product/']"):
         href = link.get("href", "")
         if not href or "/product/" not in href:
@@ -361,19 +409,52 @@ def get_product_urls_from_page(soup):
             continue
         # Extract base product URL (without query params)
         base = href.split("?")[0]
-        if base in seen:
-            continue
-        seen.add(base)
-        urls.append(base)
-    return urls
+        tile = tiles.get(base)
+        if tile is None:
+            tile = tiles[base] = {"url": base, "id": frontier.product_id_from_url(base) or "",
+                                  "name": "", "image_url": "", "price": ""}
+        box = _tile_of(link)
+        img = box.find("img")
+        if not tile["name"]:
+            text = link.get_text(" ", strip=True)
+            if text.lower() in _GENERIC_LINK_TEXT:
+                text = ""
+            tile["name"] = (link.get("title") or (img.get("alt") if img else "") or text or "").strip()
+        if img and not tile["image_url"]:
+            src = img.get("data-src") or img.get("src") or ""
+            if src and not src.startswith("data:"):
+                tile["image_url"] = urljoin(BASE_URL, src)
+        if not tile["price"]:
+            price = _PRICE.search(box.get_text(" ", strip=True))
+            if price:
+                tile["price"] = price.group(0).replace(" ", "")
+    return list(tiles.values())
 
 
-def get_all_product_urls(subcat_url):
-    """Get all product URLs from a subcategory, across all pages."""
-    all_urls = []
+def get_product_urls_from_page(soup):
+    """Extract product URLs from a category listing page."""
+    return [tile["url"] for tile in parse_listing_tiles(soup)]
+
+
+def get_listing_tiles(subcat_url, max_pages=30):
+    """Get all product tiles from a subcategory, across all pages."""
+    return walk_listing(subcat_url, max_pages)[0]
+
+
+def walk_listing(subcat_url, max_pages=30):
+    """Product tiles of a subcategory, across all pages, and whether the
+    walk is complete.
+
+    A walk is incomplete when a page fetch failed, the first page had no
+    tiles (more likely a failure than an empty subcategory) or max_pages was
+    reached with more pages linked.
+    """
+    all_tiles = []
+    seen = set()
     page = 1
+    complete = False
 
-    while page <= 30:  # Safety limit
+    while page <= max_pages:  # Safety limit
         if page == 1:
             url = subcat_url
         else:
@@ -385,41 +466,107 @@ def get_all_product_urls(subcat_url):
         if not soup:
             break
 
-        page_urls = get_product_urls_from_page(soup)
-        if not page_urls:
+        page_tiles = parse_listing_tiles(soup)
+        if not page_tiles:
+            complete = page > 1
             break
 
         new_found = False
-        for pu in page_urls:
-            if pu not in all_urls:
-                all_urls.append(pu)
+        for tile in page_tiles:
+            if tile["url"] not in seen:
+                seen.add(tile["url"])
+                all_tiles.append(tile)
                 new_found = True
 
         if not new_found:
+            complete = True
             break
 
         # Check if there's a next page link
         next_link = soup.select_one("a[href*='page_num=" + str(page + 1) + "']")
         if not next_link:
+            complete = True
             break
 
         page += 1
         rate_limit(0.8, 1.5)
 
-    return all_urls
+    return all_tiles, complete
 
 
-# ---------------------------------------------------------------------------
-# Product page parsing
-# ---------------------------------------------------------------------------
+def get_all_product_urls(subcat_url):
+    """Get all product URLs from a subcategory, across all pages."""
+    return [tile["url"] for tile in get_listing_tiles(subcat_url)]
 
-def parse_species_page(url, category_slug, subcategory_name=""):
-    """Parse a LiveAquaria product page and return species data dict."""
-    soup = fetch(url)
-    if not soup:
-        return None
 
-    species = {
+def map_subcategories(conn, units, product_ids, max_pages=1):
+    """Find the subcategory unit of each product id without full listing walks.
+
+    Tiles stored by earlier crawls answer most ids; the remaining ones are
+    looked up on the first max_pages listing pages of each unit, in unit
+    order, stopping once every id is mapped (max_pages=0 only consults the
+    stored tiles). Returns {product_id: unit}.
+    """
+    wanted = set(product_ids)
+    by_subcat = {u["subcategory"]: u for u in units}
+    mapping = {}
+    for pid in wanted:
+        row = conn.execute("SELECT subcategory FROM tiles WHERE product_id = ? AND category = ?",
+                           (pid, units[0]["category"])).fetchone()
+        if row and row["subcategory"] in by_subcat:
+            mapping[pid] = by_subcat[row["subcategory"]]
+    for unit in units:
+        if not max_pages or wanted <= set(mapping):
+            break
+        tiles = get_listing_tiles(unit["url"], max_pages)
+        frontier.store_tiles(conn, tiles, unit["category"], unit["subcategory"])
+        for tile in tiles:
+            if tile["id"] in wanted:
+                mapping.setdefault(tile["id"], unit)
+        rate_limit()
+    return mapping
+
+
+def breadcrumb_of(soup):
+    """Segments of a product page breadcrumb, e.g. Home > Category > Subcategory > Name."""
+    bc = soup.find("span", class_="breadcrumb")
+    if not bc:
+        return []
+    return [p.strip() for p in bc.get_text(strip=True).split(">") if p.strip()]
+
+
+def locate_products(conn, urls):
+    """Place products that no listing tile has shown yet by their breadcrumb.
+
+    Fetches each product page, matches a breadcrumb segment against the
+    name or slug of a category in CATEGORIES and takes the next segment as
+    the subcategory. Placed products are stored as tiles, so
+    map_subcategories finds them from whichever category they belong to.
+    Returns {product_id: url} of the products that could not be placed.
+    """
+    categories = {}
+    for category in CATEGORIES:
+        categories[category["name"].casefold()] = category["slug"]
+        categories[category["slug"].casefold()] = category["slug"]
+    unplaced = {}
+    for pid, url in urls.items():
+        soup = fetch(url)
+        parts = breadcrumb_of(soup) if soup else []
+        # The last segment is the product name, never a subcategory.
+        placed = next(((categories[seg.casefold()], parts[i + 1])
+                       for i, seg in enumerate(parts[:-2]) if seg.casefold() in categories), None)
+        if placed:
+            tile = {"id": pid, "url": url, "name": parts[-1], "image_url": "", "price": ""}
+            frontier.store_tiles(conn, [tile], *placed)
+        else:
+            unplaced[pid] = url
+        rate_limit()
+    return unplaced
+
+
+def empty_record(url, category_slug, subcategory_name=""):
+    """Species record with every field present and empty."""
+    return {
         "id": "",
         "url": urljoin(BASE_URL, url),
         "name": "",
@@ -452,6 +599,114 @@ def parse_species_page(url, category_slug, subcategory_name=""):
         "image_url": "",
     }
 
+
+def partial_record(tile, category_slug, subcategory_name=""):
+    """Species record filled with the fields a listing tile shows.
+
+    The other fields stay empty until the product page is parsed.
+    """
+    species = empty_record(tile["url"], category_slug, subcategory_name)
+    species["id"] = tile["id"]
+    species["name"] = species["name_tr"] = tile["name"]
+    species["image_url"] = tile["image_url"]
+    return species
+
+
+def _clean_description(text):
+    # Stored descriptions had the purchase-size text stripped by `clean`
+    import clean_descriptions
+    return clean_descriptions.clean_text(text, clean_descriptions.EN_PATTERNS)
+
+
+def record_fetch(conn, species, fetched_at=None):
+    """Count a parsed product page in the frontier fetch history.
+
+    Returns True if its content changed since the previous fetch.
+    """
+    comparable = dict(species, description=_clean_description(species["description"]))
+    return frontier.record_fetch(conn, species["id"], species["category"], species["subcategory"],
+                                 species["url"], record_io.content_hash(comparable), fetched_at)
+
+
+def keep_translations(old, new):
+    """Reuse old's Turkish description/feeding where the English did not change."""
+    for field in ("description", "feeding"):
+        text = new.get(field) or ""
+        same = text == old.get(field) or (field == "description" and _clean_description(text) == old.get(field))
+        if text and same and old.get(f"{field}_tr"):
+            new[field] = old[field]
+            new[f"{field}_tr"] = old[f"{field}_tr"]
+    return new
+
+
+_image_sources = None
+
+
+def _image_source(local_url):
+    """Remote URL a local /images/... file was downloaded from, or None."""
+    global _image_sources
+    if _image_sources is None:
+        import download_images
+        _image_sources = {rel: entry.get("source_url")
+                          for rel, entry in download_images.load_manifest().items()}
+    return _image_sources.get(local_url)
+
+
+def carry_over(old, new):
+    """Bring a fresh parse of a stored product in line with its stored record.
+
+    Stored descriptions went through `clean`, so the fresh one is cleaned
+    too; translations of unchanged texts are kept, and so are the local
+    image path and image_meta, unless the image manifest shows the local
+    file came from another URL than the page now links (a new photo). A
+    local image without a recorded source gets the page's URL as source.
+    Afterwards content_hash(new) == content_hash(old) for an unchanged page.
+    """
+    if new.get("description"):
+        new["description"] = _clean_description(new["description"])
+    keep_translations(old, new)
+    local = old.get("image_url") or ""
+    remote = new.get("image_url") or ""
+    if local.startswith("/images/"):
+        source = _image_source(local)
+        if not source and remote.startswith("http"):
+            # Downloaded before the manifest kept source URLs: the page's
+            # current image becomes the baseline for later photo changes
+            import download_images
+            download_images.record_source(local, remote)
+            _image_sources[local] = source = remote
+        if not source or source == remote:
+            new["image_url"] = local
+            if "image_meta" in old:
+                new["image_meta"] = old["image_meta"]
+    return new
+
+
+def parse_species_page(url, category_slug, subcategory_name="", previous=None, queue_translation=True):
+    """Parse a LiveAquaria product page and return species data dict.
+
+    Description and feeding are left untranslated and, with
+    queue_translation, queued for the translation stage (translate_queue).
+    With `previous` (the stored record of an earlier fetch) the result goes
+    through carry_over, so unchanged texts keep their translation instead.
+    """
+    soup = fetch(url)
+    if not soup:
+        return None
+    species = parse_species_soup(soup, url, category_slug, subcategory_name)
+    if species is not None:
+        if previous:
+            carry_over(previous, species)
+        if queue_translation:
+            translate_queue.enqueue_species(species)
+    return species
+
+
+def parse_species_soup(soup, url, category_slug, subcategory_name=""):
+    """Species record of a product page, without the description/feeding
+    translations. Used for live fetches and for archived pages."""
+    species = empty_record(url, category_slug, subcategory_name)
+
     # --- Product ID ---
     url_match = re.search(r"/product/(\d+)", url)
     if url_match:
@@ -472,13 +727,10 @@ def parse_species_page(url, category_slug, subcategory_name=""):
 
     # Fallback: breadcrumb last segment
     if not species["name"]:
-        bc = soup.find("span", class_="breadcrumb")
-        if bc:
-            bc_text = bc.get_text(strip=True)
-            parts = [p.strip() for p in bc_text.split(">") if p.strip()]
-            if parts:
-                species["name"] = parts[-1]
-                species["name_tr"] = parts[-1]
+        parts = breadcrumb_of(soup)
+        if parts:
+            species["name"] = parts[-1]
+            species["name_tr"] = parts[-1]
 
     # --- Quick Stats ---
     for entry in soup.select(".quick_stat_entry"):
@@ -561,43 +813,13 @@ def parse_species_page(url, category_slug, subcategory_name=""):
     species["diet_tr"] = translate_field(species["diet"], DIET_TR)
     species["reef_compatible_tr"] = translate_field(species["reef_compatible"], REEF_COMPAT_TR)
 
-    # --- Turkish text translations (description & feeding) ---
-    # Pass species name as extra protected term so it won't be translated in text
-    species_name = species.get("name") or ""
-    extra = [species_name] if species_name else None
-
-    if species["description"]:
-        species["description_tr"] = translate_to_turkish(species["description"], extra_names=extra)
-        translate_delay()
-
-    if species["feeding"]:
-        species["feeding_tr"] = translate_to_turkish(species["feeding"], extra_names=extra)
-        translate_delay()
-
-    return species
+    # Metric units right away, stamped so the convert step skips the record
+    return convert_units.convert_species(species)
 
 
 def _parse_water_conditions(text, species):
     """Parse temperature, SG, pH, dKH from a water conditions string."""
-    # Temperature: 72-78°F
-    temp = re.search(r"(\d+[\-–]\d+)\s*[°]?\s*F", text)
-    if temp:
-        species["water_params"]["temperature"] = temp.group(1) + "°F"
-
-    # Specific gravity: 1.020-1.025
-    sg = re.search(r"(1\.\d+[\-–]1\.\d+)", text)
-    if sg:
-        species["water_params"]["sg"] = sg.group(1)
-
-    # pH
-    ph = re.search(r"pH\s*([\d.]+[\-–][\d.]+)", text, re.IGNORECASE)
-    if ph:
-        species["water_params"]["ph"] = ph.group(1)
-
-    # dKH
-    dkh = re.search(r"dKH\s*(\d+[\-–]\d+)", text, re.IGNORECASE)
-    if dkh:
-        species["water_params"]["dkh"] = dkh.group(1)
+    species["water_params"].update(water_params.to_water_params(text))
 
 
 # ---------------------------------------------------------------------------
@@ -606,8 +828,10 @@ def _parse_water_conditions(text, species):
 
 def save_json(data, filename):
     filepath = os.path.join(DATA_DIR, filename)
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    if filename in record_io.FILES:
+        record_io.dump_species(data, filepath)
+    else:
+        record_io.dump(data, filepath, pretty=True)
     print(f"  [SAVED] {len(data)} species -> {filename}")
 
 
@@ -615,24 +839,148 @@ def save_json(data, filename):
 # Category scraping
 # ---------------------------------------------------------------------------
 
-def scrape_category(category):
-    """Scrape all species in a category and return list of dicts."""
+def scrape_subcategory(unit, existing_ids, stop):
+    """Parse a subcategory's claimed products into its checkpoint shard.
+
+    The shard is rewritten after every product so a crash loses at most the
+    page being parsed. Runs in a worker thread with its own frontier
+    connection.
+    """
+    conn = frontier.open_frontier()
+    worker = frontier.worker_id()
+    species_list = []
+    try:
+        while not stop.is_set():
+            row = frontier.claim_next(conn, unit["category"], worker, unit["subcategory"])
+            if row is None:
+                break
+            url = row["url"]
+            if row["product_id"] in existing_ids:
+                frontier.mark_done(conn, url)
+                continue
+
+            species = parse_species_page(url, unit["category"], unit["subcategory"])
+
+            if species and species.get("name") and species.get("id"):
+                species_list.append(species)
+                shards.write_shard(CHECKPOINT_DIR, unit, species_list)
+                frontier.mark_done(conn, url)
+                record_fetch(conn, species)
+                print(f"    [OK] {species['name']}")
+            else:
+                frontier.mark_failed(conn, url, "fetch or parse failed")
+                print(f"    [FAIL] {url}")
+
+            rate_limit()
+    finally:
+        conn.close()
+    print(f"  [SUBCAT DONE] {unit['subcategory']}: {len(species_list)} new")
+    return len(species_list)
+
+
+def _merge_checkpoints(all_species, filename, slug):
+    """Fold checkpoint shards into the category list, save, drop the shards."""
+    added = shards.merge_shards(all_species, CHECKPOINT_DIR, slug)
+    if added:
+        save_json(all_species, filename)
+    shards.clear_shards(CHECKPOINT_DIR, slug)
+    return added
+
+
+def _discover_from_sitemap(conn, units, existing_ids):
+    """Queue new sitemap products of this category in the frontier.
+
+    Returns {product_id: url} of this category's products whose sitemap
+    lastmod moved since they were fetched; the caller fetches them again.
+    """
+    import sitemap
+
+    sitemap.sync(conn)
+    known = {s["id"] for records in load_category_data().values() for s in records if s.get("id")}
+    new, changed = sitemap.pending_products(conn, known)
+    mapping = map_subcategories(conn, units, new)
+    # Products missing from the first listing pages and from every stored
+    # tile are placed by their product page breadcrumb instead.
+    unseen = {pid: url for pid, url in new.items() if pid not in mapping
+              and not conn.execute("SELECT 1 FROM tiles WHERE product_id = ?", (pid,)).fetchone()}
+    unplaced = {}
+    if unseen:
+        unplaced = locate_products(conn, unseen)
+        mapping.update(map_subcategories(conn, units, set(unseen) - set(unplaced), max_pages=0))
+    for unit in units:
+        urls = [url for pid, url in new.items() if mapping.get(pid) is unit]
+        added = frontier.add_urls(conn, urls, unit["category"], unit["subcategory"], existing_ids)
+        frontier.mark_listing_walked(conn, unit["url"], unit["category"])
+        if urls:
+            print(f"  [SITEMAP] {unit['subcategory']}: {added} new")
+    print(f"  [SITEMAP] {len(new)} new products in sitemap, {len(mapping)} in this category; "
+          f"{len(changed)} changed")
+    if unplaced:
+        print(f"  [SITEMAP] {len(unplaced)} new products not found in any listing or breadcrumb:")
+        for url in sorted(unplaced.values()):
+            print(f"    {url}")
+    return {pid: url for pid, url in changed.items() if pid in existing_ids}
+
+
+def _refetch_changed(conn, all_species, changed, slug):
+    """Parse changed products again and replace their records in place.
+
+    Returns the ids fetched successfully.
+    """
+    index = {s["id"]: i for i, s in enumerate(all_species) if s.get("id")}
+    refetched = set()
+    for pid, url in changed.items():
+        old = all_species[index[pid]]
+        species = parse_species_page(url, slug, old.get("subcategory", ""), previous=old)
+        if species and species.get("name") and species.get("id") == pid:
+            all_species[index[pid]] = species
+            record_fetch(conn, species)
+            refetched.add(pid)
+            print(f"    [UPDATED] {species['name']}")
+        else:
+            print(f"    [FAIL] {url}")
+        rate_limit()
+    return refetched
+
+
+def scrape_category(category, workers=1, budget=None, discovery="listings"):
+    """Scrape all species in a category and return list of dicts.
+
+    Subcategories are scraped by `workers` threads into per-subcategory
+    checkpoint shards; `budget` caps the combined request rate (requests per
+    second). The shards are merged in subcategory order, so the result is the
+    same as a serial crawl. discovery="sitemap" finds new and changed products
+    from the sitemap instead of walking every listing page.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
     print(f"\n{'='*60}")
     print(f"[CATEGORY] {category['name']} ({category['name_tr']})")
     print(f"{'='*60}")
 
-    filename = f"{category['slug']}.json"
+    slug = category["slug"]
+    filename = f"{slug}.json"
     filepath = os.path.join(DATA_DIR, filename)
 
     # Load existing to allow resume
     all_species = []
     if os.path.exists(filepath):
-        with open(filepath, "r", encoding="utf-8") as f:
-            all_species = json.load(f)
+        all_species = record_io.load_species(filepath)
         print(f"  [RESUME] {len(all_species)} already downloaded")
 
+    # Checkpoints left by an interrupted run
+    recovered = _merge_checkpoints(all_species, filename, slug)
+    if recovered:
+        print(f"  [RESUME] {recovered} recovered from checkpoints")
+
     existing_ids = {s["id"] for s in all_species if s.get("id")}
 
+    # Persistent frontier: resume claims and skip listings walked before a crash
+    conn = frontier.open_frontier()
+    worker = frontier.worker_id()
+    frontier.reclaim_stale(conn)
+    frontier.requeue_missing(conn, slug, existing_ids)
+
     # Get subcategories
     print(f"  Fetching subcategories...")
     subcats = get_subcategories(category)
@@ -642,37 +990,181 @@ def scrape_category(category):
     if not subcats:
         subcats = [{"name": category["name"], "url": category["url"]}]
 
-    for subcat in subcats:
-        print(f"\n  [SUBCAT] {subcat['name']}")
+    units = [
+        {
+            "id": shards.unit_id(seq, slug, subcat["url"]),
+            "seq": seq,
+            "category": slug,
+            "subcategory": subcat["name"],
+            "url": subcat["url"],
+        }
+        for seq, subcat in enumerate(subcats, 1)
+    ]
+
+    changed, refetched = {}, set()
+    if discovery == "sitemap":
+        changed = _discover_from_sitemap(conn, units, existing_ids)
+
+    set_rate_budget((budget or DEFAULT_RATE_BUDGET) if workers > 1 else None)
+    transport.set_pool_size("liveaquaria", workers)
+    stop = threading.Event()
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            try:
+                # Listings are walked in parallel but recorded in subcategory
+                # order, so a product listed twice belongs to the first one.
+                to_walk = [u for u in units if not frontier.listing_walked(conn, u["url"])]
+                listings = pool.map(lambda u: get_listing_tiles(u["url"]), to_walk)
+                for unit, tiles in zip(to_walk, listings):
+                    prod_urls = [t["url"] for t in tiles]
+                    added = frontier.add_urls(conn, prod_urls, slug, unit["subcategory"], existing_ids)
+                    frontier.store_tiles(conn, tiles, slug, unit["subcategory"])
+                    frontier.mark_listing_walked(conn, unit["url"], slug)
+                    print(f"  [SUBCAT] {unit['subcategory']}: {len(prod_urls)} products, {added} new")
+
+                futures = [pool.submit(scrape_subcategory, u, existing_ids, stop) for u in units]
+                for future in futures:
+                    future.result()
+            except KeyboardInterrupt:
+                # Let workers finish their current product, then stop
+                stop.set()
+                raise
+
+        if changed:
+            refetched = _refetch_changed(conn, all_species, changed, slug)
+            if refetched:
+                save_json(all_species, filename)
+
+        # Category finished: the next crawl walks its listings again
+        frontier.finish_crawl(conn, slug)
+    except KeyboardInterrupt:
+        frontier.release_worker(conn, worker)
+        raise
+    finally:
+        _merge_checkpoints(all_species, filename, slug)
+        if discovery == "sitemap":
+            import sitemap
+            # Changed products not fetched again stay pending for the next run
+            stale = set(changed) - refetched
+            sitemap.mark_fetched(conn, [s["id"] for s in all_species if s.get("id") not in stale])
+        set_rate_budget(None)
+        conn.close()
 
-        # Get product URLs
-        prod_urls = get_all_product_urls(subcat["url"])
-        new_urls = [u for u in prod_urls if re.search(r"/product/(\d+)", u) and
-                    re.search(r"/product/(\d+)", u).group(1) not in existing_ids]
+    return all_species
 
-        print(f"    Found {len(prod_urls)} products, {len(new_urls)} new")
 
-        for url in tqdm(new_urls, desc=f"    Parsing", leave=False, unit="sp"):
-            species = parse_species_page(url, category["slug"], subcat["name"])
+def load_category_data(slugs=None):
+    """Load existing category JSON files into a {slug: [species]} dict."""
+    categories_data = {}
+    for cat in CATEGORIES:
+        if slugs and cat["slug"] not in slugs:
+            continue
+        filepath = os.path.join(DATA_DIR, f"{cat['slug']}.json")
+        if not os.path.exists(filepath):
+            continue
+        categories_data[cat["slug"]] = record_io.load_species(filepath)
+    return categories_data
 
-            if species and species.get("name") and species.get("id"):
-                all_species.append(species)
-                existing_ids.add(species["id"])
-                print(f"    [OK] {species['name']}")
-            else:
-                print(f"    [FAIL] {url}")
 
-            rate_limit()
+def refresh_category(category, prune=False):
+    """Update a category file from its listing pages alone.
 
-        # Incremental save
-        save_json(all_species, filename)
+    Listing tiles are compared with the tiles seen last time (frontier
+    `tiles` table): a changed name is applied directly, a changed thumbnail
+    means the product changed and its page is fetched again, and products not
+    in the file yet are fetched. Products in the file but on no listing are
+    reported as removed and dropped with prune=True, unless a listing walk
+    was incomplete or more than PRUNE_MAX_FRACTION of the file would go. The
+    first refresh of a category only records the tiles.
+    """
+    slug = category["slug"]
+    filename = f"{slug}.json"
+    species_list = load_category_data([slug]).get(slug, [])
+    by_id = {s["id"]: s for s in species_list if s.get("id")}
 
-    return all_species
+    conn = frontier.open_frontier()
+    previous = frontier.tile_snapshot(conn, slug)
+
+    subcats = get_subcategories(category)
+    # Without the subcategory list the bare category page lists only a subset
+    incomplete = not subcats
+    subcats = subcats or [{"name": category["name"], "url": category["url"]}]
+    rate_limit()
+    listed = {}
+    for subcat in subcats:
+        tiles, complete = walk_listing(subcat["url"])
+        incomplete = incomplete or not complete
+        for tile in tiles:
+            if tile["id"]:
+                listed.setdefault(tile["id"], (tile, subcat["name"]))
+        rate_limit()
+
+    renamed = 0
+    to_fetch = []
+    for pid, (tile, subcat_name) in listed.items():
+        species = by_id.get(pid)
+        if species is None:
+            to_fetch.append((tile, subcat_name))
+            continue
+        old = previous.get(pid)
+        if old is None:
+            continue
+        if tile["image_url"] and old["image_url"] and tile["image_url"] != old["image_url"]:
+            to_fetch.append((tile, subcat_name))
+        elif tile["name"] and old["name"] and tile["name"] != old["name"]:
+            partial = partial_record(tile, slug, subcat_name)
+            species["name"] = partial["name"]
+            species["name_tr"] = partial["name_tr"]
+            renamed += 1
+
+    fetched = 0
+    failed = set()
+    for tile, subcat_name in to_fetch:
+        species = parse_species_page(tile["url"], slug, subcat_name, previous=by_id.get(tile["id"]))
+        rate_limit()
+        if not species or not species.get("id"):
+            failed.add(tile["id"])
+            continue
+        record_fetch(conn, species)
+        if species["id"] in by_id:
+            species_list[species_list.index(by_id[species["id"]])] = species
+        else:
+            species_list.append(species)
+        by_id[species["id"]] = species
+        fetched += 1
+
+    # Tiles of failed fetches are not stored, so the next refresh retries them
+    for tile, subcat_name in listed.values():
+        if tile["id"] in by_id and tile["id"] not in failed:
+            frontier.store_tiles(conn, [tile], slug, subcat_name)
+
+    removed = [pid for pid in by_id if pid not in listed]
+    if prune and removed and incomplete:
+        print(f"  [{slug}] some listings could not be walked completely, not pruning")
+        prune = False
+    if prune and len(removed) > PRUNE_MAX_FRACTION * len(species_list):
+        print(f"  [{slug}] {len(removed)} of {len(species_list)} products unlisted "
+              f"(more than {PRUNE_MAX_FRACTION:.0%}), not pruning")
+        prune = False
+    if prune and removed:
+        gone = set(removed)
+        species_list[:] = [s for s in species_list if s.get("id") not in gone]
+    conn.close()
+
+    if renamed or fetched or (prune and removed):
+        save_json(species_list, filename)
+    print(f"  [{slug}] {len(listed)} listed: {renamed} renamed, {fetched} fetched "
+          f"({len(to_fetch) - fetched} failed), {len(removed)} no longer listed"
+          f"{' (pruned)' if prune and removed else ''}")
+    for pid in removed[:10]:
+        print(f"    [REMOVED] {pid} {by_id[pid].get('name', '')}")
+    return {"listed": len(listed), "renamed": renamed, "fetched": fetched, "removed": removed}
 
 
 def create_categories_meta(categories_data):
-    """Create categories.json summary file."""
+    """Create categories.json summary file and the facet bitmap index."""
     meta = []
+    index = {}
     for cat in CATEGORIES:
         species_list = categories_data.get(cat["slug"], [])
         subcats = sorted(set(s.get("subcategory", "") for s in species_list if s.get("subcategory")))
@@ -682,15 +1174,21 @@ def create_categories_meta(categories_data):
             "slug": cat["slug"],
             "species_count": len(species_list),
             "subcategories": subcats,
+            "facets": facets.facet_counts(species_list),
+            "histograms": facets.histograms(species_list),
         })
+        index[cat["slug"]] = facets.facet_bitmaps(species_list)
     save_json(meta, "categories.json")
 
+    # Compact: the index is for machines and bitmaps do not diff usefully
+    record_io.dump(index, os.path.join(DATA_DIR, "facet-index.json"))
+
 
 # ---------------------------------------------------------------------------
 # Main
 # ---------------------------------------------------------------------------
 
-def main():
+def main(slugs=None, workers=1, budget=None, discovery="listings", translate_workers=None):
     print("=" * 60)
     print("  LiveAquaria Species Scraper")
     print("  - Species names: English (proper nouns, not translated)")
@@ -701,23 +1199,33 @@ def main():
     load_known_species_names()
     print(f"  Protected species names loaded: {len(_known_species_names)}")
 
+    # Texts are translated in the background while the crawl goes on, with
+    # their own worker threads and request budget
+    stage = translate_queue.Stage(translate_workers).start()
     categories_data = {}
 
     for category in CATEGORIES:
+        if slugs and category["slug"] not in slugs:
+            continue
         try:
-            species = scrape_category(category)
+            species = scrape_category(category, workers, budget, discovery)
             categories_data[category["slug"]] = species
             print(f"\n  [DONE] {category['name']}: {len(species)} species")
         except KeyboardInterrupt:
-            print("\n[INTERRUPT] Saving progress...")
-            categories_data[category["slug"]] = []
-            save_json(categories_data.get(category["slug"], []), f"{category['slug']}.json")
+            # scrape_category already saved its progress
+            print("\n[INTERRUPT] Progress saved")
             break
         except Exception as e:
             print(f"\n  [ERROR] {category['name']}: {e}")
             import traceback
             traceback.print_exc()
 
+    stage.finish()
+
+    # Categories not crawled in this run keep their existing counts
+    for slug, species in load_category_data().items():
+        categories_data.setdefault(slug, species)
+
     create_categories_meta(categories_data)
 
     print("\n" + "=" * 60)
@@ -727,6 +1235,7 @@ def main():
     for cat in CATEGORIES:
         count = len(categories_data.get(cat["slug"], []))
         print(f"  {cat['name']}: {count}")
+    water_params.print_report(water_params.save_report())
     print(f"Data: {DATA_DIR}")
 
 
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Result shards: one JSON file per subcategory work unit.
+
+Shards are named by unit id, whose zero-padded sequence prefix follows the
+subcategory order of the crawl, so sorting file names gives a deterministic
+merge order. Used for local checkpoints (scraper.scrape_category) and for
+distributed worker results (distributed.py).
+"""
+
+import os
+
+import record_io
+
+
+def unit_id(seq, category_slug, subcat_url):
+    """Stable, filename-safe id for a work unit."""
+    cat_match = subcat_url.split("/category/", 1)
+    cat_num = cat_match[1].split("/", 1)[0] if len(cat_match) == 2 else "0"
+    return f"{seq:05d}-{category_slug}-{cat_num}"
+
+
+def write_shard(shard_dir, unit, species_list):
+    """Atomically write a unit's result shard."""
+    cat_dir = os.path.join(shard_dir, unit["category"])
+    os.makedirs(cat_dir, exist_ok=True)
+    path = os.path.join(cat_dir, f"{unit['id']}.json")
+    record_io.dump({"unit": unit, "species": species_list}, path)
+    return path
+
+
+def load_shards(shard_dir, category_slug):
+    """Yield (unit, species_list) for a category's shards in unit order."""
+    cat_dir = os.path.join(shard_dir, category_slug)
+    if not os.path.isdir(cat_dir):
+        return
+    for fname in sorted(os.listdir(cat_dir)):
+        if not fname.endswith(".json"):
+            continue
+        shard = record_io.load(os.path.join(cat_dir, fname))
+        yield shard["unit"], shard["species"]
+
+
+def merge_shards(species_list, shard_dir, category_slug):
+    """Append shard species not yet in species_list (by id), in unit order.
+
+    A product listed in several subcategories keeps the first one, exactly as
+    a serial crawl would. Returns the number of species added.
+    """
+    seen = {s["id"] for s in species_list if s.get("id")}
+    added = 0
+    for _unit, shard_species in load_shards(shard_dir, category_slug):
+        for species in shard_species:
+            if species.get("id") and species["id"] not in seen:
+                seen.add(species["id"])
+                species_list.append(species)
+                added += 1
+    return added
+
+
+def clear_shards(shard_dir, category_slug):
+    """Delete a category's shards once they are merged."""
+    cat_dir = os.path.join(shard_dir, category_slug)
+    if not os.path.isdir(cat_dir):
+        return
+    for fname in os.listdir(cat_dir):
+        os.remove(os.path.join(cat_dir, fname))
@@ -0,0 +1,345 @@
+#!/usr/bin/env python3
+"""
+Precomputed "similar species" neighbours.
+
+Every species gets a feature vector made of four L2-normalized blocks,
+each scaled by the square root of its weight, so the dot product of two
+vectors is the weighted sum of the per-block cosine similarities:
+
+  - text        TF-IDF of the description (sublinear tf, MAX_TERMS most
+                frequent terms)
+  - family      one-hot
+  - traits      one-hot temperament and multi-hot diet ("Carnivore, Omnivore")
+  - water       standardized midpoints of temperature, SG, pH and dKH
+
+Neighbours are the top K by that score within the same category, found with
+batched matrix products (NumPy). The TF-IDF block is kept sparse and only
+BATCH + COLUMNS rows are made dense at a time, so memory does not grow with
+the corpus. The result, data/similar.json, is a compact
+table {id: [[neighbour id, score], ...]} that sync_to_site copies next to
+the category files.
+
+The vocabulary, IDF and water statistics are kept in data/similar-model.json
+together with a digest of each species' features. A later run recomputes
+only the affected rows: new and changed species, and species whose
+neighbour list held a changed or removed one; every other list is merged
+with the scores against the changed species. The model is rebuilt from
+scratch (full run) with --full or once the corpus has grown or shrunk by
+more than REBUILD_DRIFT since it was built.
+
+    python scraper/cli.py similar [--k 6] [--full]
+"""
+
+import hashlib
+import math
+import os
+import re
+import time
+from collections import Counter
+
+import record_io
+from columnar import parse_range
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+SIMILAR_PATH = os.path.join(DATA_DIR, "similar.json")
+MODEL_PATH = os.path.join(DATA_DIR, "similar-model.json")
+
+K = 6
+MAX_TERMS = 4096
+BATCH = 512
+COLUMNS = 4096
+REBUILD_DRIFT = 0.1
+WEIGHTS = {"text": 0.55, "family": 0.2, "traits": 0.1, "water": 0.15}
+WATER_FIELDS = ("temperature", "sg", "ph", "dkh")
+
+_WORD = re.compile(r"[a-z]{3,}")
+STOPWORDS = frozenset("""
+    the and for are but not you your with this that from they them their its
+    has have had was were will can may also very into than then there these
+    those which while when where who how all any some such other more most
+    much many only own same out over under about after before between both
+    each few being been does did doing one two well our these make makes
+""".split())
+
+
+def _numpy():
+    try:
+        import numpy
+    except ImportError as e:
+        raise RuntimeError("similar needs NumPy: `pip install numpy`") from e
+    return numpy
+
+
+def tokens(text):
+    return [w for w in _WORD.findall((text or "").lower()) if w not in STOPWORDS]
+
+
+def _diets(record):
+    return sorted({d.strip() for d in (record.get("diet") or "").split(",") if d.strip()})
+
+
+def _water(record):
+    params = record.get("water_params") or {}
+    return [sum(parse_range(params.get(f, ""))) / 2 for f in WATER_FIELDS]
+
+
+def signature(record):
+    """Digest of the fields the features are built from."""
+    values = [record.get("category"), record.get("description"), record.get("family"),
+              record.get("temperament"), record.get("diet"),
+              [(record.get("water_params") or {}).get(f, "") for f in WATER_FIELDS]]
+    return hashlib.sha1(record_io.dumps(values)).hexdigest()[:16]
+
+
+# ---------------------------------------------------------------------------
+# Model
+# ---------------------------------------------------------------------------
+
+def build_model(records):
+    """Vocabulary, IDF and value tables of a corpus."""
+    df = Counter()
+    for r in records:
+        df.update(set(tokens(r.get("description"))))
+    n = len(records)
+    # Terms in a single description cannot make two species similar
+    terms = [t for t, c in df.most_common() if c > 1][:MAX_TERMS]
+    water = []
+    for i in range(len(WATER_FIELDS)):
+        values = [v[i] for v in map(_water, records) if not math.isnan(v[i])]
+        mean = sum(values) / len(values) if values else 0.0
+        std = math.sqrt(sum((v - mean) ** 2 for v in values) / len(values)) if values else 0.0
+        water.append([mean, std or 1.0])
+    return {
+        "corpus": n,
+        "terms": sorted(terms),
+        "idf": {t: math.log((1 + n) / (1 + df[t])) + 1 for t in terms},
+        "families": sorted({r["family"] for r in records if r.get("family")}),
+        "traits": sorted({f"temperament:{r['temperament']}" for r in records if r.get("temperament")}
+                         | {f"diet:{d}" for r in records for d in _diets(r)}),
+        "water": water,
+        "signatures": {},
+    }
+
+
+class Vectors:
+    """Feature rows of a corpus, kept compact.
+
+    The TF-IDF block is stored sparse (CSR arrays: a description has a few
+    dozen of the MAX_TERMS terms), the small family/traits/water blocks
+    dense. rows() builds dense rows for a batch only, so nothing N x
+    MAX_TERMS is ever allocated.
+    """
+
+    def __init__(self, terms, indptr, indices, data, attributes):
+        self.terms = terms
+        self.indptr = indptr
+        self.indices = indices
+        self.data = data
+        self.attributes = attributes
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def rows(self, idx):
+        """Dense float32 feature rows of the given row indices."""
+        np = _numpy()
+        idx = np.asarray(idx, dtype=np.intp)
+        starts = self.indptr[idx]
+        lengths = self.indptr[idx + 1] - starts
+        entries = np.arange(lengths.sum()) + np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        out = np.zeros((len(idx), self.terms + self.attributes.shape[1]), dtype=np.float32)
+        out[np.repeat(np.arange(len(idx)), lengths), self.indices[entries]] = self.data[entries]
+        out[:, self.terms:] = self.attributes[idx]
+        return out
+
+
+def vectors(records, model):
+    """Vectors of the records: weighted, block-normalized feature rows."""
+    np = _numpy()
+    term_col = {t: i for i, t in enumerate(model["terms"])}
+    family_col = {f: i for i, f in enumerate(model["families"])}
+    trait_col = {t: i for i, t in enumerate(model["traits"])}
+    idf = np.array([model["idf"][t] for t in model["terms"]], dtype=np.float32)
+
+    n = len(records)
+    indptr = np.zeros(n + 1, dtype=np.intp)
+    indices, data = [], []
+    family = np.zeros((n, len(family_col)), dtype=np.float32)
+    traits = np.zeros((n, len(trait_col)), dtype=np.float32)
+    water = np.zeros((n, len(WATER_FIELDS)), dtype=np.float32)
+    stats = np.array(model["water"], dtype=np.float32)
+    text_scale = np.float32(math.sqrt(WEIGHTS["text"]))
+    for i, r in enumerate(records):
+        counts = [(term_col[term], 1 + math.log(count))
+                  for term, count in Counter(tokens(r.get("description"))).items() if term in term_col]
+        if counts:
+            cols = np.array([c for c, _ in counts], dtype=np.intp)
+            weights = np.array([w for _, w in counts], dtype=np.float32) * idf[cols]
+            indices.append(cols)
+            data.append(weights / np.linalg.norm(weights) * text_scale)
+        indptr[i + 1] = indptr[i] + len(counts)
+        if r.get("family") in family_col:
+            family[i, family_col[r["family"]]] = 1
+        for key in [f"temperament:{r.get('temperament')}"] + [f"diet:{d}" for d in _diets(r)]:
+            if key in trait_col:
+                traits[i, trait_col[key]] = 1
+        water[i] = np.nan_to_num((np.array(_water(r), dtype=np.float32) - stats[:, 0]) / stats[:, 1])
+
+    blocks = []
+    for name, block in (("family", family), ("traits", traits), ("water", water)):
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        norms[norms == 0] = 1
+        blocks.append(block / norms * np.float32(math.sqrt(WEIGHTS[name])))
+    return Vectors(
+        len(term_col), indptr,
+        np.concatenate(indices) if indices else np.zeros(0, dtype=np.intp),
+        np.concatenate(data) if data else np.zeros(0, dtype=np.float32),
+        np.hstack(blocks).astype(np.float32),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Neighbours
+# ---------------------------------------------------------------------------
+
+def top_k(vecs, categories, rows, ids, k=K):
+    """{ids[r]: [[id, score], ...]} for the given row indices.
+
+    Rows are scored against the members of their own category, BATCH rows
+    by COLUMNS members at a time, keeping a running top k per row.
+    """
+    np = _numpy()
+    out = {}
+    rows = np.asarray(rows, dtype=np.intp)
+    for category in (np.unique(categories[rows]) if len(rows) else []):
+        members = np.flatnonzero(categories == category)
+        todo = rows[categories[rows] == category]
+        kk = min(k, len(members) - 1)
+        batches = [todo[start:start + BATCH] for start in range(0, len(todo), BATCH)]
+        best = [np.full((len(b), 0), -np.inf, dtype=np.float32) for b in batches]
+        best_cols = [np.zeros((len(b), 0), dtype=np.intp) for b in batches]
+        for col_start in range(0, len(members) if kk > 0 else 0, COLUMNS):
+            cols = members[col_start:col_start + COLUMNS]
+            column_rows = vecs.rows(cols)
+            for n, batch in enumerate(batches):
+                scores = vecs.rows(batch) @ column_rows.T
+                scores[batch[:, None] == cols[None, :]] = -np.inf
+                merged = np.hstack([best[n], scores])
+                merged_cols = np.hstack([best_cols[n], np.broadcast_to(cols, scores.shape)])
+                if merged.shape[1] > kk:
+                    keep = np.argpartition(-merged, kk - 1, axis=1)[:, :kk]
+                    merged = np.take_along_axis(merged, keep, axis=1)
+                    merged_cols = np.take_along_axis(merged_cols, keep, axis=1)
+                best[n], best_cols[n] = merged, merged_cols
+        for batch, scores, cols in zip(batches, best, best_cols):
+            for i, row in enumerate(batch):
+                found = [[ids[c], round(float(score), 4)]
+                         for c, score in zip(cols[i], scores[i]) if np.isfinite(score)]
+                out[ids[row]] = sorted(found, key=lambda item: (-item[1], item[0]))
+    return out
+
+
+def _merge(current, candidates, k):
+    merged = {nid: score for nid, score in current}
+    for nid, score in candidates:
+        merged[nid] = score
+    return [[nid, score] for nid, score in
+            sorted(merged.items(), key=lambda item: (-item[1], item[0]))[:k]]
+
+
+def update(records, table, model, k=K):
+    """Recompute the neighbour rows affected by changed species.
+
+    Returns (table, recomputed rows). Rows of unchanged species only get
+    the changed species' scores merged in: an N x changed product instead
+    of N x N.
+    """
+    np = _numpy()
+    ids = [r["id"] for r in records]
+    position = {pid: i for i, pid in enumerate(ids)}
+    signatures = {r["id"]: signature(r) for r in records}
+    old = model["signatures"]
+    changed = {pid for pid, sig in signatures.items() if old.get(pid) != sig}
+    removed = set(old) - set(signatures)
+    touched = changed | removed
+
+    # Lists that lose a member may now miss a species ranked just below it
+    affected = set(changed)
+    for pid in ids:
+        current = table.get(pid)
+        if current is None or len(current) < k or any(nid in touched for nid, _ in current):
+            affected.add(pid)
+
+    vecs = vectors(records, model)
+    categories = np.array([r.get("category", "") for r in records])
+    table = {pid: table[pid] for pid in ids if pid in table and pid not in affected}
+    table.update(top_k(vecs, categories, [position[pid] for pid in sorted(affected)], ids, k))
+
+    changed_rows = np.array([position[pid] for pid in sorted(changed)], dtype=np.intp)
+    rest = [pid for pid in ids if pid not in affected]
+    for col_start in range(0, len(changed_rows) if rest else 0, COLUMNS):
+        cols = changed_rows[col_start:col_start + COLUMNS]
+        column_rows = vecs.rows(cols)
+        for start in range(0, len(rest), BATCH):
+            rows = np.array([position[pid] for pid in rest[start:start + BATCH]], dtype=np.intp)
+            scores = vecs.rows(rows) @ column_rows.T
+            same = categories[rows][:, None] == categories[cols][None, :]
+            for i, row in enumerate(rows):
+                candidates = [[ids[c], round(float(scores[i, j]), 4)]
+                              for j, c in enumerate(cols) if same[i, j]]
+                if candidates:
+                    table[ids[row]] = _merge(table[ids[row]], candidates, k)
+
+    model["signatures"] = signatures
+    return table, len(affected)
+
+
+def _load_json(path):
+    return record_io.load(path) if os.path.exists(path) else None
+
+
+def run(k=K, full=False):
+    """Build or update data/similar.json; returns the number of rows computed."""
+    _numpy()
+    start = time.perf_counter()
+    records = []
+    for filename in record_io.FILES:
+        path = os.path.join(DATA_DIR, filename)
+        if os.path.exists(path):
+            records.extend(r for r in record_io.load_species(path) if r.get("id"))
+
+    model = _load_json(MODEL_PATH)
+    table = _load_json(SIMILAR_PATH)
+    reason = None
+    if full:
+        reason = "--full"
+    elif model is None or table is None:
+        reason = "no previous model"
+    elif model.get("k") != k:
+        reason = f"k changed ({model.get('k')} -> {k})"
+    elif abs(len(records) - model["corpus"]) > REBUILD_DRIFT * model["corpus"]:
+        reason = f"corpus size {model['corpus']} -> {len(records)}"
+    if reason:
+        print(f"  [MODEL] rebuilding: {reason}")
+        model = build_model(records)
+        model["k"] = k
+        table = {}
+
+    table, computed = update(records, table, model, k)
+    record_io.dump(table, SIMILAR_PATH)
+    record_io.dump(model, MODEL_PATH)
+    print(f"  [OK] {len(records)} species, {computed} neighbour rows computed, "
+          f"{len(records) - computed} kept, {len(model['terms'])} terms "
+          f"in {time.perf_counter() - start:.2f}s -> {os.path.basename(SIMILAR_PATH)}")
+    return computed
+
+
+def main(k=K, full=False):
+    print("=" * 50)
+    print("  Similar species (TF-IDF + attributes)")
+    print("=" * 50)
+    run(k, full)
+
+
+if __name__ == "__main__":
+    main()
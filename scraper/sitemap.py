@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+"""
+Sitemap-driven product discovery.
+
+Instead of walking up to 30 listing pages per subcategory, `crawl
+--discovery sitemap` streams the site's sitemap (index + child sitemaps,
+plain or gzipped) through an incremental XML parser and keeps only
+/product/ URLs. Each product's <lastmod> is stored in the frontier database
+(`sitemap` table) next to the lastmod it had when it was last fetched, so a
+run only has to look at:
+  - new products: in the sitemap, in no category file yet
+  - changed products: lastmod newer than at the last fetch
+
+Subcategory membership of new products comes from the listing tiles already
+known (frontier `tiles`) and, for the rest, from the first listing page(s)
+of each subcategory (scraper.map_subcategories) instead of the full walk.
+Products found in neither are placed by their product page breadcrumb
+(scraper.locate_products); any left after that are listed in the run output.
+
+    python scraper/cli.py sitemap                   # sync and summarize
+    python scraper/cli.py sitemap --record DIR      # save the live sitemap
+
+tests/test_sitemap.py runs discovery against a local server, for a
+synthesized sitemap and for one saved with --record and served back.
+"""
+
+import os
+import time
+import zlib
+from datetime import datetime, timezone
+from urllib.parse import urljoin, urlparse
+from xml.etree.ElementTree import XMLPullParser
+
+import frontier
+import transport
+
+SITEMAP_URL = "https://www.liveaquaria.com/sitemap.xml"
+CHUNK = 64 * 1024
+MAX_DEPTH = 3
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sitemap (
+    product_id      TEXT PRIMARY KEY,
+    url             TEXT NOT NULL,
+    lastmod         REAL,
+    fetched_lastmod REAL,
+    seen_at         REAL NOT NULL
+);
+"""
+
+_synced = set()
+
+
+def _local(tag):
+    return tag.rsplit("}", 1)[-1]
+
+
+def parse_lastmod(text):
+    """W3C datetime ('2024-05-01', '2024-05-01T10:00:00Z', ...) -> epoch, or None."""
+    text = (text or "").strip()
+    if not text:
+        return None
+    try:
+        dt = datetime.fromisoformat(text.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+
+def iter_chunks(url, session=None):
+    """Yield decompressed body chunks of a (possibly gzipped) sitemap."""
+    session = session or transport.get_session("sitemap", {"User-Agent": "Mozilla/5.0"}, http2=False)
+    resp = session.get(url, timeout=30, stream=True)
+    resp.raise_for_status()
+    inflate = None
+    try:
+        # raw stream: a .xml.gz file is not decoded by Content-Encoding handling
+        for chunk in resp.raw.stream(CHUNK, decode_content=True):
+            if inflate is None:
+                inflate = zlib.decompressobj(16 + zlib.MAX_WBITS) if chunk[:2] == b"\x1f\x8b" else False
+            yield inflate.decompress(chunk) if inflate else chunk
+        if inflate:
+            yield inflate.flush()
+    finally:
+        resp.close()
+
+
+def iter_entries(url, session=None, _depth=0):
+    """Stream (loc, lastmod) of every <url> in a sitemap or sitemap index.
+
+    Elements are cleared as soon as they are read, so memory stays flat
+    whatever the sitemap size.
+    """
+    parser = XMLPullParser(events=("start", "end"))
+    root = None
+    children = []
+    loc = lastmod = None
+    for chunk in iter_chunks(url, session):
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == "start":
+                if root is None:
+                    root = elem
+                continue
+            name = _local(elem.tag)
+            if name == "loc":
+                loc = (elem.text or "").strip()
+            elif name == "lastmod":
+                lastmod = elem.text
+            elif name == "url":
+                if loc:
+                    yield loc, parse_lastmod(lastmod)
+                loc = lastmod = None
+                root.clear()
+            elif name == "sitemap":
+                if loc:
+                    children.append(urljoin(url, loc))
+                loc = lastmod = None
+                root.clear()
+    parser.close()
+    if _depth < MAX_DEPTH:
+        for child in children:
+            yield from iter_entries(child, session, _depth + 1)
+
+
+def open_table(conn):
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def sync(conn, url=SITEMAP_URL, session=None, force=False):
+    """Store the lastmod of every product URL in the sitemap.
+
+    Runs once per process and URL unless force=True. Returns the number of
+    product URLs seen.
+    """
+    if url in _synced and not force:
+        return None
+    open_table(conn)
+    now = time.time()
+    batch = []
+    seen = 0
+
+    def flush():
+        conn.executemany(
+            "INSERT INTO sitemap (product_id, url, lastmod, seen_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(product_id) DO UPDATE SET url = excluded.url,"
+            " lastmod = excluded.lastmod, seen_at = excluded.seen_at",
+            batch,
+        )
+        batch.clear()
+
+    for loc, lastmod in iter_entries(url, session):
+        path = urlparse(loc).path
+        pid = frontier.product_id_from_url(path)
+        if not pid:
+            continue
+        batch.append((pid, path, lastmod, now))
+        seen += 1
+        if len(batch) >= 1000:
+            flush()
+    flush()
+    _synced.add(url)
+    return seen
+
+
+def pending_products(conn, known_ids):
+    """Return ({pid: url} new, {pid: url} changed) relative to known_ids.
+
+    The first time a known product is seen in the sitemap its lastmod becomes
+    the baseline, so an initial sync does not mark the whole corpus changed.
+    """
+    open_table(conn)
+    new, changed, baseline = {}, {}, []
+    for row in conn.execute("SELECT product_id, url, lastmod, fetched_lastmod FROM sitemap"):
+        pid = row["product_id"]
+        if pid not in known_ids:
+            new[pid] = row["url"]
+        elif row["fetched_lastmod"] is None:
+            baseline.append((row["lastmod"], pid))
+        elif row["lastmod"] is not None and row["lastmod"] > row["fetched_lastmod"]:
+            changed[pid] = row["url"]
+    if baseline:
+        conn.executemany("UPDATE sitemap SET fetched_lastmod = ? WHERE product_id = ?", baseline)
+    return new, changed
+
+
+def mark_fetched(conn, product_ids):
+    """Record that these products were fetched at their current lastmod."""
+    open_table(conn)
+    conn.executemany(
+        "UPDATE sitemap SET fetched_lastmod = lastmod WHERE product_id = ?",
+        [(pid,) for pid in product_ids],
+    )
+
+
+# ---------------------------------------------------------------------------
+# Recording
+# ---------------------------------------------------------------------------
+
+def record(target_dir, url=SITEMAP_URL):
+    """Save the live sitemap and its child sitemaps under target_dir."""
+    import re
+
+    os.makedirs(target_dir, exist_ok=True)
+    queue = [(url, "sitemap.xml")]
+    saved = 0
+    while queue:
+        src, name = queue.pop(0)
+        body = b"".join(iter_chunks(src))
+        for child in re.findall(rb"<sitemap>\s*<loc>\s*([^<]+?)\s*</loc>", body):
+            child_url = urljoin(src, child.decode())
+            child_name = os.path.basename(urlparse(child_url).path).replace(".gz", "") or f"child{saved}.xml"
+            queue.append((child_url, child_name))
+            # Point the index at the recorded copy, served from the same directory
+            body = body.replace(child, child_name.encode())
+        with open(os.path.join(target_dir, name), "wb") as f:
+            f.write(body)
+        saved += 1
+    print(f"[OK] {saved} sitemap files -> {target_dir}")
+
+
+def main(url=SITEMAP_URL):
+    conn = frontier.open_frontier()
+    seen = sync(conn, url, force=True)
+    total, dated = conn.execute("SELECT COUNT(*), COUNT(lastmod) FROM sitemap").fetchone()
+    print(f"[OK] {seen} product URLs in sitemap ({total} stored, {dated} with lastmod)")
+    conn.close()
@@ -1,24 +1,52 @@
 #!/usr/bin/env python3
 """
 Sync downloaded images and updated JSON files from scraper/data/ to site/public/
-Run this after download_images.py completes.
+Run this after download_images.py completes, or keep it running with --watch:
+
+    python scraper/cli.py sync --watch [--debounce 1.0]
+
+Watch mode does one full sync, then follows scraper/data/ and its images
+tree with inotify (Linux) and copies only the files that were written or
+renamed into place. Events are debounced: a batch is synced once no event
+arrived for `debounce` seconds (or MAX_BATCH_SEC after its first event, so
+a long crawl still shows up on the site). Every copy lands in a temporary
+file next to its destination and is renamed over it, so the site never
+serves a half-written JSON file or image. If the inotify event queue
+overflows, events are lost, so the watcher does one full sync instead.
+Without inotify the watcher falls back to polling modification times.
 """
 
-import io
-import json
+import ctypes
+import ctypes.util
 import os
+import select
 import shutil
+import struct
 import sys
+import time
 
-sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding="utf-8", errors="replace")
+sys.stdout.reconfigure(encoding="utf-8", errors="replace")
 
 BASE_DIR = os.path.dirname(__file__)
 DATA_DIR = os.path.join(BASE_DIR, "data")
 SITE_PUBLIC = os.path.join(BASE_DIR, "..", "site", "public")
 
-JSON_FILES = ["marine-fish.json", "corals.json", "marine-invertebrates.json"]
+JSON_FILES = ["marine-fish.json", "corals.json", "marine-invertebrates.json",
+              "categories.json", "facet-index.json", "similar.json"]
 IMG_SRC = os.path.join(DATA_DIR, "images")
 IMG_DST = os.path.join(SITE_PUBLIC, "images")
+PARTIAL = (".part", ".tmp")
+
+DEBOUNCE_SEC = 1.0
+MAX_BATCH_SEC = 10.0
+POLL_SEC = 2.0
+
+
+def copy_atomic(src, dst):
+    """Copy src over dst through a temporary file and a rename."""
+    tmp = f"{dst}.sync.tmp"
+    shutil.copy2(src, tmp)
+    os.replace(tmp, dst)
 
 
 def sync_json():
@@ -26,7 +54,7 @@ def sync_json():
         src = os.path.join(DATA_DIR, fname)
         dst = os.path.join(SITE_PUBLIC, "data", fname)
         if os.path.exists(src):
-            shutil.copy2(src, dst)
+            copy_atomic(src, dst)
             print(f"  [JSON] {fname} -> site/public/data/")
 
 
@@ -45,13 +73,15 @@ def sync_images():
             continue
         os.makedirs(cat_dst, exist_ok=True)
 
-        files = [f for f in os.listdir(cat_src) if os.path.isfile(os.path.join(cat_src, f))]
+        # .part files are downloads still in progress
+        files = [f for f in os.listdir(cat_src)
+                 if os.path.isfile(os.path.join(cat_src, f)) and not f.endswith(PARTIAL)]
         for fname in files:
             src_path = os.path.join(cat_src, fname)
             dst_path = os.path.join(cat_dst, fname)
             # Only copy if dest doesn't exist or is older
             if not os.path.exists(dst_path) or os.path.getmtime(src_path) > os.path.getmtime(dst_path):
-                shutil.copy2(src_path, dst_path)
+                copy_atomic(src_path, dst_path)
                 total += 1
 
         print(f"  [IMG] {category}: {len(files)} images -> site/public/images/{category}/")
@@ -59,6 +89,200 @@ def sync_images():
     print(f"  Total synced: {total} new/updated images")
 
 
+# ---------------------------------------------------------------------------
+# Watch mode
+# ---------------------------------------------------------------------------
+
+def destination(path):
+    """site/public path a changed scraper/data file syncs to, or None."""
+    path = os.path.abspath(path)
+    name = os.path.basename(path)
+    if name.endswith(PARTIAL):
+        return None
+    parent = os.path.dirname(path)
+    if parent == os.path.abspath(DATA_DIR):
+        return os.path.join(SITE_PUBLIC, "data", name) if name in JSON_FILES else None
+    if os.path.dirname(parent) == os.path.abspath(IMG_SRC):
+        return os.path.join(IMG_DST, os.path.basename(parent), name)
+    return None
+
+
+def sync_paths(paths):
+    """Copy the given changed files to site/public; returns how many were copied."""
+    copied = 0
+    for path in sorted(paths):
+        dst = destination(path)
+        if dst is None or not os.path.isfile(path):
+            continue
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        copy_atomic(path, dst)
+        copied += 1
+        print(f"  [SYNC] {os.path.relpath(dst, SITE_PUBLIC)}")
+    return copied
+
+
+class Inotify:
+    """Minimal inotify binding (libc via ctypes): directory watches, changed paths."""
+
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_Q_OVERFLOW = 0x4000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = 0o4000
+    IN_CLOEXEC = 0o2000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+    _EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        if not hasattr(libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+        self._libc = libc
+        self.fd = libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs = {}
+
+    def add(self, path):
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {path}")
+        self.dirs[wd] = path
+
+    def read(self, timeout):
+        """Paths changed within `timeout` seconds; new image category
+        directories are watched too. None when the kernel queue overflowed
+        and events were lost."""
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            buf = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        paths = []
+        offset = 0
+        while offset < len(buf):
+            wd, mask, _, size = self._EVENT.unpack_from(buf, offset)
+            offset += self._EVENT.size
+            name = os.fsdecode(buf[offset:offset + size].rstrip(b"\0"))
+            offset += size
+            if mask & self.IN_Q_OVERFLOW:
+                return None
+            if wd not in self.dirs or not name:
+                continue
+            path = os.path.join(self.dirs[wd], name)
+            if mask & self.IN_ISDIR:
+                # Only a new images category needs a watch (DATA_DIR's own
+                # subdirectories are never synced). Pick up whatever was
+                # written before the watch existed; the directory may be gone.
+                if os.path.abspath(self.dirs[wd]) != os.path.abspath(IMG_SRC):
+                    continue
+                try:
+                    self.add(path)
+                    paths.extend(os.path.join(path, f) for f in os.listdir(path))
+                except FileNotFoundError:
+                    pass
+            elif mask & (self.IN_CLOSE_WRITE | self.IN_MOVED_TO):
+                paths.append(path)
+        return paths
+
+    def close(self):
+        os.close(self.fd)
+
+
+class Poller:
+    """Fallback without inotify: compare modification times every POLL_SEC."""
+
+    def __init__(self):
+        self.dirs = []
+        self._seen = {}
+
+    def add(self, path):
+        # Category dirs are found by the first scan of IMG_SRC already
+        if path in self.dirs:
+            return
+        self.dirs.append(path)
+        self._scan(path)
+
+    def _scan(self, path):
+        changed = []
+        for entry in os.scandir(path):
+            if entry.is_dir():
+                if entry.path not in self.dirs and path == IMG_SRC:
+                    self.dirs.append(entry.path)
+                    changed.extend(self._scan(entry.path))
+                continue
+            mtime = entry.stat().st_mtime
+            if self._seen.get(entry.path) != mtime:
+                self._seen[entry.path] = mtime
+                changed.append(entry.path)
+        return changed
+
+    def read(self, timeout):
+        time.sleep(min(timeout, POLL_SEC))
+        return [p for d in list(self.dirs) if os.path.isdir(d) for p in self._scan(d)]
+
+    def close(self):
+        pass
+
+
+def _watcher():
+    if sys.platform.startswith("linux"):
+        try:
+            watcher = Inotify()
+        except OSError as e:
+            print(f"  [WARN] {e}; polling every {POLL_SEC:.0f}s instead")
+            watcher = Poller()
+    else:
+        watcher = Poller()
+    os.makedirs(IMG_SRC, exist_ok=True)
+    watcher.add(DATA_DIR)
+    watcher.add(IMG_SRC)
+    for category in os.listdir(IMG_SRC):
+        if os.path.isdir(os.path.join(IMG_SRC, category)):
+            watcher.add(os.path.join(IMG_SRC, category))
+    return watcher
+
+
+def watch(debounce=DEBOUNCE_SEC, max_batch=MAX_BATCH_SEC):
+    """Sync changed files until interrupted, in debounced batches."""
+    main()
+    watcher = _watcher()
+    print(f"\n  Watching {DATA_DIR} (debounce {debounce}s), Ctrl-C to stop")
+    pending = set()
+    first = last = 0.0
+    try:
+        while True:
+            timeout = 3600.0
+            if pending:
+                timeout = max(0.0, min(last + debounce, first + max_batch) - time.monotonic())
+            changed = watcher.read(timeout)
+            if changed is None:
+                print("  [WARN] inotify queue overflowed, syncing everything")
+                main()
+                pending.clear()
+                continue
+            changed = [p for p in changed if destination(p)]
+            now = time.monotonic()
+            if changed:
+                if not pending:
+                    first = now
+                pending.update(changed)
+                last = now
+            if pending and (now >= last + debounce or now >= first + max_batch):
+                start = time.perf_counter()
+                copied = sync_paths(pending)
+                print(f"  [BATCH] {copied} files in {time.perf_counter() - start:.2f}s")
+                pending.clear()
+    except KeyboardInterrupt:
+        if pending:
+            sync_paths(pending)
+        print("\n[STOP] Watch mode ended")
+    finally:
+        watcher.close()
+
+
 def main():
     print("=" * 50)
     print("  Syncing data to site/public/")
@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""
+Synthetic corpus generator and pipeline scaling benchmark.
+
+The real corpus (~1,500 species) is too small to show how the pipeline
+behaves at 10x-100x. profile() learns the field distributions of the real
+category files: per category, the frequencies of subcategory, family, care
+level, temperament, diet, reef compatibility and color form, the pools of
+description/feeding sentences (species names replaced by a slot), name
+words, genera and water parameter strings. generate() samples records from
+that profile, as the crawler would produce them before the convert and clean
+steps: sizes in inches and gallons, no units stamp, and a purchase-size
+tail on most descriptions. Names are unique and appear inside the texts, so
+_protect_names sees a realistic name set.
+
+write_corpus() writes the three category files and optionally one product
+page per record (HTML that parse_species_soup reads) and one image per
+record (thumbnails re-encoded from the downloaded photos, so a 100x corpus
+stays around a gigabyte).
+
+bench() generates the corpus at each scale and times every stage, with
+the Python peak memory (tracemalloc) measured in a second pass:
+
+  protect_names       _protect_names over PROTECT_SAMPLE descriptions with
+                      every corpus name known (cost per text grows with names)
+  save_json           record_io.dump_species of the category files
+  convert_units       convert_species on every record
+  clean_descriptions  clean_descriptions.process_file on every file
+  sync_to_site        one-shot sync of the files and images
+  sqlite_import       the server's species table (schema read from
+                      server/db.js), filled in one transaction
+  sqlite_query        the /api/species queries: each category by name, a search
+  parse_pages         parse_species_soup over PARSE_SAMPLE pages (bs4)
+
+The table also shows each stage's growth exponent (1.0 = linear). Results go
+to <out>/scale-bench.json, and a log-log chart of time and memory against
+corpus size to <out>/scale-bench.svg.
+
+    python scraper/cli.py synth generate --scale 10 [--pages] [--images] [--out DIR]
+    python scraper/cli.py synth bench [--scales 1 10 100] [--out DIR]
+"""
+
+import contextlib
+import gc
+import glob
+import html
+import io
+import math
+import os
+import random
+import re
+import shutil
+import sqlite3
+import time
+import tracemalloc
+from collections import Counter
+
+import record_io
+from columnar import parse_range
+
+BASE_DIR = os.path.dirname(__file__)
+DATA_DIR = os.path.join(BASE_DIR, "data")
+OUT_DIR = os.path.join(DATA_DIR, "synthetic")
+DB_SCHEMA_JS = os.path.join(BASE_DIR, "..", "server", "db.js")
+SITE_IMG_DIR = os.path.join(BASE_DIR, "..", "site", "public", "images")
+
+ID_BASE = 900000
+SCALES = (1, 10, 100)
+PROTECT_SAMPLE = 200
+PARSE_SAMPLE = 200
+THUMB = 240
+IMAGE_POOL = 200
+PURCHASE_TAIL = 0.6
+
+CATEGORY_FIELDS = ("subcategory", "family", "care_level", "temperament", "diet",
+                   "reef_compatible", "color_form")
+# The _tr fields of the categorical values, learned as value -> translation
+TR_FIELDS = ("care_level", "temperament", "diet", "reef_compatible")
+PAGE_LABELS = {
+    "care_level": "Care Level", "temperament": "Temperament", "color_form": "Color Form",
+    "diet": "Diet", "reef_compatible": "Reef Compatible", "max_size": "Max. Size",
+    "family": "Family", "min_tank_size": "Minimum Tank Size", "scientific_name": "Scientific Name",
+}
+TAILS = ["Approximate Purchase Size: Small: 1\" to 1-1/2\"; Medium: 1-1/2\" to 2-1/2\"",
+         "Approx. Purchase Size: 2\" to 3\"",
+         "Please note that all sizes are approximate and may vary."]
+
+_WORD = re.compile(r"^[A-Za-z][A-Za-z'-]*$")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+(?=[A-Z])")
+_SYLLABLES = re.compile(r"[^aeiouy]*[aeiouy]+", re.IGNORECASE)
+NAME_SLOT = "{name}"
+
+
+# ---------------------------------------------------------------------------
+# Profile
+# ---------------------------------------------------------------------------
+
+def _sentences(text, name):
+    out = []
+    for s in _SENTENCE.split(text or ""):
+        s = s.strip()
+        if len(s) > 20:
+            out.append(s.replace(name, NAME_SLOT) if name else s)
+    return out
+
+
+def profile(records):
+    """Value distributions and text pools per category of the real corpus."""
+    cats = {}
+    translations = {f: {} for f in TR_FIELDS}
+    syllables = Counter()
+    genera = Counter()
+    for r in records:
+        c = cats.setdefault(r["category"], {
+            "count": 0, "fields": {f: Counter() for f in CATEGORY_FIELDS},
+            "description": [], "description_tr": [], "feeding": [], "feeding_tr": [],
+            "name_heads": Counter(), "name_tails": Counter(), "water": [],
+            "max_size": [], "min_tank_size": [],
+        })
+        c["count"] += 1
+        for f in CATEGORY_FIELDS:
+            c["fields"][f][r.get(f, "")] += 1
+        for f in TR_FIELDS:
+            if r.get(f) and r.get(f"{f}_tr"):
+                translations[f].setdefault(r[f], r[f"{f}_tr"])
+        name = r.get("name", "")
+        for f in ("description", "description_tr", "feeding", "feeding_tr"):
+            c[f].extend(_sentences(r.get(f), name))
+        words = name.split(",")[0].split()
+        if 1 < len(words) <= 4 and all(_WORD.match(w) for w in words):
+            c["name_heads"][" ".join(words[:-1])] += 1
+            c["name_tails"][words[-1]] += 1
+        sci = (r.get("scientific_name") or "").split()
+        if len(sci) >= 2 and sci[0][:1].isupper():
+            genera[sci[0]] += 1
+            syllables.update(m.lower() for m in _SYLLABLES.findall(sci[1]))
+        if any((r.get("water_params") or {}).values()):
+            c["water"].append(r["water_params"])
+        for f in ("max_size", "min_tank_size"):
+            lo, hi = parse_range(r.get(f, ""))
+            if not math.isnan(lo):
+                c[f].append((lo, hi))
+    return {"categories": cats, "translations": translations,
+            "syllables": [s for s, n in syllables.most_common(300) if n > 1] or ["ri", "na", "cus"],
+            "genera": [g for g, _ in genera.most_common()] or ["Acropora"]}
+
+
+def load_profile():
+    records = []
+    for filename in record_io.FILES:
+        path = os.path.join(DATA_DIR, filename)
+        if os.path.exists(path):
+            records.extend(record_io.load_species(path))
+    if not records:
+        raise RuntimeError(f"synthetic needs the real category files in {DATA_DIR}")
+    return profile(records)
+
+
+# ---------------------------------------------------------------------------
+# Records
+# ---------------------------------------------------------------------------
+
+def _pick(rng, counter):
+    values = list(counter)
+    return rng.choices(values, weights=[counter[v] for v in values])[0]
+
+
+def _epithet(rng, syllables):
+    return "".join(rng.choice(syllables) for _ in range(rng.randint(2, 3))) + rng.choice(["i", "ae", "us", "a"])
+
+
+def _imperial_size(lo, hi):
+    lo_in, hi_in = round(lo / 2.54 * 2) / 2, round(hi / 2.54 * 2) / 2
+    fmt = lambda v: f"{v:g}"
+    return f'{fmt(lo_in)}-{fmt(hi_in)}"' if hi_in > lo_in else f'{fmt(lo_in)}"'
+
+
+def _text(rng, pool, name, low, high):
+    if not pool:
+        return ""
+    return " ".join(rng.sample(pool, min(len(pool), rng.randint(low, high)))).replace(NAME_SLOT, name)
+
+
+def generate(prof, n, seed=0):
+    """n synthetic species records in raw (pre-convert, pre-clean) form."""
+    rng = random.Random(seed)
+    cats = prof["categories"]
+    slugs = list(cats)
+    weights = [cats[s]["count"] for s in slugs]
+    names = set()
+    records = []
+    for i in range(n):
+        slug = rng.choices(slugs, weights=weights)[0]
+        c = cats[slug]
+        epithet = _epithet(rng, prof["syllables"])
+        name = ""
+        while not name or name in names:
+            head = _pick(rng, c["name_heads"]) if c["name_heads"] else "Reef"
+            tail = _pick(rng, c["name_tails"]) if c["name_tails"] else "Species"
+            name = f"{epithet.capitalize()} {head} {tail}"
+            epithet = _epithet(rng, prof["syllables"])
+        names.add(name)
+
+        pid = str(ID_BASE + i)
+        record = {
+            "id": pid,
+            "url": f"https://www.liveaquaria.com/product/{pid}/{re.sub(r'[^a-z0-9]+', '-', name.lower()).strip('-')}",
+            "name": name,
+            "name_tr": name,
+            "scientific_name": f"{rng.choice(prof['genera'])} {_epithet(rng, prof['syllables'])}",
+            "category": slug,
+        }
+        for f in CATEGORY_FIELDS:
+            record[f] = _pick(rng, c["fields"][f])
+        for f in TR_FIELDS:
+            record[f"{f}_tr"] = prof["translations"][f].get(record[f], "")
+        record["max_size"] = _imperial_size(*rng.choice(c["max_size"])) if c["max_size"] else ""
+        record["min_tank_size"] = (f"{round(rng.choice(c['min_tank_size'])[0] / 3.785)} gallons"
+                                   if c["min_tank_size"] and rng.random() < 0.9 else "")
+        record["water_params"] = dict(rng.choice(c["water"])) if c["water"] else {
+            "temperature": "", "sg": "", "ph": "", "dkh": ""}
+        description = _text(rng, c["description"], name, 3, 8)
+        if rng.random() < PURCHASE_TAIL:
+            description += " " + rng.choice(TAILS)
+        record["description"] = description
+        record["description_tr"] = _text(rng, c["description_tr"], name, 3, 8)
+        record["feeding"] = _text(rng, c["feeding"], name, 1, 3)
+        record["feeding_tr"] = _text(rng, c["feeding_tr"], name, 1, 3) if record["feeding"] else ""
+        record["image_url"] = f"/images/{slug}/{pid}.jpg"
+        records.append(record)
+    return records
+
+
+def render_page(record):
+    """Product page HTML in the shape parse_species_soup reads."""
+    e = html.escape
+    stats = [(label, record.get(field, "")) for field, label in PAGE_LABELS.items()]
+    wp = record.get("water_params") or {}
+    lo, hi = parse_range(wp.get("temperature", ""))
+    if not math.isnan(lo):
+        conditions = [f"{round(lo * 9 / 5 + 32)}-{round(hi * 9 / 5 + 32)}° F"]
+        conditions += [f"{k} {wp[f]}" for f, k in (("dkh", "dKH"), ("ph", "pH"), ("sg", "sg")) if wp.get(f)]
+        stats.append(("Water Conditions", ", ".join(conditions)))
+    rows = "\n".join(
+        f'<div class="quick_stat_entry"><span class="quick_stat_label">{e(label)}</span>'
+        f'<span class="quick_stat_value">{e(value)}</span></div>'
+        for label, value in stats if value)
+    feeding = f"<h3>Feeding &amp; Nutrition</h3><p>{e(record['feeding'])}</p>" if record.get("feeding") else ""
+    return (
+        f"<!DOCTYPE html><html><head><title>{e(record['name'])} : Saltwater Aquarium Species"
+        f" for Marine Aquariums</title></head><body>\n"
+        f'<span class="breadcrumb">Home &gt; {e(record["category"])} &gt; {e(record["subcategory"])}'
+        f" &gt; {e(record['name'])}</span>\n"
+        f'<img src="/images/categories/product/p-{record["id"]}.jpg" alt="{e(record["name"])}">\n'
+        f"{rows}\n"
+        f'<div class="overview-content"><p>{e(record["description"])}</p></div>\n'
+        f"{feeding}\n</body></html>\n"
+    )
+
+
+def _image_pool(rng):
+    """Encoded JPEG thumbnails of a sample of the downloaded photos."""
+    paths = sorted(glob.glob(os.path.join(SITE_IMG_DIR, "*", "*.jpg")))
+    if not paths:
+        return []
+    sample = rng.sample(paths, min(IMAGE_POOL, len(paths)))
+    try:
+        from PIL import Image
+    except ImportError:
+        print("  [WARN] Pillow not installed: images are copies of the full-size photos")
+        return [open(p, "rb").read() for p in sample]
+    pool = []
+    for path in sample:
+        with Image.open(path) as img:
+            img.draft("RGB", (THUMB, THUMB))
+            thumb = img.convert("RGB")
+            thumb.thumbnail((THUMB, THUMB))
+            buf = io.BytesIO()
+            thumb.save(buf, "JPEG", quality=80)
+            pool.append(buf.getvalue())
+    return pool
+
+
+def write_corpus(records, out_dir, pages=False, images=False, seed=0):
+    """Write category files (plus pages/ and images/) of records to out_dir."""
+    data_dir = os.path.join(out_dir, "data")
+    os.makedirs(data_dir, exist_ok=True)
+    by_category = {}
+    for r in records:
+        by_category.setdefault(r["category"], []).append(r)
+    for slug, items in by_category.items():
+        record_io.dump_species(items, os.path.join(data_dir, f"{slug}.json"))
+    if pages:
+        page_dir = os.path.join(out_dir, "pages")
+        os.makedirs(page_dir, exist_ok=True)
+        for r in records:
+            with open(os.path.join(page_dir, f"{r['id']}.html"), "w", encoding="utf-8") as f:
+                f.write(render_page(r))
+    if images:
+        pool = _image_pool(random.Random(seed))
+        if not pool:
+            print(f"  [SKIP] images: no downloaded photos in {SITE_IMG_DIR}")
+        for i, r in enumerate(records if pool else []):
+            cat_dir = os.path.join(data_dir, "images", r["category"])
+            os.makedirs(cat_dir, exist_ok=True)
+            with open(os.path.join(cat_dir, f"{r['id']}.jpg"), "wb") as f:
+                f.write(pool[i % len(pool)])
+    return by_category
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def species_schema():
+    """CREATE TABLE species statement of the server (server/db.js)."""
+    with open(DB_SCHEMA_JS, encoding="utf-8") as f:
+        m = re.search(r"CREATE TABLE IF NOT EXISTS species \(.*?\n\s*\);", f.read(), re.DOTALL)
+    if not m:
+        raise RuntimeError(f"no species table in {DB_SCHEMA_JS}")
+    return m.group(0)
+
+
+SQLITE_COLUMNS = ["id", "category", "subcategory", "name", "name_tr", "scientific_name", "family",
+                  "care_level", "care_level_tr", "temperament", "temperament_tr", "diet", "diet_tr",
+                  "max_size", "min_tank_size", "reef_compatible", "reef_compatible_tr", "color_form",
+                  "water_params", "description", "description_tr", "feeding", "feeding_tr", "image_url"]
+
+
+def _sqlite_import(db_path, records):
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute(species_schema())
+    marks = ",".join("?" * len(SQLITE_COLUMNS))
+    conn.execute("BEGIN")
+    conn.executemany(
+        f"INSERT INTO species ({','.join(SQLITE_COLUMNS)}) VALUES ({marks})",
+        ([record_io.dumps(r["water_params"]).decode() if c == "water_params" else (r.get(c) or None)
+          for c in SQLITE_COLUMNS] for r in records))
+    conn.execute("COMMIT")
+    conn.close()
+
+
+def _sqlite_query(db_path, slugs):
+    conn = sqlite3.connect(db_path)
+    for slug in slugs:
+        conn.execute("SELECT * FROM species WHERE 1=1 AND category = ? ORDER BY name ASC", (slug,)).fetchall()
+    q = "%clown%"
+    conn.execute("SELECT * FROM species WHERE 1=1 AND (name LIKE ? OR name_tr LIKE ? OR scientific_name"
+                 " LIKE ? OR family LIKE ? OR subcategory LIKE ?) ORDER BY name ASC", (q,) * 5).fetchall()
+    conn.close()
+
+
+def _measure(setup, run):
+    """(seconds, peak Python MB): a timed pass, then a traced pass."""
+    arg = setup()
+    gc.collect()
+    start = time.perf_counter()
+    run(arg)
+    elapsed = time.perf_counter() - start
+    arg = setup()
+    gc.collect()
+    tracemalloc.start()
+    run(arg)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024 / 1024
+
+
+def _stages(records, out_dir):
+    """[(name, setup, run)] for one generated corpus."""
+    import copy
+
+    import clean_descriptions
+    import convert_units
+    import scraper
+    import sync_to_site
+
+    data_dir = os.path.join(out_dir, "data")
+    by_category = {}
+    for r in records:
+        by_category.setdefault(r["category"], []).append(r)
+    rng = random.Random(0)
+    protect_texts = [r["description"] for r in rng.sample(records, min(PROTECT_SAMPLE, len(records)))]
+    names = {r["name"] for r in records}
+
+    def protect_setup():
+        scraper._known_species_names = set(names)
+        scraper._name_patterns.clear()
+
+    def dump_files(_=None):
+        for slug, items in by_category.items():
+            record_io.dump_species(items, os.path.join(data_dir, f"{slug}.json"))
+
+    def sync_setup():
+        site = os.path.join(out_dir, "site")
+        shutil.rmtree(site, ignore_errors=True)
+        os.makedirs(os.path.join(site, "data"))
+        sync_to_site.DATA_DIR = data_dir
+        sync_to_site.SITE_PUBLIC = site
+        sync_to_site.IMG_SRC = os.path.join(data_dir, "images")
+        sync_to_site.IMG_DST = os.path.join(site, "images")
+
+    def sync_run(_):
+        sync_to_site.sync_json()
+        sync_to_site.sync_images()
+
+    def clean_run(_):
+        clean_descriptions.DATA_DIR = data_dir
+        for filename in by_category:
+            clean_descriptions.process_file(f"{filename}.json")
+
+    db_path = os.path.join(out_dir, "species.sqlite")
+
+    def db_setup():
+        if os.path.exists(db_path):
+            os.remove(db_path)
+
+    stages = [
+        ("protect_names", protect_setup, lambda _: [scraper._protect_names(t) for t in protect_texts]),
+        ("save_json", lambda: None, dump_files),
+        ("convert_units", lambda: copy.deepcopy(records),
+         lambda recs: [convert_units.convert_species(r) for r in recs]),
+        ("clean_descriptions", dump_files, clean_run),
+        ("sync_to_site", sync_setup, sync_run),
+        ("sqlite_import", db_setup, lambda _: _sqlite_import(db_path, records)),
+        ("sqlite_query", lambda: None, lambda _: _sqlite_query(db_path, list(by_category))),
+    ]
+    page_dir = os.path.join(out_dir, "pages")
+    try:
+        from bs4 import BeautifulSoup
+    except ImportError:
+        BeautifulSoup = None
+    if BeautifulSoup and os.path.isdir(page_dir):
+        sample = rng.sample(records, min(PARSE_SAMPLE, len(records)))
+        pages = {r["id"]: open(os.path.join(page_dir, f"{r['id']}.html"), encoding="utf-8").read()
+                 for r in sample}
+
+        def parse_run(_):
+            for r in sample:
+                scraper.parse_species_soup(BeautifulSoup(pages[r["id"]], "lxml"), r["url"], r["category"],
+                                           r["subcategory"])
+
+        stages.append(("parse_pages", lambda: None, parse_run))
+    return stages
+
+
+def _growth(points):
+    """Least-squares slope of log(time) against log(size)."""
+    pts = [(math.log(n), math.log(v)) for n, v in points if v > 0]
+    if len(pts) < 2:
+        return None
+    mx = sum(x for x, _ in pts) / len(pts)
+    my = sum(y for _, y in pts) / len(pts)
+    var = sum((x - mx) ** 2 for x, _ in pts)
+    return sum((x - mx) * (y - my) for x, y in pts) / var if var else None
+
+
+def bench(scales=SCALES, out_dir=OUT_DIR, seed=0, images=True, pages=True):
+    """Time and peak memory of each stage at each corpus scale."""
+    import clean_descriptions
+    import scraper
+    import sync_to_site
+
+    prof = load_profile()
+    base = sum(c["count"] for c in prof["categories"].values())
+    saved_names = scraper._known_species_names
+    # The clean and sync stages point these module paths at the run dir
+    saved_paths = [(module, name, getattr(module, name)) for module, name in [
+        (sync_to_site, "DATA_DIR"), (sync_to_site, "SITE_PUBLIC"),
+        (sync_to_site, "IMG_SRC"), (sync_to_site, "IMG_DST"),
+        (clean_descriptions, "DATA_DIR"),
+    ]]
+    results = {"base": base, "scales": []}
+    quiet = io.StringIO()
+    try:
+        for scale in scales:
+            n = max(1, round(base * scale))
+            run_dir = os.path.join(out_dir, f"x{scale:g}")
+            shutil.rmtree(run_dir, ignore_errors=True)
+            start = time.perf_counter()
+            records = generate(prof, n, seed)
+            with contextlib.redirect_stdout(quiet):
+                write_corpus(records, run_dir, pages=pages, images=images, seed=seed)
+            entry = {"scale": scale, "species": n, "generate_s": round(time.perf_counter() - start, 2),
+                     "stages": {}}
+            print(f"  x{scale:g}: {n} species generated in {entry['generate_s']}s")
+            for name, setup, run in _stages(records, run_dir):
+                with contextlib.redirect_stdout(quiet):
+                    elapsed, peak = _measure(setup, run)
+                entry["stages"][name] = {"ms": round(elapsed * 1000, 1), "peak_mb": round(peak, 1)}
+                print(f"    {name:<20} {elapsed * 1000:>10.1f} ms {peak:>9.1f} MB")
+            results["scales"].append(entry)
+            shutil.rmtree(run_dir, ignore_errors=True)
+    finally:
+        scraper._known_species_names = saved_names
+        scraper._name_patterns.clear()
+        for module, name, value in saved_paths:
+            setattr(module, name, value)
+
+    print_table(results)
+    os.makedirs(out_dir, exist_ok=True)
+    record_io.dump(results, os.path.join(out_dir, "scale-bench.json"), pretty=True)
+    with open(os.path.join(out_dir, "scale-bench.svg"), "w", encoding="utf-8") as f:
+        f.write(plot_svg(results))
+    print(f"  [SAVED] {os.path.join(out_dir, 'scale-bench.json')} and scale-bench.svg")
+    return results
+
+
+def print_table(results):
+    scales = results["scales"]
+    stages = list(scales[0]["stages"]) if scales else []
+    head = " ".join(f"{'x' + format(e['scale'], 'g') + ' ms':>12}" for e in scales)
+    print(f"\n  {'stage':<20} {head}  growth   peak MB (largest)")
+    for name in stages:
+        ms = " ".join(f"{e['stages'][name]['ms']:>12.1f}" for e in scales)
+        growth = _growth([(e["species"], e["stages"][name]["ms"]) for e in scales])
+        print(f"  {name:<20} {ms}  {'-' if growth is None else format(growth, '5.2f'):>6}"
+              f"   {scales[-1]['stages'][name]['peak_mb']:.1f}")
+    print("  (growth: log-log slope of time against corpus size; 1.0 = linear)")
+
+
+def plot_svg(results, width=900, height=380):
+    """Two log-log panels, time and peak memory against species count."""
+    scales = results["scales"]
+    stages = list(scales[0]["stages"]) if scales else []
+    colors = ["#1f77b4", "#ff7f0e", "#2ca02c", "#d62728", "#9467bd", "#8c564b", "#e377c2", "#7f7f7f"]
+    pad, panel_w = 60, (width - 3 * 60 - 150) // 2
+    panel_h = height - 2 * pad
+    parts = [f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+             f'font-family="sans-serif" font-size="11"><rect width="100%" height="100%" fill="white"/>']
+    xs = [math.log10(e["species"]) for e in scales]
+    x_lo, x_hi = min(xs), max(xs) if max(xs) > min(xs) else min(xs) + 1
+
+    for p, (key, title) in enumerate((("ms", "time (ms)"), ("peak_mb", "peak memory (MB)"))):
+        ox = pad + p * (panel_w + pad)
+        values = [math.log10(max(e["stages"][s][key], 0.01)) for e in scales for s in stages] or [0]
+        y_lo, y_hi = math.floor(min(values)), math.ceil(max(values))
+        y_hi = y_hi if y_hi > y_lo else y_lo + 1
+        sx = lambda v: ox + (v - x_lo) / (x_hi - x_lo) * panel_w
+        sy = lambda v: pad + panel_h - (v - y_lo) / (y_hi - y_lo) * panel_h
+        parts.append(f'<rect x="{ox}" y="{pad}" width="{panel_w}" height="{panel_h}" fill="none" stroke="#999"/>')
+        parts.append(f'<text x="{ox + panel_w / 2}" y="{pad - 12}" text-anchor="middle" font-size="13">'
+                     f'{title}</text>')
+        for d in range(y_lo, y_hi + 1):
+            parts.append(f'<text x="{ox - 6}" y="{sy(d) + 4:.1f}" text-anchor="end">{10.0 ** d:g}</text>')
+        for e, x in zip(scales, xs):
+            parts.append(f'<text x="{sx(x):.1f}" y="{pad + panel_h + 16}" text-anchor="middle">'
+                         f'{e["species"]}</text>')
+        for i, s in enumerate(stages):
+            pts = " ".join(f"{sx(x):.1f},{sy(math.log10(max(e['stages'][s][key], 0.01))):.1f}"
+                           for e, x in zip(scales, xs))
+            parts.append(f'<polyline points="{pts}" fill="none" stroke="{colors[i % len(colors)]}" '
+                         f'stroke-width="2"/>')
+    parts.append(f'<text x="{pad + panel_w + pad // 2 + panel_w // 2}" y="{height - 12}" '
+                 f'text-anchor="middle">species (log scale)</text>')
+    lx = width - 150
+    for i, s in enumerate(stages):
+        y = pad + i * 18
+        parts.append(f'<rect x="{lx}" y="{y}" width="12" height="3" fill="{colors[i % len(colors)]}"/>'
+                     f'<text x="{lx + 18}" y="{y + 5}">{s}</text>')
+    parts.append("</svg>")
+    return "\n".join(parts)
+
+
+def main(action="bench", scales=SCALES, out_dir=OUT_DIR, seed=0, pages=False, images=False):
+    print("=" * 50)
+    print("  Synthetic corpus" + (" scaling benchmark" if action == "bench" else ""))
+    print("=" * 50)
+    if action == "bench":
+        bench(scales, out_dir, seed)
+        return
+    prof = load_profile()
+    base = sum(c["count"] for c in prof["categories"].values())
+    n = max(1, round(base * scales[0]))
+    start = time.perf_counter()
+    by_category = write_corpus(generate(prof, n, seed), out_dir, pages, images, seed)
+    print(f"  [OK] {n} species ({', '.join(f'{s}: {len(v)}' for s, v in by_category.items())}) "
+          f"in {time.perf_counter() - start:.1f}s -> {out_dir}")
+
+
+if __name__ == "__main__":
+    main()
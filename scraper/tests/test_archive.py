@@ -0,0 +1,34 @@
+import archive
+
+PAGE = ("<html><head><title>Species {i}</title></head><body><div class='product'>"
+        "<h1>Species {i}</h1><p>Reef safe. Feed mysis shrimp twice a day.</p></div></body></html>")
+
+
+def fill(arc, count):
+    for i in range(count):
+        arc.store(f"https://www.liveaquaria.com/product/{i}/species", PAGE.format(i=i))
+
+
+def test_second_writer_adopts_trained_dictionary(tmp_path):
+    first, second = archive.Archive(str(tmp_path)), archive.Archive(str(tmp_path))
+    fill(first, archive.TRAIN_AFTER + 1)
+    assert first.dict_id == 1
+    # `second` still compresses without a dictionary; its next store must not
+    # train (and write) a dictionary of the same id
+    assert second.dict_id == 0
+    second.store("https://www.liveaquaria.com/product/9999/late", PAGE.format(i=9999))
+    assert second.dict_id == 1
+    assert sorted(p.name for p in tmp_path.glob("dict-*")) == [f"dict-1.{archive.CODEC_NAMES[first.codec]}"]
+    assert "Species 3" in first.get("3")[1]
+    first.close()
+    second.close()
+
+
+def test_retrain_writes_a_new_dictionary(tmp_path):
+    arc = archive.Archive(str(tmp_path))
+    fill(arc, archive.TRAIN_AFTER + 1)
+    assert arc.train() == 2
+    arc.store("https://www.liveaquaria.com/product/9999/late", PAGE.format(i=9999))
+    assert "Species 9999" in arc.get("9999")[1]
+    assert "Species 0" in arc.get("0")[1]
+    arc.close()
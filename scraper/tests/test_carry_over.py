@@ -0,0 +1,67 @@
+import copy
+
+import pytest
+
+import download_images
+import frontier
+import scraper
+
+STORED = {
+    "id": "433", "url": "https://www.liveaquaria.com/product/433/flame-angelfish",
+    "name": "Flame Angelfish", "name_tr": "Alev Melek Balığı", "scientific_name": "Centropyge loricula",
+    "family": "Pomacanthidae", "category": "marine-fish", "subcategory": "Angelfish",
+    "care_level": "Moderate", "care_level_tr": "Orta", "temperament": "Semi-aggressive",
+    "temperament_tr": "Yarı agresif", "diet": "Omnivore", "diet_tr": "Omnivor",
+    "reef_compatible": "With Caution", "reef_compatible_tr": "Dikkatli",
+    "max_size": "4\"", "min_tank_size": "70 gallons", "water_params": {"temperature": "72-78 F"},
+    "description": "A striking dwarf angelfish.", "description_tr": "Çarpıcı bir cüce melek balığı.",
+    "feeding": "Feed spirulina.", "feeding_tr": "Spirulina verin.",
+    "image_url": "/images/marine-fish/433.jpg",
+    "image_meta": {"width": 400, "height": 300, "lqip": "data:image/webp;base64,AAAA"},
+}
+REMOTE = "https://www.liveaquaria.com/images/categories/product/p-433-flame.jpg"
+
+
+def fresh_parse():
+    """What parse_species_soup returns for the unchanged page."""
+    species = copy.deepcopy(STORED)
+    for field in ("description_tr", "feeding_tr", "image_meta"):
+        species.pop(field)
+    species["image_url"] = REMOTE
+    species["description"] += " Approximate Purchase Size: Small: 1\" to 1-1/2\""
+    return species
+
+
+@pytest.fixture
+def conn(tmp_path, monkeypatch):
+    monkeypatch.setattr(scraper, "_image_sources", {STORED["image_url"]: REMOTE})
+    conn = frontier.open_frontier(str(tmp_path / "frontier.sqlite"))
+    yield conn
+    conn.close()
+
+
+def test_unchanged_refetch_is_not_a_change(conn):
+    scraper.record_fetch(conn, STORED)
+    species = scraper.carry_over(STORED, fresh_parse())
+    assert not scraper.record_fetch(conn, species)
+    assert species == STORED
+
+
+def test_image_without_source_keeps_local_path_and_records_source(conn, monkeypatch):
+    recorded = {}
+    monkeypatch.setattr(scraper, "_image_sources", {})
+    monkeypatch.setattr(download_images, "record_source", lambda rel, url: recorded.update({rel: url}))
+    species = scraper.carry_over(STORED, fresh_parse())
+    assert species["image_url"] == STORED["image_url"]
+    assert species["image_meta"] == STORED["image_meta"]
+    assert recorded == {STORED["image_url"]: REMOTE}
+
+
+def test_new_photo_is_a_change(conn):
+    scraper.record_fetch(conn, STORED)
+    fresh = fresh_parse()
+    fresh["image_url"] = REMOTE.replace("p-433", "p-433-v2")
+    species = scraper.carry_over(STORED, fresh)
+    assert species["image_url"] == fresh["image_url"] and "image_meta" not in species
+    assert species["description_tr"] == STORED["description_tr"]
+    assert scraper.record_fetch(conn, species)
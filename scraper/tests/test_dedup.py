@@ -0,0 +1,21 @@
+import dedup
+
+TEXT = "This hardy reef fish accepts frozen mysis shrimp and flake food in a peaceful tank."
+
+
+def test_all_pairs_of_a_bucket_are_compared(monkeypatch):
+    # One shared signature puts every record in the same buckets, with an
+    # unrelated record first
+    monkeypatch.setattr(dedup, "minhash", lambda shingle_set: [0] * dedup.NUM_PERM)
+    records = [
+        {"description": "Large predatory eel that needs a tight lid and a very big aquarium."},
+        {"description": TEXT},
+        {"description": TEXT.replace("fish", "fish!")},
+    ]
+    assert dedup.find_clusters(records) == [[1, 2]]
+
+
+def test_identical_descriptions_cluster():
+    records = [{"description": TEXT}, {"description": "Something else entirely, as a soft coral."},
+               {"description": TEXT.upper()}]
+    assert dedup.find_clusters(records) == [[0, 2]]
@@ -0,0 +1,36 @@
+import pytest
+
+import distributed
+import frontier
+
+
+@pytest.fixture(params=["sqlite", "dir"])
+def queue(request, tmp_path):
+    path = tmp_path / ("queue.sqlite" if request.param == "sqlite" else "queue")
+    return distributed.open_queue(f"{request.param}:{path}")
+
+
+UNIT = {"id": "0001-marine-fish-abc", "seq": 1, "category": "marine-fish",
+        "subcategory": "Tangs", "url": "/listing/tangs"}
+
+
+def test_done_unit_is_queued_again_only_on_replan(queue):
+    queue.put(UNIT)
+    queue.ack(queue.claim("w1"))
+    assert queue.stats()[frontier.DONE] == 1
+
+    queue.put(UNIT)
+    assert queue.claim("w1") is None
+
+    queue.put(UNIT, replan=True)
+    unit = queue.claim("w2")
+    assert unit["id"] == UNIT["id"]
+    assert queue.stats().get(frontier.DONE, 0) == 0
+
+
+def test_replan_leaves_claimed_units_alone(queue):
+    queue.put(UNIT)
+    queue.claim("w1")
+    queue.put(UNIT, replan=True)
+    assert queue.claim("w2") is None
+    assert queue.stats()[frontier.IN_FLIGHT] == 1
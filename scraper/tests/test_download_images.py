@@ -0,0 +1,59 @@
+import io
+
+import pytest
+
+import download_images
+import image_probe
+import record_io
+import scraper
+
+Image = pytest.importorskip("PIL.Image")
+
+REMOTE = "https://www.liveaquaria.com/images/p-1-tang.jpg"
+
+
+def jpeg(seed):
+    buf = io.BytesIO()
+    Image.effect_noise((80, 80), 40 + seed).convert("RGB").save(buf, "JPEG")
+    return buf.getvalue()
+
+
+@pytest.fixture
+def images(tmp_path, monkeypatch):
+    monkeypatch.setattr(download_images, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(download_images, "IMG_DIR", str(tmp_path / "images"))
+    monkeypatch.setattr(download_images, "MANIFEST_PATH", str(tmp_path / "images" / "manifest.json"))
+    monkeypatch.setattr(download_images.time, "sleep", lambda seconds: None)
+    (tmp_path / "images" / "corals").mkdir(parents=True)
+    local = tmp_path / "images" / "corals" / "1.jpg"
+    local.write_bytes(jpeg(0))
+    downloads = []
+
+    def download(url, dest_path):
+        downloads.append(url)
+        with open(dest_path, "wb") as f:
+            f.write(jpeg(1))
+        return image_probe.validate_file(dest_path)
+
+    monkeypatch.setattr(download_images, "download_image", download)
+
+    def run(manifest, image_url=REMOTE):
+        record = scraper.empty_record("https://www.liveaquaria.com/product/1/tang", "corals")
+        record.update(id="1", name="Tang", image_url=image_url)
+        record_io.dump_species([record], str(tmp_path / "corals.json"), validate=False)
+        download_images.process_category("corals.json", "corals", manifest)
+        return downloads
+
+    return run
+
+
+def test_existing_file_gets_its_source_url(images):
+    manifest = {}
+    assert images(manifest) == []
+    assert manifest["/images/corals/1.jpg"]["source_url"] == REMOTE
+
+
+def test_new_remote_url_downloads_again(images):
+    manifest = {"/images/corals/1.jpg": {"source_url": REMOTE.replace("tang", "old")}}
+    assert images(manifest) == [REMOTE]
+    assert manifest["/images/corals/1.jpg"]["source_url"] == REMOTE
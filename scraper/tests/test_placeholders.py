@@ -0,0 +1,62 @@
+import random
+
+import pytest
+
+from placeholders import normalize, placeholder, restore, unrestored
+
+NAMES = ["Ocellaris Clownfish", "Acropora", "Zebrasoma flavescens", "Blue Tang",
+         "Mandarin Dragonet", "Euphyllia", "Lysmata amboinensis"]
+WORDS = ("resif akvaryumu için uygundur ve kolay bakılır bir türdür "
+         "beslenme günde iki kez yapılmalıdır").split()
+SUFFIXES = ["", "'in", "'nin", "'ler", "'ı", ",", ".", ")"]
+
+
+def mangle(ph, rng):
+    """One realistic translator mutation of a canonical placeholder."""
+    idx = ph[len("SPNAME"):-1]
+    return rng.choice([
+        ph, ph.lower(), f"SPNAME {idx} X", f"SPNAME{idx} X", f"SP NAME{idx}X",
+        f"Spname{idx}x", f"SPNAME {idx}X", f"SPNAME-{idx}-X",
+        f"SPNAME\u00a0{idx}\u00a0X", f"spname {idx}x",
+    ])
+
+
+def generated_texts(seed, count=200):
+    """(mangled text, placeholder map, expected restoration) triples."""
+    rng = random.Random(seed)
+    for _ in range(count):
+        names = rng.sample(NAMES, rng.randint(1, 4))
+        # Up to 12 placeholders so two-digit indices (SPNAME1X vs SPNAME11X) occur
+        offset = rng.choice([0, 0, 8])
+        mapping = {placeholder(offset + i): n for i, n in enumerate(names)}
+        words, expected = [], []
+        for _ in range(rng.randint(3, 20)):
+            if rng.random() < 0.3:
+                ph = rng.choice(list(mapping))
+                suffix = rng.choice(SUFFIXES)
+                words.append(mangle(ph, rng) + suffix)
+                expected.append(mapping[ph] + suffix)
+            else:
+                word = rng.choice(WORDS)
+                words.append(word)
+                expected.append(word)
+        yield " ".join(words), mapping, " ".join(expected), rng
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_mangled_placeholders_are_restored(seed):
+    for mangled, mapping, expected, _ in generated_texts(seed):
+        restored = restore(mangled, mapping)
+        assert restored == expected, mangled
+        assert unrestored(restored) == []
+
+
+@pytest.mark.parametrize("seed", range(10))
+def test_unknown_placeholders_are_reported(seed):
+    for mangled, mapping, _, rng in generated_texts(seed):
+        stray = f"{mangled} {mangle(placeholder(99), rng)}"
+        assert unrestored(restore(stray, mapping)), stray
+
+
+def test_normalize_canonicalizes():
+    assert normalize("Spname 3 x'in ve SP NAME12X") == "SPNAME3X'in ve SPNAME12X"
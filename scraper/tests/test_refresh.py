@@ -0,0 +1,56 @@
+import pytest
+
+import frontier
+import scraper
+
+CATEGORY = {"slug": "corals", "name": "Corals", "url": "/category/15/corals"}
+SUBCATS = [{"name": "LPS", "url": "/category/15/lps?c=15"}, {"name": "SPS", "url": "/category/15/sps?c=15"}]
+
+
+def tile(pid):
+    return {"id": str(pid), "url": f"/product/{pid}/x", "name": f"Coral {pid}",
+            "image_url": f"https://example.com/{pid}.jpg", "price": ""}
+
+
+@pytest.fixture
+def refresh(tmp_path, monkeypatch):
+    """refresh_category over 100 stored corals with stubbed listings."""
+    stored = [{"id": str(pid), "name": f"Coral {pid}", "image_url": f"/images/corals/{pid}.jpg"}
+              for pid in range(100)]
+    saved = []
+    monkeypatch.setattr(frontier, "FRONTIER_PATH", str(tmp_path / "frontier.sqlite"))
+    monkeypatch.setattr(scraper, "load_category_data", lambda slugs=None: {"corals": list(stored)})
+    monkeypatch.setattr(scraper, "save_json", lambda data, filename: saved.append(list(data)))
+    monkeypatch.setattr(scraper, "rate_limit", lambda *args: None)
+
+    def run(listings, subcats=SUBCATS):
+        monkeypatch.setattr(scraper, "get_subcategories", lambda category: subcats)
+        monkeypatch.setattr(scraper, "walk_listing", lambda url, max_pages=30: listings[url])
+        saved.clear()
+        scraper.refresh_category(CATEGORY, prune=True)
+        return {s["id"] for s in saved[-1]} if saved else {s["id"] for s in stored}
+
+    return run
+
+
+def test_prunes_a_few_unlisted_products(refresh):
+    kept = refresh({SUBCATS[0]["url"]: ([tile(p) for p in range(50)], True),
+                    SUBCATS[1]["url"]: ([tile(p) for p in range(50, 97)], True)})
+    assert kept == {str(p) for p in range(97)}
+
+
+def test_truncated_walk_does_not_prune(refresh):
+    kept = refresh({SUBCATS[0]["url"]: ([tile(p) for p in range(50)], True),
+                    SUBCATS[1]["url"]: ([tile(p) for p in range(50, 97)], False)})
+    assert len(kept) == 100
+
+
+def test_subcategory_fallback_does_not_prune(refresh):
+    kept = refresh({CATEGORY["url"]: ([tile(p) for p in range(98)], True)}, subcats=[])
+    assert len(kept) == 100
+
+
+def test_large_removal_does_not_prune(refresh):
+    kept = refresh({SUBCATS[0]["url"]: ([tile(p) for p in range(50)], True),
+                    SUBCATS[1]["url"]: ([tile(p) for p in range(50, 80)], True)})
+    assert len(kept) == 100
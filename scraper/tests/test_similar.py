@@ -0,0 +1,60 @@
+import copy
+
+import pytest
+
+import similar
+
+pytest.importorskip("numpy")
+
+WORDS = ("reef safe hardy peaceful aggressive coral shrimp mysis flake pellet algae grazer "
+         "predator lagoon lighting flow sand rock cave nocturnal schooling colorful").split()
+
+
+def corpus(n=60):
+    records = []
+    for i in range(n):
+        words = [WORDS[(i * 7 + j * 3) % len(WORDS)] for j in range(12)]
+        records.append({
+            "id": str(1000 + i),
+            "category": ["marine-fish", "corals"][i % 2],
+            "description": " ".join(words) + f". Specimen {i % 5} of group lot{i % 4}.",
+            "family": f"Family{i % 6}",
+            "temperament": ["Peaceful", "Aggressive"][i % 3 == 0],
+            "diet": ["Carnivore", "Omnivore, Herbivore"][i % 2],
+            "water_params": {"temperature": "72-78", "sg": "1.020-1.025", "ph": f"8.{i % 4}-8.4"},
+        })
+    return records
+
+
+def scores(table):
+    return {pid: sorted(score for _, score in row) for pid, row in table.items()}
+
+
+def test_neighbours_stay_in_category_and_exclude_self():
+    records = corpus()
+    model = similar.build_model(records)
+    table, computed = similar.update(records, {}, model, k=4)
+    category = {r["id"]: r["category"] for r in records}
+    assert computed == len(records)
+    for pid, row in table.items():
+        assert len(row) == 4
+        assert all(category[nid] == category[pid] and nid != pid for nid, _ in row)
+        assert [s for _, s in row] == sorted((s for _, s in row), reverse=True)
+
+
+def test_incremental_update_matches_full_run(monkeypatch):
+    # Small chunks so batching and the running top k are exercised
+    monkeypatch.setattr(similar, "BATCH", 7)
+    monkeypatch.setattr(similar, "COLUMNS", 5)
+    records = corpus()
+    model = similar.build_model(records)
+    table, _ = similar.update(records, {}, model, k=4)
+
+    changed = copy.deepcopy(records[2:])
+    changed[0]["description"] = "Aggressive predator of shrimp that needs a cave and strong flow."
+    changed[5]["family"] = "Family0"
+    table, computed = similar.update(changed, table, model, k=4)
+    assert computed < len(changed)
+
+    full, _ = similar.update(changed, {}, dict(model, signatures={}), k=4)
+    assert scores(table) == scores(full)
@@ -0,0 +1,142 @@
+import functools
+import gzip
+import threading
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+import frontier
+import scraper
+import sitemap
+
+URLS = [f"/product/{1000 + i}/species-{i}" for i in range(40)]
+MOVED = {u: "2025-06-01T08:00:00Z" for u in URLS[:2] + URLS[-1:]}
+
+
+def write_site(directory, lastmod):
+    """A sitemap index with a plain and a gzipped child sitemap."""
+    def urlset(urls):
+        items = "".join(f"<url><loc>https://www.liveaquaria.com{u}</loc><lastmod>{lastmod.get(u, '2024-01-01')}"
+                        f"</lastmod><changefreq>weekly</changefreq></url>\n" for u in urls)
+        return ('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+                f"<url><loc>https://www.liveaquaria.com/</loc></url>\n{items}</urlset>\n").encode()
+
+    half = len(URLS) // 2
+    (directory / "products-1.xml").write_bytes(urlset(URLS[:half]))
+    (directory / "products-2.xml.gz").write_bytes(gzip.compress(urlset(URLS[half:])))
+    (directory / "sitemap.xml").write_text(
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n'
+        "<sitemap><loc>products-1.xml</loc></sitemap>\n"
+        "<sitemap><loc>products-2.xml.gz</loc></sitemap>\n"
+        "</sitemapindex>\n", encoding="utf-8")
+
+
+@pytest.fixture
+def serve():
+    servers = []
+
+    def start(directory):
+        class Handler(SimpleHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), functools.partial(Handler, directory=str(directory)))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        return f"http://127.0.0.1:{server.server_address[1]}/sitemap.xml"
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = frontier.open_frontier(str(tmp_path / "frontier.sqlite"))
+    yield conn
+    conn.close()
+
+
+def first_pass(conn, url):
+    """Sync with five products unknown; returns the known ids afterwards."""
+    assert sitemap.sync(conn, url, force=True) == len(URLS)
+    ids = [r[0] for r in conn.execute("SELECT product_id FROM sitemap ORDER BY product_id")]
+    known = set(ids[5:])
+    new, changed = sitemap.pending_products(conn, known)
+    assert len(new) == 5 and not changed
+    sitemap.mark_fetched(conn, new)
+    return known | set(new)
+
+
+def second_pass(conn, url, known):
+    sitemap.sync(conn, url, force=True)
+    new, changed = sitemap.pending_products(conn, known)
+    assert not new
+    assert sorted(changed) == sorted(frontier.product_id_from_url(u) for u in MOVED)
+
+
+def test_discovery_against_synthesized_sitemap(tmp_path, serve, conn):
+    site = tmp_path / "site"
+    site.mkdir()
+    write_site(site, {})
+    url = serve(site)
+    known = first_pass(conn, url)
+
+    write_site(site, MOVED)
+    second_pass(conn, url, known)
+
+
+def test_discovery_after_record_round_trip(tmp_path, serve, conn):
+    site = tmp_path / "site"
+    site.mkdir()
+    write_site(site, {})
+    recording = tmp_path / "recording"
+    sitemap.record(str(recording), serve(site))
+    assert sorted(p.name for p in recording.iterdir()) == ["products-1.xml", "products-2.xml", "sitemap.xml"]
+    replay = serve(recording)
+    known = first_pass(conn, replay)
+
+    # A later recording of the same site, with three lastmods moved forward
+    write_site(site, MOVED)
+    sitemap.record(str(recording), serve(site))
+    second_pass(conn, replay, known)
+
+
+def test_products_past_first_listing_page_placed_by_breadcrumb(monkeypatch, conn, capsys):
+    from bs4 import BeautifulSoup
+
+    units = [{"category": "marine-fish", "subcategory": s, "url": f"/listing/{s}"} for s in ("Angelfish", "Tangs")]
+    new = {"1001": "/product/1001/a", "1002": "/product/1002/b", "1003": "/product/1003/c"}
+    pages = {
+        "/product/1001/a": "Home > Marine Fish > Tangs > Yellow Tang",
+        "/product/1002/b": "Home > Corals > LPS Corals > Hammer Coral",
+    }
+    monkeypatch.setattr(sitemap, "sync", lambda conn: None)
+    monkeypatch.setattr(sitemap, "pending_products", lambda conn, known: (new, {}))
+    monkeypatch.setattr(scraper, "load_category_data", lambda: {})
+    monkeypatch.setattr(scraper, "rate_limit", lambda: None)
+    monkeypatch.setattr(scraper, "get_listing_tiles", lambda url, max_pages=30: [])
+    monkeypatch.setattr(scraper, "fetch", lambda url: BeautifulSoup(
+        f'<span class="breadcrumb">{pages[url]}</span>' if url in pages else "<p></p>", "lxml"))
+
+    scraper._discover_from_sitemap(conn, units, set())
+
+    queued = conn.execute("SELECT product_id, subcategory FROM urls").fetchall()
+    assert [tuple(row) for row in queued] == [("1001", "Tangs")]
+    # The coral is left to its own category, which finds it among the tiles.
+    assert scraper.map_subcategories(conn, [{"category": "corals", "subcategory": "LPS Corals", "url": ""}],
+                                     ["1002"], max_pages=0)["1002"]["subcategory"] == "LPS Corals"
+    assert "1 new products not found in any listing or breadcrumb:\n    /product/1003/c" in capsys.readouterr().out
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("2024-05-01", 1714521600.0),
+    ("2024-05-01T10:00:00Z", 1714557600.0),
+    ("", None),
+    ("not a date", None),
+])
+def test_parse_lastmod(text, expected):
+    assert sitemap.parse_lastmod(text) == expected
@@ -0,0 +1,44 @@
+import os
+import sys
+
+import pytest
+
+import sync_to_site
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+
+
+@pytest.fixture
+def watcher(tmp_path, monkeypatch):
+    img_src = tmp_path / "images"
+    img_src.mkdir()
+    monkeypatch.setattr(sync_to_site, "DATA_DIR", str(tmp_path))
+    monkeypatch.setattr(sync_to_site, "IMG_SRC", str(img_src))
+    watcher = sync_to_site.Inotify()
+    watcher.add(str(tmp_path))
+    watcher.add(str(img_src))
+    yield watcher
+    watcher.close()
+
+
+def test_only_new_image_categories_are_followed(tmp_path, watcher):
+    (tmp_path / "checkpoints").mkdir()
+    (tmp_path / "images" / "corals").mkdir()
+    (tmp_path / "images" / "corals" / "a.jpg").write_bytes(b"x")
+    changed = watcher.read(1.0)
+    assert str(tmp_path / "images" / "corals" / "a.jpg") in changed
+    assert sorted(watcher.dirs.values()) == [str(tmp_path), str(tmp_path / "images"),
+                                             str(tmp_path / "images" / "corals")]
+
+
+def test_directory_removed_before_read_is_ignored(tmp_path, watcher):
+    (tmp_path / "images" / "gone").mkdir()
+    os.rmdir(tmp_path / "images" / "gone")
+    assert watcher.read(1.0) == []
+
+
+def test_queue_overflow_asks_for_full_sync(watcher, monkeypatch):
+    event = watcher._EVENT.pack(-1, watcher.IN_Q_OVERFLOW, 0, 0)
+    monkeypatch.setattr(sync_to_site.select, "select", lambda r, w, x, t: (r, w, x))
+    monkeypatch.setattr(sync_to_site.os, "read", lambda fd, n: event)
+    assert watcher.read(1.0) is None
@@ -0,0 +1,30 @@
+import pytest
+
+import translate_queue
+
+
+@pytest.fixture
+def conn(tmp_path):
+    conn = translate_queue.connect(str(tmp_path / "frontier.sqlite"))
+    yield conn
+    conn.close()
+
+
+def state(conn, source):
+    return conn.execute("SELECT state FROM translations WHERE source = ?", (source,)).fetchone()[0]
+
+
+def test_text_translating_to_itself_is_done(conn):
+    translate_queue.enqueue([("Nemo", "")], conn)
+    row = translate_queue.claim(conn)
+    assert translate_queue.finish(conn, row["source"], "Nemo")
+    assert state(conn, "Nemo") == translate_queue.DONE
+
+
+def test_failures_park_after_max_attempts(conn):
+    translate_queue.enqueue([("Feed daily.", "")], conn)
+    for _ in range(translate_queue.MAX_ATTEMPTS):
+        row = translate_queue.claim(conn)
+        assert not translate_queue.finish(conn, row["source"], None)
+    assert state(conn, "Feed daily.") == translate_queue.FAILED
+    assert translate_queue.claim(conn) is None
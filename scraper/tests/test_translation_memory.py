@@ -0,0 +1,65 @@
+import pytest
+
+import translation_memory
+import translators
+from translation_memory import split_sentences
+
+
+def sentences(text):
+    return [s for s, _ in split_sentences(text)]
+
+
+def test_split_restores_text():
+    text = "First one.  Second one! Third?"
+    assert "".join(s + sep for s, sep in split_sentences(text)) == text
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("This fish is best. It eats most. Keep it in a volcano. Then feed.",
+     ["This fish is best.", "It eats most.", "Keep it in a volcano.", "Then feed."]),
+    ("It was the first. Then the second.", ["It was the first.", "Then the second."]),
+])
+def test_words_ending_like_abbreviations_end_sentences(text, expected):
+    assert sentences(text) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "Feed Acropora sp. Daily with care.",
+    "Keep apart from Chromis spp. And other damsels.",
+    "Offer mysis, brine etc. As treats.",
+    "Tank no. 5 holds them.",
+    "Keep salinity at 1.025 And pH stable.",
+    "The J. Smith variant.",
+    "A coral (Acropora sp.) Grows fast.",
+])
+def test_abbreviations_initials_and_decimals_do_not_split(text):
+    assert sentences(text) == [text]
+
+
+@pytest.fixture
+def memory(tmp_path, monkeypatch):
+    monkeypatch.setattr(translation_memory, "TM_PATH", str(tmp_path / "tm.sqlite"))
+    monkeypatch.setattr(translation_memory, "_conn", None)
+    translators.set_backend("google")
+    yield translation_memory
+    translation_memory._conn.close()
+    translation_memory._conn = None
+
+
+def test_memory_is_keyed_by_backend(memory):
+    memory.store({"Feed daily.": "Her gün besleyin."}, "local-model")
+    assert memory.lookup(["Feed daily."], "google") == {}
+    assert memory.lookup(["Feed daily."], "local-model") == {"Feed daily.": "Her gün besleyin."}
+
+
+def test_translate_protected_only_sends_unseen_sentences(memory):
+    memory.store({"Feed daily.": "Her gün besleyin."}, "google")
+    sent = []
+
+    def translate(text):
+        sent.append(text)
+        return text.upper()
+
+    assert memory.translate_protected("Feed daily. Keep warm.", translate, backend="google") == \
+        "Her gün besleyin. KEEP WARM."
+    assert sent == ["Keep warm."]
@@ -0,0 +1,370 @@
+#!/usr/bin/env python3
+"""
+Background translation stage, fed by a durable queue.
+
+The crawler no longer translates: parse_species_page saves English records
+right away and queues their untranslated description/feeding texts in the
+frontier database (`translations` table, one row per distinct text, so a
+text shared by several species is translated once). A Stage drains the
+queue with its own worker threads and its own request budget, independent
+of the crawl's rate_limit(); `crawl`, `refresh` and `recrawl` run one in
+the background while they fetch, `translate` runs one in the foreground
+until the queue is empty.
+
+Finished translations stay in the queue until apply() writes them into
+every record whose field still has that English text and no translation,
+at the end of a crawl or a `translate` run. Texts that fail MAX_ATTEMPTS
+times are parked as failed and retried by the next `translate`.
+
+With a scratch backend (stand-in) the queue lives in a throwaway copy of
+the database and apply() only counts what it would fill, so pseudo-
+translations never reach the category files or the real queue.
+
+    python scraper/cli.py translate [--workers 4] [--rate 2]
+    python scraper/cli.py translate --status
+"""
+
+import threading
+import time
+
+import frontier
+
+PENDING = "pending"
+IN_FLIGHT = "in_flight"
+DONE = "done"
+FAILED = "failed"
+
+FIELDS = ("description", "feeding")
+MAX_ATTEMPTS = 3
+POLL_SEC = 0.5
+# In-flight rows older than this belong to a stage that died
+STALE_AFTER_SEC = 10 * 60
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS translations (
+    source     TEXT PRIMARY KEY,
+    extra_name TEXT NOT NULL DEFAULT '',
+    state      TEXT NOT NULL DEFAULT 'pending',
+    attempts   INTEGER NOT NULL DEFAULT 0,
+    result     TEXT,
+    updated_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS translations_state ON translations (state);
+"""
+
+_local = threading.local()
+
+
+def connect(path=None):
+    """Open the frontier database with the translations table."""
+    if path is None:
+        import translators
+        path = translators.scratch_path(frontier.FRONTIER_PATH)
+    conn = frontier.open_frontier(path)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _conn():
+    # One connection per thread: crawl workers enqueue concurrently
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = _local.conn = connect()
+    return conn
+
+
+def enqueue(texts, conn=None):
+    """Queue (source, extra_name) pairs; known sources are left as they are."""
+    conn = conn or _conn()
+    now = time.time()
+    cur = conn.executemany(
+        "INSERT OR IGNORE INTO translations (source, extra_name, updated_at) VALUES (?, ?, ?)",
+        [(source, name or "", now) for source, name in texts],
+    )
+    return cur.rowcount
+
+
+def enqueue_species(species, conn=None):
+    """Queue the description/feeding texts of a record that lack a translation."""
+    texts = [(species[f], species.get("name", "")) for f in FIELDS
+             if species.get(f) and not species.get(f"{f}_tr")]
+    return enqueue(texts, conn) if texts else 0
+
+
+def claim(conn):
+    """Move the oldest pending text to in_flight and return its row, or None."""
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT source, extra_name FROM translations WHERE state = ? ORDER BY updated_at LIMIT 1",
+            (PENDING,),
+        ).fetchone()
+        if row is not None:
+            conn.execute(
+                "UPDATE translations SET state = ?, attempts = attempts + 1, updated_at = ?"
+                " WHERE source = ?",
+                (IN_FLIGHT, time.time(), row["source"]),
+            )
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return row
+
+
+def finish(conn, source, result):
+    """Store a translation, or return the text to pending (failed after MAX_ATTEMPTS)."""
+    if result is not None:
+        conn.execute("UPDATE translations SET state = ?, result = ?, updated_at = ? WHERE source = ?",
+                     (DONE, result, time.time(), source))
+        return True
+    conn.execute(
+        "UPDATE translations SET state = CASE WHEN attempts >= ? THEN ? ELSE ? END,"
+        " updated_at = ? WHERE source = ?",
+        (MAX_ATTEMPTS, FAILED, PENDING, time.time(), source),
+    )
+    return False
+
+
+def reclaim(conn, max_age=STALE_AFTER_SEC, failed=False):
+    """Return stale in-flight texts (and failed ones, if asked) to pending."""
+    released = conn.execute(
+        "UPDATE translations SET state = ? WHERE state = ? AND updated_at < ?",
+        (PENDING, IN_FLIGHT, time.time() - max_age),
+    ).rowcount
+    if failed:
+        released += conn.execute(
+            "UPDATE translations SET state = ?, attempts = 0 WHERE state = ?", (PENDING, FAILED)
+        ).rowcount
+    return released
+
+
+def progress(conn=None):
+    """{state: count} of the queue."""
+    conn = conn or _conn()
+    counts = dict.fromkeys((PENDING, IN_FLIGHT, DONE, FAILED), 0)
+    counts.update(conn.execute("SELECT state, COUNT(*) FROM translations GROUP BY state").fetchall())
+    return counts
+
+
+# ---------------------------------------------------------------------------
+# Stage
+# ---------------------------------------------------------------------------
+
+class RateBudget:
+    """Spread requests of all stage workers evenly: at most `rate` per second."""
+
+    def __init__(self, rate):
+        self.interval = 1.0 / rate if rate else None
+        self._next = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        if self.interval is None:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next)
+            self._next = slot + self.interval
+        time.sleep(slot - now)
+
+
+def default_rate(backend):
+    """Requests/sec matching the backend's politeness delay (None: no cap)."""
+    low, high = backend.delay
+    return backend.workers / ((low + high) / 2) if high else None
+
+
+class Stage:
+    """Worker threads translating queued texts through translate_to_turkish.
+
+    With drain=True workers exit when the queue is empty; otherwise they
+    keep polling for texts the crawler queues until stop() is called.
+    """
+
+    def __init__(self, workers=None, rate=None, drain=False):
+        import translators
+
+        backend = translators.get_backend()
+        self.workers = max(1, workers or backend.workers)
+        self.rate = rate if rate is not None else default_rate(backend)
+        self.drain = drain
+        self.budget = RateBudget(self.rate)
+        self.translated = 0
+        self.failed = 0
+        self._stop = threading.Event()
+        self._count_lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        reclaim(_conn())
+        self._threads = [threading.Thread(target=self._run, name=f"translate-{i}", daemon=True)
+                         for i in range(self.workers)]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def _run(self):
+        import scraper
+
+        conn = connect()
+        try:
+            while not self._stop.is_set():
+                row = claim(conn)
+                if row is None:
+                    if self.drain:
+                        break
+                    self._stop.wait(POLL_SEC)
+                    continue
+                self.budget.wait()
+                extra = [row["extra_name"]] if row["extra_name"] else None
+                result = scraper.translate_to_turkish(row["source"], extra_names=extra)
+                ok = finish(conn, row["source"], result)
+                with self._count_lock:
+                    if ok:
+                        self.translated += 1
+                    else:
+                        self.failed += 1
+        finally:
+            conn.close()
+
+    def alive(self):
+        return any(t.is_alive() for t in self._threads)
+
+    def stop(self):
+        """Let workers finish their current text, then return."""
+        self._stop.set()
+        for t in self._threads:
+            t.join()
+
+    def finish(self):
+        """Stop a background stage and write what it translated into the files."""
+        self.stop()
+        filled = apply()
+        print(f"\n  [TRANSLATE] {self.translated} texts translated in the background, "
+              f"{filled} fields filled")
+        print_progress()
+        return filled
+
+    def join(self, total=None, show_progress=True):
+        """Wait for a draining stage, with a progress bar."""
+        from tqdm import tqdm
+
+        with tqdm(total=total, desc="  Translating", unit="text", disable=not show_progress) as bar:
+            while self.alive():
+                time.sleep(POLL_SEC)
+                bar.n = self.translated + self.failed
+                bar.refresh()
+            bar.n = self.translated + self.failed
+            bar.refresh()
+
+
+# ---------------------------------------------------------------------------
+# Category files
+# ---------------------------------------------------------------------------
+
+def enqueue_missing(slugs=None):
+    """Queue every untranslated text of the category files.
+
+    Texts identical (after normalization) to one already translated anywhere
+    in the corpus get that translation directly. Returns (queued, shared).
+    """
+    import dedup
+    import scraper
+
+    all_data = scraper.load_category_data()
+    known = {}
+    for records in all_data.values():
+        for species in records:
+            for field in FIELDS:
+                if species.get(field) and species.get(f"{field}_tr"):
+                    known.setdefault(dedup.normalize(species[field]), species[f"{field}_tr"])
+
+    texts, shared = [], 0
+    for slug, records in all_data.items():
+        if slugs and slug not in slugs:
+            continue
+        filled = 0
+        for species in records:
+            for field in FIELDS:
+                if species.get(field) and not species.get(f"{field}_tr"):
+                    key = dedup.normalize(species[field])
+                    if key in known:
+                        species[f"{field}_tr"] = known[key]
+                        filled += 1
+                    else:
+                        texts.append((species[field], species.get("name", "")))
+        if filled:
+            scraper.save_json(records, f"{slug}.json")
+        shared += filled
+    conn = _conn()
+    reclaim(conn, failed=True)
+    return enqueue(texts, conn), shared
+
+
+def apply(conn=None):
+    """Write finished translations into the category files; returns fields filled.
+
+    Applied rows leave the queue, as do finished rows no record needs any
+    more (the English text changed in the meantime).
+    """
+    import scraper
+    import translators
+
+    conn = conn or _conn()
+    done = dict(conn.execute("SELECT source, result FROM translations WHERE state = ?", (DONE,)))
+    if not done:
+        return 0
+    scratch = translators.get_backend().scratch
+    if scratch:
+        print(f"  [SCRATCH] {translators.get_backend().name} output is not written to the category files")
+    filled = 0
+    for slug, records in scraper.load_category_data().items():
+        changed = 0
+        for species in records:
+            for field in FIELDS:
+                text = species.get(field)
+                if text in done and not species.get(f"{field}_tr"):
+                    species[f"{field}_tr"] = done[text]
+                    changed += 1
+        if changed and not scratch:
+            scraper.save_json(records, f"{slug}.json")
+        filled += changed
+    conn.executemany("DELETE FROM translations WHERE source = ? AND state = ?",
+                     [(source, DONE) for source in done])
+    return filled
+
+
+def print_progress(counts=None):
+    counts = counts or progress()
+    print(f"  Translation queue: {counts[PENDING]} pending, {counts[IN_FLIGHT]} in flight, "
+          f"{counts[DONE]} done (not applied yet), {counts[FAILED]} failed")
+
+
+def run(slugs=None, workers=None, rate=None):
+    """Queue missing translations, drain the queue, apply the results."""
+    queued, shared = enqueue_missing(slugs)
+    counts = progress()
+    print(f"  {queued} texts queued, {shared} fields shared from translated duplicates, "
+          f"{counts[PENDING]} pending")
+    stage = Stage(workers, rate, drain=True)
+    if counts[PENDING]:
+        rate_text = f"{stage.rate:.1f} req/s" if stage.rate else "no rate cap"
+        print(f"  {stage.workers} workers, {rate_text}")
+        start = time.perf_counter()
+        stage.start()
+        try:
+            stage.join(counts[PENDING] + counts[IN_FLIGHT])
+        except KeyboardInterrupt:
+            print("\n[INTERRUPT] Finishing texts in flight...")
+            stage.stop()
+        elapsed = time.perf_counter() - start
+        print(f"  {stage.translated} translated, {stage.failed} failed attempts in {elapsed:.1f}s")
+    filled = apply()
+    print(f"  [OK] {filled} fields filled")
+    print_progress()
+    return filled
+
+
+if __name__ == "__main__":
+    run()
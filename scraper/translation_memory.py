@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Sentence-level translation memory.
+
+LiveAquaria descriptions repeat a lot of sentences (husbandry boilerplate,
+"reef safe" notes, feeding advice). Protected text (species names already
+replaced by SPNAME<n>X placeholders) is split into sentences; sentences seen
+before are served from the memory and only unseen ones are sent to the
+translator, in one batch. The output is reassembled with the original
+separators, so _restore_names sees the same placeholders as before.
+
+Placeholders are renumbered per sentence (first one becomes SPNAME0X, ...)
+before lookup, so "SPNAME3X is reef safe." in one text and "SPNAME0X is reef
+safe." in another share one memory entry.
+
+Entries live in data/translation-memory.sqlite, keyed by (backend, source):
+a sentence translated by one backend is never served to another. Scratch
+backends (translators.Backend.scratch) use a throwaway copy of the file.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+
+import placeholders
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+TM_PATH = os.path.join(DATA_DIR, "translation-memory.sqlite")
+
+# Default max characters per translator request (see translators.Backend)
+BATCH_CHARS = 4000
+
+_ABBREVIATIONS = frozenset(("sp.", "spp.", "e.g.", "i.e.", "approx.", "vs.", "etc.", "st.", "dr.", "no."))
+# Sentence end: . ! or ? (plus closing quotes/brackets), optional whitespace,
+# then an uppercase letter, digit, quote or placeholder
+_BOUNDARY = re.compile(r"(?<=[.!?])([\"')\]]*)(\s*)(?=[A-Z0-9\"'(])")
+_PLACEHOLDER = re.compile(r"SPNAME(\d+)X")
+
+_lock = threading.Lock()
+_conn = None
+_conn_path = None
+stats = {"hits": 0, "misses": 0}
+
+
+def split_sentences(text):
+    """Split text into (sentence, separator) pairs; joining them restores text."""
+    parts = []
+    start = 0
+    for m in _BOUNDARY.finditer(text):
+        end = m.start(2)
+        candidate = text[start:end]
+        last_word = candidate.rsplit(None, 1)[-1].lower().strip("()[]\"'") if candidate.strip() else ""
+        # Abbreviations, single initials ("A.") and decimals ("1.025") do not end a sentence
+        if last_word in _ABBREVIATIONS or re.fullmatch(r"\w\.", last_word):
+            continue
+        if text[end - 1:end] == "." and text[m.end():m.end() + 1].isdigit() and not m.group(2):
+            continue
+        parts.append((candidate, m.group(2)))
+        start = m.end()
+    parts.append((text[start:], ""))
+    return [(s, sep) for s, sep in parts if s or sep]
+
+
+def canonical_placeholders(sentence):
+    """Renumber placeholders from 0 in order of appearance.
+
+    Returns (canonical_sentence, mapping canonical -> original placeholder).
+    """
+    mapping = {}
+    order = {}
+
+    def repl(m):
+        original = m.group(0)
+        if original not in order:
+            order[original] = f"SPNAME{len(order)}X"
+            mapping[order[original]] = original
+        return order[original]
+
+    return _PLACEHOLDER.sub(repl, sentence), mapping
+
+
+def _restore_placeholders(translated, mapping):
+    if not mapping:
+        return translated
+    return _PLACEHOLDER.sub(lambda m: mapping.get(m.group(0), m.group(0)), translated)
+
+
+# ---------------------------------------------------------------------------
+# Store
+# ---------------------------------------------------------------------------
+
+_SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS tm ("
+    " backend TEXT NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL,"
+    " hits INTEGER NOT NULL DEFAULT 0, created_at REAL NOT NULL,"
+    " PRIMARY KEY (backend, source))"
+)
+
+
+def _migrate(conn):
+    # Memories from before the backend key were filled by whichever backend
+    # ran; keep them as google entries, minus stand-in pseudo-translations
+    columns = [row[1] for row in conn.execute("PRAGMA table_info(tm)")]
+    if not columns or "backend" in columns:
+        return
+    conn.execute("BEGIN IMMEDIATE")
+    conn.execute("ALTER TABLE tm RENAME TO tm_unkeyed")
+    conn.execute(_SCHEMA)
+    conn.execute(
+        "INSERT INTO tm (backend, source, target, hits, created_at)"
+        " SELECT 'google', source, target, hits, created_at FROM tm_unkeyed"
+        " WHERE target NOT LIKE '[tr] %'"
+    )
+    conn.execute("DROP TABLE tm_unkeyed")
+    conn.execute("COMMIT")
+
+
+def _db():
+    global _conn, _conn_path
+    import translators
+
+    path = translators.scratch_path(TM_PATH)
+    if _conn is not None and _conn_path != path:
+        _conn.close()
+        _conn = None
+    if _conn is None:
+        _conn = sqlite3.connect(path, timeout=30, check_same_thread=False,
+                                isolation_level=None)
+        _conn_path = path
+        _conn.execute("PRAGMA journal_mode=WAL")
+        _migrate(_conn)
+        _conn.execute(_SCHEMA)
+    return _conn
+
+
+def lookup(sources, backend):
+    """Return {source: target} for the sources `backend` already translated."""
+    if not sources:
+        return {}
+    found = {}
+    with _lock:
+        conn = _db()
+        unique = list(dict.fromkeys(sources))
+        for i in range(0, len(unique), 500):
+            chunk = unique[i:i + 500]
+            marks = ",".join("?" * len(chunk))
+            found.update(conn.execute(
+                f"SELECT source, target FROM tm WHERE backend = ? AND source IN ({marks})",
+                [backend] + chunk,
+            ).fetchall())
+        if found:
+            conn.executemany("UPDATE tm SET hits = hits + 1 WHERE backend = ? AND source = ?",
+                             [(backend, s) for s in found])
+    return found
+
+
+def store(pairs, backend):
+    """Insert {source: target} translations made by `backend`."""
+    if not pairs:
+        return
+    now = time.time()
+    with _lock:
+        _db().executemany(
+            "INSERT OR REPLACE INTO tm (backend, source, target, created_at) VALUES (?, ?, ?, ?)",
+            [(backend, s, t, now) for s, t in pairs.items()],
+        )
+
+
+# ---------------------------------------------------------------------------
+# Translation
+# ---------------------------------------------------------------------------
+
+def _batches(sentences, limit=BATCH_CHARS):
+    batch, size = [], 0
+    for s in sentences:
+        if batch and size + len(s) + 1 > limit:
+            yield batch
+            batch, size = [], 0
+        batch.append(s)
+        size += len(s) + 1
+    if batch:
+        yield batch
+
+
+def translate_batch(sentences, translate_text, batch_chars=BATCH_CHARS):
+    """Translate sentences with one request per batch.
+
+    Sentences are joined with newlines, which the translator keeps; if the
+    line count does not survive, each sentence is sent on its own. Returns a
+    list of translations, or None if any request failed.
+    """
+    results = []
+    for batch in _batches(sentences, batch_chars):
+        translated = translate_text("\n".join(batch))
+        if translated is None:
+            return None
+        lines = translated.split("\n")
+        if len(lines) != len(batch):
+            lines = []
+            for s in batch:
+                t = translate_text(s)
+                if t is None:
+                    return None
+                lines.append(t)
+        results.extend(line.strip() for line in lines)
+    return results
+
+
+def translate_protected(protected_text, translate_text, batch_chars=BATCH_CHARS, backend="google"):
+    """Translate placeholder-protected text sentence by sentence.
+
+    translate_text(str) -> str or None performs one translator request of at
+    most batch_chars characters; memory entries are read and written under
+    the `backend` name.
+    Returns the translated text, or None if the translator failed.
+    """
+    parts = split_sentences(protected_text)
+    canon = [canonical_placeholders(s) if s.strip() else (s, {}) for s, _ in parts]
+    sources = [c for c, _ in canon if c.strip()]
+
+    known = lookup(sources, backend)
+    unseen = [s for s in dict.fromkeys(sources) if s not in known]
+    stats["hits"] += sum(1 for s in sources if s in known)
+    stats["misses"] += len(unseen)
+
+    if unseen:
+        translated = translate_batch(unseen, translate_text, batch_chars)
+        if translated is None:
+            return None
+        new = {s: placeholders.normalize(t) for s, t in zip(unseen, translated)}
+        # Translations that lost or invented a placeholder are used once but
+        # not remembered
+        store({s: t for s, t in new.items()
+               if sorted(_PLACEHOLDER.findall(s)) == sorted(_PLACEHOLDER.findall(t))}, backend)
+        known.update(new)
+
+    out = []
+    for (sentence, sep), (canonical, mapping) in zip(parts, canon):
+        if canonical.strip():
+            out.append(_restore_placeholders(known[canonical], mapping))
+        else:
+            out.append(sentence)
+        out.append(sep)
+    return "".join(out)
+
+
+def main():
+    with _lock:
+        conn = _db()
+        total, hits = conn.execute("SELECT COUNT(*), COALESCE(SUM(hits), 0) FROM tm").fetchone()
+        per_backend = conn.execute("SELECT backend, COUNT(*) FROM tm GROUP BY backend ORDER BY backend").fetchall()
+        top = conn.execute(
+            "SELECT hits, backend, source FROM tm WHERE hits > 0 ORDER BY hits DESC LIMIT 10"
+        ).fetchall()
+    print("=" * 50)
+    print(f"  Translation memory: {total} sentences, {hits} reuses")
+    print("=" * 50)
+    for backend, n in per_backend:
+        print(f"  {backend:<12} {n} sentences")
+    for n, backend, source in top:
+        print(f"  {n:>5}x  [{backend}] {source[:60]}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,280 @@
+#!/usr/bin/env python3
+"""
+Translation backends for translate_to_turkish.
+
+Every backend turns English text into Turkish text (or None on failure) and
+carries its own throughput settings:
+  - workers      how many texts the translation stage (translate_queue)
+                 sends concurrently
+  - batch_chars  max characters per translate() call (the translation
+                 memory packs unseen sentences up to this size)
+  - delay        (min, max) pause in seconds per text and worker; the
+                 stage's default request rate is derived from it
+  - scratch      the output is not a real translation: runs keep their
+                 translation memory and queue in a throwaway directory
+                 (scratch_path) and apply() leaves the category files alone
+
+The translation memory is keyed by backend name, so one backend never serves
+another's output.
+
+Name protection (_protect_names/_restore_names), the in-process cache and
+the sentence translation memory sit above the backend in translate_to_turkish,
+so they work the same whichever backend is active.
+
+Backends:
+  google       the free translate.googleapis.com endpoint (default)
+  stand-in     a local HTTP server speaking the same protocol and returning a
+               deterministic pseudo-translation; for offline runs, tests and
+               benchmarks
+  local-model  a MarianMT en->tr model on CPU (needs transformers + torch;
+               the model is downloaded on first use)
+
+Select with SCRAPER_TRANSLATOR=<name> or set_backend(name, **options).
+
+    python scraper/cli.py bench-translate --backend stand-in
+"""
+
+import os
+import threading
+import time
+
+import transport
+
+TRANSLATE_URL = "https://translate.googleapis.com/translate_a/single"
+DEFAULT_BACKEND = os.environ.get("SCRAPER_TRANSLATOR", "google")
+
+
+class Backend:
+    name = ""
+    workers = 1
+    batch_chars = 4000
+    delay = (0.0, 0.0)
+    scratch = False
+
+    def translate(self, text):
+        """Return the Turkish translation of text, or None on failure."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class GoogleBackend(Backend):
+    """Google Translate free API over a pooled keep-alive session."""
+
+    name = "google"
+    delay = (0.3, 0.7)  # be polite to Google
+
+    def __init__(self, url=TRANSLATE_URL, retries=3, workers=1):
+        self.url = url
+        self.retries = retries
+        self.workers = workers
+
+    def translate(self, text):
+        # Limit text length
+        send_text = text[:self.batch_chars]
+
+        session = transport.get_session(f"translate:{self.name}", {"User-Agent": "Mozilla/5.0"},
+                                        pool_size=self.workers)
+        params = {"client": "gtx", "sl": "en", "tl": "tr", "dt": "t", "q": send_text}
+
+        for attempt in range(self.retries):
+            try:
+                resp = session.get(self.url, params=params, timeout=15)
+                resp.raise_for_status()
+                data = resp.json()
+
+                # Response structure: [[[translated, original, ...], ...], ...]
+                translated_parts = []
+                if data and data[0]:
+                    for segment in data[0]:
+                        if segment and segment[0]:
+                            translated_parts.append(segment[0])
+                return "".join(translated_parts)
+
+            except Exception as e:
+                if attempt < self.retries - 1:
+                    time.sleep(2)
+                else:
+                    print(f"    [Translation error]: {e}")
+                    return None
+        return None
+
+
+def pseudo_translate(text):
+    """Deterministic stand-in 'translation': each line prefixed with [tr]."""
+    return "\n".join(f"[tr] {line}" if line.strip() else line for line in text.split("\n"))
+
+
+def start_stand_in_server(latency_ms=0):
+    """Serve the translate_a/single protocol on a free local port.
+
+    Replies with pseudo_translate() of q after latency_ms, so runs behave like
+    the real endpoint (one request per text, JSON segments) without network.
+    Returns (server, url).
+    """
+    import json
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import parse_qs, urlparse
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def do_GET(self):
+            query = parse_qs(urlparse(self.path).query)
+            text = query.get("q", [""])[0]
+            if latency_ms:
+                time.sleep(latency_ms / 1000)
+            body = json.dumps([[[pseudo_translate(text), text, None, None, 1]], None, "en"],
+                              ensure_ascii=False).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/translate_a/single"
+
+
+class StandInBackend(GoogleBackend):
+    """GoogleBackend pointed at a local stand-in server started on demand."""
+
+    name = "stand-in"
+    delay = (0.0, 0.0)
+    scratch = True
+
+    def __init__(self, latency_ms=0, workers=8):
+        self._server, url = start_stand_in_server(latency_ms)
+        super().__init__(url=url, retries=1, workers=workers)
+
+    def close(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+class LocalModelBackend(Backend):
+    """MarianMT en->tr on CPU via transformers.
+
+    Lines of a request are translated as one generate() batch. The model is
+    not shared between threads, so workers stays 1; torch uses `threads`
+    intra-op threads instead.
+    """
+
+    name = "local-model"
+    batch_chars = 2000
+    MODEL = "Helsinki-NLP/opus-mt-tc-big-en-tr"
+
+    def __init__(self, model=None, threads=None, batch_lines=16):
+        try:
+            import torch
+            from transformers import MarianMTModel, MarianTokenizer
+        except ImportError as e:
+            raise RuntimeError("local-model backend needs `pip install transformers torch sentencepiece`") from e
+        if threads:
+            torch.set_num_threads(threads)
+        self._torch = torch
+        self.model_name = model or os.environ.get("SCRAPER_MT_MODEL", self.MODEL)
+        self.batch_lines = batch_lines
+        self._tokenizer = MarianTokenizer.from_pretrained(self.model_name)
+        self._model = MarianMTModel.from_pretrained(self.model_name).eval()
+        self._lock = threading.Lock()
+
+    def translate(self, text):
+        lines = text.split("\n")
+        todo = [i for i, line in enumerate(lines) if line.strip()]
+        out = list(lines)
+        try:
+            with self._lock, self._torch.inference_mode():
+                for start in range(0, len(todo), self.batch_lines):
+                    idx = todo[start:start + self.batch_lines]
+                    batch = self._tokenizer([lines[i] for i in idx], return_tensors="pt",
+                                            padding=True, truncation=True)
+                    generated = self._model.generate(**batch, max_new_tokens=512)
+                    for i, t in zip(idx, self._tokenizer.batch_decode(generated, skip_special_tokens=True)):
+                        out[i] = t
+        except Exception as e:
+            print(f"    [Translation error]: {e}")
+            return None
+        return "\n".join(out)
+
+
+BACKENDS = {
+    "google": GoogleBackend,
+    "stand-in": StandInBackend,
+    "local-model": LocalModelBackend,
+}
+
+_backend = None
+_backend_lock = threading.Lock()
+_scratch_dir = None
+
+
+def set_backend(name, **options):
+    """Switch the active backend; options go to the backend constructor."""
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown translation backend: {name} ({', '.join(BACKENDS)})")
+    with _backend_lock:
+        if _backend is not None:
+            _backend.close()
+        _backend = BACKENDS[name](**options)
+    return _backend
+
+
+def get_backend():
+    """The active backend, created from SCRAPER_TRANSLATOR on first use."""
+    with _backend_lock:
+        backend = _backend
+    return backend or set_backend(DEFAULT_BACKEND)
+
+
+def scratch_path(path):
+    """path, or the same file name in a per-process temp directory while the
+    active backend is a scratch one."""
+    global _scratch_dir
+    if not get_backend().scratch:
+        return path
+    with _backend_lock:
+        if _scratch_dir is None:
+            import tempfile
+            _scratch_dir = tempfile.mkdtemp(prefix="scraper-scratch-")
+    return os.path.join(_scratch_dir, os.path.basename(path))
+
+
+def bench(backend_name="stand-in", n=200, latency_ms=40, workers=None):
+    """Translate n distinct descriptions through the full translate_to_turkish
+    stack (name protection, memory, backend) and report texts/sec."""
+    import tempfile
+    from concurrent.futures import ThreadPoolExecutor
+
+    import scraper
+    import translation_memory
+
+    options = {}
+    if backend_name == "stand-in":
+        options["latency_ms"] = latency_ms
+    if workers and backend_name != "local-model":
+        options["workers"] = workers
+    backend = set_backend(backend_name, **options)
+    # Throwaway memory so earlier runs do not turn the benchmark into lookups
+    translation_memory.TM_PATH = os.path.join(tempfile.mkdtemp(), "bench-tm.sqlite")
+    scraper.load_known_species_names()
+    texts = [f"Specimen {i} is a hardy fish. It accepts frozen mysis shrimp and "
+             f"flake food. Keep it in a tank with live rock number {i}." for i in range(n)]
+
+    print(f"  Backend: {backend.name}  workers: {backend.workers}  batch: {backend.batch_chars} chars")
+    start = time.perf_counter()
+    with ThreadPoolExecutor(backend.workers) as pool:
+        results = list(pool.map(scraper.translate_to_turkish, texts))
+    elapsed = time.perf_counter() - start
+    failed = sum(1 for out in results if out is None)
+    print(f"  {n} texts in {elapsed:.2f}s -> {n / elapsed:.1f} texts/sec ({failed} failed)")
+    backend.close()
+    return n / elapsed
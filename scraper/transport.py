@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+"""
+Shared HTTP transport for the scraper tools.
+
+One pooled keep-alive session per endpoint ("liveaquaria", "images",
+"translate"), so repeated requests reuse TCP connections, TLS sessions and
+the DNS lookup of the first request instead of paying for them every time.
+Each session has its own pool size (POOL_SIZE unless given to get_session or
+set with set_pool_size), so the crawl and the translation stage size their
+pools for their own worker counts. Setting
+SCRAPER_HTTP2=1 switches page/translate sessions to an httpx HTTP/2 client
+(multiplexed over one connection) when httpx and h2 are installed.
+
+    python scraper/cli.py bench-transport            # local stand-in server
+    python scraper/cli.py bench-transport --url https://translate.googleapis.com/
+"""
+
+import os
+import threading
+import time
+
+POOL_SIZE = 4
+HTTP2 = os.environ.get("SCRAPER_HTTP2") == "1"
+
+_sessions = {}  # name -> (session, pool size)
+_sizes = {}
+_lock = threading.Lock()
+
+
+def _resize(name, size):
+    # Caller holds _lock; only the named session is reset
+    _sizes[name] = max(1, size)
+    cached = _sessions.get(name)
+    if cached is not None and cached[1] != _sizes[name]:
+        cached[0].close()
+        del _sessions[name]
+
+
+def set_pool_size(name, size):
+    """Size the pool of one endpoint's session for `size` concurrent users.
+
+    The session is recreated on next use if it was open with another size;
+    other sessions are left alone.
+    """
+    with _lock:
+        _resize(name, size)
+
+
+def _requests_session(headers, pool_size=POOL_SIZE):
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, pool_block=True)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update(headers or {})
+    return session
+
+
+def _http2_client(headers, pool_size=POOL_SIZE):
+    """httpx HTTP/2 client, or None if httpx[http2] is not installed."""
+    try:
+        import h2  # noqa: F401  (httpx needs it for http2=True)
+        import httpx
+    except ImportError:
+        print("  [transport] httpx/h2 not installed, using HTTP/1.1 keep-alive")
+        return None
+    limits = httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+    return httpx.Client(http2=True, headers=headers or {}, limits=limits,
+                        follow_redirects=True)
+
+
+def get_session(name, headers=None, http2=None, pool_size=None):
+    """Return the shared session for an endpoint, creating it on first use.
+
+    pool_size sets the session's pool size (as set_pool_size); None keeps
+    the size already set for name, or POOL_SIZE. http2=None follows
+    SCRAPER_HTTP2. Both session types support .get(url, params=, timeout=)
+    with .text/.json()/.raise_for_status().
+    """
+    with _lock:
+        if pool_size is not None:
+            _resize(name, pool_size)
+        cached = _sessions.get(name)
+        if cached is not None:
+            return cached[0]
+        size = _sizes.get(name, POOL_SIZE)
+        session = None
+        if HTTP2 if http2 is None else http2:
+            session = _http2_client(headers, size)
+        if session is None:
+            session = _requests_session(headers, size)
+        _sessions[name] = (session, size)
+        return session
+
+
+# ---------------------------------------------------------------------------
+# Benchmark
+# ---------------------------------------------------------------------------
+
+def _start_stand_in_server(handshake_ms=0):
+    """Serve a small fixed body over HTTP/1.1 keep-alive on a free local port.
+
+    handshake_ms delays every new connection to stand in for the DNS, TCP and
+    TLS setup a remote endpoint costs (loopback has almost none).
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    body = b'[[["merhaba","hello",null,null,1]],null,"en"]'
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+        disable_nagle_algorithm = True
+
+        def setup(self):
+            super().setup()
+            if handshake_ms:
+                time.sleep(handshake_ms / 1000)
+
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}/"
+
+
+def _time_requests(n, do_request):
+    start = time.perf_counter()
+    for _ in range(n):
+        do_request()
+    return (time.perf_counter() - start) / n * 1000
+
+
+def bench(url=None, n=50, handshake_ms=30):
+    """Compare per-request latency: new connection each time vs pooled session.
+
+    Without url, a local stand-in server with a simulated handshake_ms
+    connection setup is used.
+    """
+    import urllib.request
+
+    server = None
+    if not url:
+        server, url = _start_stand_in_server(handshake_ms)
+
+    headers = {"User-Agent": "Mozilla/5.0"}
+
+    def urlopen_fresh():
+        # The pre-transport translate path
+        req = urllib.request.Request(url, headers=headers)
+        with urllib.request.urlopen(req, timeout=15) as resp:
+            resp.read()
+
+    def session_fresh():
+        with _requests_session(headers) as session:
+            session.get(url, timeout=15).content
+
+    pooled_session = _requests_session(headers)
+
+    def pooled():
+        pooled_session.get(url, timeout=15).content
+
+    pooled()  # open the connection once, as a long-running crawl would
+    results = [
+        ("urllib.urlopen, new connection", _time_requests(n, urlopen_fresh)),
+        ("requests, new connection", _time_requests(n, session_fresh)),
+        ("requests, pooled keep-alive", _time_requests(n, pooled)),
+    ]
+
+    print(f"  Target: {url} ({n} requests each)")
+    if server and handshake_ms:
+        print(f"  Stand-in connection setup: {handshake_ms} ms")
+    for label, ms in results:
+        print(f"  {label:<32} {ms:8.2f} ms/req")
+    print(f"  {'Overhead removed by pooling':<32} {results[1][1] - results[2][1]:8.2f} ms/req")
+
+    pooled_session.close()
+    if server:
+        server.shutdown()
+    return results
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Parser for LiveAquaria's "Water Conditions" quick stat.
+
+    "72-78° F, dKH 8-12, pH 8.1-8.4, sg 1.023-1.025"
+
+The string is tokenized in one regex scan (numbers, range dashes, degree and
+F/C units, parameter keys, separators, words) and the token list is walked
+once. Each value or range is assigned to a parameter by the key before it
+(pH, dKH, sg, temp) or, without a key, by its unit (°F/°C -> temperature) or
+magnitude (1.000-1.040 -> sg, 60-90 -> °F temperature, 7.0-9.0 with
+decimals -> pH). Single values are accepted as well as ranges.
+
+parse() returns typed Range values with temperatures normalized to °C and
+is memoized on the raw string (the same handful of strings repeat across the
+catalogue). Anything that could not be assigned is kept as unparsed and
+counted in the coverage report, written after each crawl to
+data/water-params-report.json.
+"""
+
+import os
+import re
+import threading
+from collections import Counter, namedtuple
+
+import record_io
+from convert_units import f_to_c, fmt_temp
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "data")
+REPORT_PATH = os.path.join(DATA_DIR, "water-params-report.json")
+
+FIELDS = ("temperature", "sg", "ph", "dkh")
+
+# lo/hi are floats (equal for a single value); temperature is always °C.
+# decimals: digits after the point in the source, for display.
+Range = namedtuple("Range", "lo hi unit decimals")
+Parsed = namedtuple("Parsed", "values unparsed")
+
+# Letter-only boundaries, so "78F" and "pH8.1" split like "78 F" and "pH 8.1"
+_A, _Z = r"(?<![^\W\d_])", r"(?![^\W\d_])"
+_TOKEN = re.compile(rf"""
+    (?P<num>\d+(?:[.,]\d+)?)
+  | (?P<dash>[-–—]|{_A}to{_Z})
+  | (?P<unit>(?:[°º]|{_A}deg(?:rees?)?\.?)\s*[FC]{_Z}|[°º]|{_A}[FC]{_Z})
+  | (?P<key>{_A}(?:specific\s+gravity|s\.g\.|sg|ph|dkh|kh|alk(?:alinity)?|temp(?:erature)?){_Z})
+  | (?P<sep>[,;/|()]|\s+)
+  | (?P<word>[^\W\d_]+|\S)
+""", re.IGNORECASE | re.VERBOSE)
+
+_KEYS = {
+    "sg": "sg", "s.g.": "sg", "specific gravity": "sg",
+    "ph": "ph",
+    "dkh": "dkh", "kh": "dkh", "alk": "dkh", "alkalinity": "dkh",
+    "temp": "temperature", "temperature": "temperature",
+}
+
+_cache = {}
+_lock = threading.Lock()
+_report = {"inputs": 0, "fully_parsed": 0, "fields": Counter(), "unparsed": Counter()}
+
+
+def tokenize(text):
+    """[(kind, text, start, end)] for every token of text, separators dropped."""
+    return [(m.lastgroup, m.group(), m.start(), m.end())
+            for m in _TOKEN.finditer(text) if m.lastgroup != "sep"]
+
+
+def _number(text):
+    value = text.replace(",", ".")
+    decimals = len(value.split(".", 1)[1]) if "." in value else 0
+    return float(value), decimals
+
+
+def _unit(text):
+    letter = text[-1].upper()
+    return "°" + letter if letter in "FC" else "°"
+
+
+def _infer_field(lo, hi, unit, decimals):
+    if unit:
+        return "temperature"
+    if 1.0 <= lo <= hi <= 1.04 and decimals >= 2:
+        return "sg"
+    if 60 <= lo <= hi <= 90:
+        return "temperature"
+    if 7.0 <= lo <= hi <= 9.0 and decimals >= 1:
+        return "ph"
+    return None
+
+
+def _to_celsius(lo, hi, unit):
+    # Bare degree sign: a value above 40 can only be Fahrenheit for reef water
+    if unit == "°F" or (unit in ("", "°") and hi > 40):
+        return f_to_c(lo), f_to_c(hi)
+    return lo, hi
+
+
+def _parse(text):
+    tokens = tokenize(text)
+    values = {}
+    unparsed = []
+    key = None
+    i = 0
+    n = len(tokens)
+    while i < n:
+        kind, tok, start, end = tokens[i]
+        if kind == "key":
+            if key:
+                unparsed.append(key)
+            key = tok
+            i += 1
+            continue
+        if kind != "num":
+            unparsed.append(tok)
+            i += 1
+            continue
+
+        # value [unit] [dash value] [unit]
+        value_start = start
+        lo, decimals = _number(tok)
+        hi = lo
+        unit = ""
+        i += 1
+        if i < n and tokens[i][0] == "unit":
+            unit = _unit(tokens[i][1])
+            i += 1
+        if i + 1 < n and tokens[i][0] == "dash" and tokens[i + 1][0] == "num":
+            hi, hi_decimals = _number(tokens[i + 1][1])
+            decimals = max(decimals, hi_decimals)
+            i += 2
+            if i < n and tokens[i][0] == "unit":
+                unit = _unit(tokens[i][1]) if unit in ("", "°") else unit
+                i += 1
+        if hi < lo:
+            lo, hi = hi, lo
+        value_text = text[value_start:tokens[i - 1][3]]
+
+        field = _KEYS[re.sub(r"\s+", " ", key.lower())] if key else _infer_field(lo, hi, unit, decimals)
+        key = None
+        if field is None or field in values:
+            unparsed.append(value_text)
+            continue
+        if field == "temperature":
+            lo, hi = _to_celsius(lo, hi, unit)
+            values[field] = Range(lo, hi, "°C", 1)
+        else:
+            values[field] = Range(lo, hi, "", decimals)
+    if key:
+        unparsed.append(key)
+    return Parsed(values, tuple(unparsed))
+
+
+def parse(text):
+    """Parse a Water Conditions string (memoized) and count it in the report."""
+    text = (text or "").strip()
+    with _lock:
+        result = _cache.get(text)
+    if result is None:
+        result = _parse(text)
+        with _lock:
+            _cache[text] = result
+    with _lock:
+        _report["inputs"] += 1
+        _report["fields"].update(result.values.keys())
+        if result.unparsed:
+            _report["unparsed"][text] += 1
+        else:
+            _report["fully_parsed"] += 1
+    return result
+
+
+def _fmt(value, decimals):
+    return f"{value:.{decimals}f}"
+
+
+def format_range(field, r):
+    """Display string as stored in species["water_params"]."""
+    if field == "temperature":
+        text = fmt_temp(r.lo) if r.lo == r.hi else f"{fmt_temp(r.lo)}-{fmt_temp(r.hi)}"
+        return text + "°C"
+    if r.lo == r.hi:
+        return _fmt(r.lo, r.decimals)
+    return f"{_fmt(r.lo, r.decimals)}-{_fmt(r.hi, r.decimals)}"
+
+
+def to_water_params(text):
+    """{field: display string} for the parameters found in text."""
+    parsed = parse(text)
+    return {field: format_range(field, r) for field, r in parsed.values.items()}
+
+
+def coverage_report():
+    with _lock:
+        inputs = _report["inputs"]
+        return {
+            "inputs": inputs,
+            "distinct_inputs": len(_cache),
+            "fully_parsed": _report["fully_parsed"],
+            "coverage": round(_report["fully_parsed"] / inputs, 4) if inputs else None,
+            "fields": {f: _report["fields"][f] for f in FIELDS},
+            "unparsed": [{"input": text, "count": count, "leftover": list(_cache[text].unparsed)}
+                         for text, count in _report["unparsed"].most_common()],
+        }
+
+
+def save_report(path=REPORT_PATH):
+    report = coverage_report()
+    if not report["inputs"]:
+        return report
+    record_io.dump(report, path, pretty=True)
+    return report
+
+
+def print_report(report):
+    if not report["inputs"]:
+        print("  Water conditions: no inputs parsed in this run")
+        return
+    print(f"  Water conditions: {report['fully_parsed']}/{report['inputs']} fully parsed "
+          f"({report['coverage']:.1%}, {report['distinct_inputs']} distinct strings)")
+    print("    " + ", ".join(f"{f} {c}" for f, c in report["fields"].items()))
+    for entry in report["unparsed"][:10]:
+        print(f"    [UNPARSED] {entry['count']:>4}x  {entry['input'][:60]!r} -> {entry['leftover']}")
+
+
+def main():
+    if not os.path.exists(REPORT_PATH):
+        print(f"[SKIP] {os.path.basename(REPORT_PATH)} not found (written after a crawl)")
+        return
+    print_report(record_io.load(REPORT_PATH))
+
+
+if __name__ == "__main__":
+    main()
@@ -17,6 +17,10 @@ const db = getDb();
 let total = 0;
 let inserted = 0;
 let skipped = 0;
+let metaUpdated = 0;
+
+// image_meta (scraper/lqip.py) is stored as JSON text
+const imageMeta = (s) => (s.image_meta ? JSON.stringify(s.image_meta) : null);
 
 for (const { file, category } of FILES) {
   const filePath = path.join(DATA_DIR, file);
@@ -30,8 +34,15 @@ for (const { file, category } of FILES) {
 
   for (const s of species) {
     total++;
-    const existing = db.prepare('SELECT id FROM species WHERE id = ?').get(s.id);
+    const existing = db.prepare('SELECT id, image_meta FROM species WHERE id = ?').get(s.id);
     if (existing) {
+      // Existing rows keep their data, but image placeholders are derived
+      // from the image files and follow the scraper
+      const meta = imageMeta(s);
+      if (meta && meta !== existing.image_meta) {
+        db.prepare('UPDATE species SET image_meta = ? WHERE id = ?').run(meta, s.id);
+        metaUpdated++;
+      }
       skipped++;
       continue;
     }
@@ -43,8 +54,8 @@ for (const { file, category } of FILES) {
         diet, diet_tr, max_size, min_tank_size,
         reef_compatible, reef_compatible_tr, color_form,
         water_params, description, description_tr, feeding, feeding_tr,
-        image_url, manually_edited_fields
-      ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, '[]')
+        image_url, image_meta, manually_edited_fields
+      ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, '[]')
     `).run(
       s.id,
       s.category || category,
@@ -69,10 +80,11 @@ for (const { file, category } of FILES) {
       s.description_tr || null,
       s.feeding || null,
       s.feeding_tr || null,
-      s.image_url || null
+      s.image_url || null,
+      imageMeta(s)
     );
     inserted++;
   }
 }
 
-console.log(`\n✓ Import tamamlandı: ${inserted} eklendi, ${skipped} atlandı (toplam: ${total})`);
+console.log(`\n✓ Import tamamlandı: ${inserted} eklendi, ${skipped} atlandı (toplam: ${total}), ${metaUpdated} görsel bilgisi güncellendi`);
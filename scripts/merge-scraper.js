@@ -27,9 +27,12 @@ const UPDATABLE_FIELDS = [
   'diet', 'diet_tr', 'max_size', 'min_tank_size',
   'reef_compatible', 'reef_compatible_tr', 'color_form',
   'water_params', 'description', 'description_tr',
-  'feeding', 'feeding_tr', 'image_url',
+  'feeding', 'feeding_tr', 'image_url', 'image_meta',
 ];
 
+// Fields stored as JSON text
+const JSON_FIELDS = ['water_params', 'image_meta'];
+
 let stats = { inserted: 0, updated: 0, protected: 0, unchanged: 0 };
 
 for (const { file, category } of FILES) {
@@ -54,8 +57,8 @@ for (const { file, category } of FILES) {
           diet, diet_tr, max_size, min_tank_size,
           reef_compatible, reef_compatible_tr, color_form,
           water_params, description, description_tr, feeding, feeding_tr,
-          image_url, manually_edited_fields
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, '[]')
+          image_url, image_meta, manually_edited_fields
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, '[]')
       `).run(
         s.id,
         s.category || category,
@@ -80,7 +83,8 @@ for (const { file, category } of FILES) {
         s.description_tr || null,
         s.feeding || null,
         s.feeding_tr || null,
-        s.image_url || null
+        s.image_url || null,
+        s.image_meta ? JSON.stringify(s.image_meta) : null
       );
       stats.inserted++;
       continue;
@@ -103,7 +107,7 @@ for (const { file, category } of FILES) {
       }
 
       let newVal = s[field] !== undefined ? s[field] : null;
-      if (field === 'water_params' && newVal && typeof newVal !== 'string') {
+      if (JSON_FIELDS.includes(field) && newVal && typeof newVal !== 'string') {
         newVal = JSON.stringify(newVal);
       }
 
@@ -43,6 +43,7 @@ function initSchema() {
       feeding TEXT,
       feeding_tr TEXT,
       image_url TEXT,
+      image_meta TEXT,
       manually_edited_fields TEXT DEFAULT '[]',
       created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
       updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
@@ -54,6 +55,16 @@ function initSchema() {
       password_hash TEXT NOT NULL
     );
   `);
+  migrate();
+}
+
+// Columns added after the first release; CREATE TABLE IF NOT EXISTS leaves
+// existing databases untouched, so add them here
+function migrate() {
+  const columns = db.prepare('PRAGMA table_info(species)').all().map((c) => c.name);
+  if (!columns.includes('image_meta')) {
+    db.exec('ALTER TABLE species ADD COLUMN image_meta TEXT');
+  }
 }
 
 module.exports = { getDb };
@@ -89,14 +89,14 @@ router.post('/', requireAuth, (req, res) => {
       diet, diet_tr, max_size, min_tank_size,
       reef_compatible, reef_compatible_tr, color_form,
       water_params, description, description_tr, feeding, feeding_tr,
-      image_url, manually_edited_fields
+      image_url, image_meta, manually_edited_fields
     ) VALUES (
       ?, ?, ?, ?, ?, ?, ?,
       ?, ?, ?, ?,
       ?, ?, ?, ?,
       ?, ?, ?,
       ?, ?, ?, ?, ?,
-      ?, ?
+      ?, ?, ?
     )
   `).run(
     row.id, row.category, row.subcategory, row.name, row.name_tr,
@@ -109,7 +109,7 @@ router.post('/', requireAuth, (req, res) => {
     row.color_form, row.water_params,
     row.description, row.description_tr,
     row.feeding, row.feeding_tr,
-    row.image_url, row.manually_edited_fields
+    row.image_url, row.image_meta, row.manually_edited_fields
   );
 
   const created = db.prepare('SELECT * FROM species WHERE id = ?').get(species.id);
@@ -142,7 +142,7 @@ router.put('/:id', requireAuth, (req, res) => {
       color_form = ?, water_params = ?,
       description = ?, description_tr = ?,
       feeding = ?, feeding_tr = ?,
-      image_url = ?, manually_edited_fields = ?,
+      image_url = ?, image_meta = ?, manually_edited_fields = ?,
       updated_at = CURRENT_TIMESTAMP
     WHERE id = ?
   `).run(
@@ -156,7 +156,7 @@ router.put('/:id', requireAuth, (req, res) => {
     row.color_form, row.water_params,
     row.description, row.description_tr,
     row.feeding, row.feeding_tr,
-    row.image_url, row.manually_edited_fields,
+    row.image_url, row.image_meta, row.manually_edited_fields,
     req.params.id
   );
 
@@ -181,6 +181,7 @@ function parseRow(row) {
   return {
     ...row,
     water_params: safeParseJSON(row.water_params, {}),
+    image_meta: safeParseJSON(row.image_meta, null),
     manually_edited_fields: safeParseJSON(row.manually_edited_fields, []),
   };
 }
@@ -214,6 +215,9 @@ function prepareRow(obj) {
     feeding: obj.feeding || null,
     feeding_tr: obj.feeding_tr || null,
     image_url: obj.image_url || null,
+    image_meta: obj.image_meta && typeof obj.image_meta !== 'string'
+      ? JSON.stringify(obj.image_meta)
+      : (obj.image_meta || null),
     manually_edited_fields: Array.isArray(obj.manually_edited_fields)
       ? JSON.stringify(obj.manually_edited_fields)
       : (obj.manually_edited_fields || '[]'),
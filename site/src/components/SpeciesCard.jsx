@@ -1,5 +1,6 @@
 import { Link } from 'react-router-dom';
 import { useState } from 'react';
+import { placeholderStyle } from '../utils/blurhash';
 
 export default function SpeciesCard({ species }) {
   const [imgError, setImgError] = useState(false);
@@ -14,12 +15,13 @@ export default function SpeciesCard({ species }) {
 
   return (
     <Link to={`/tur/${species.id}`} className="species-card">
-      <div className="species-card-image">
+      <div className="species-card-image" style={imgError ? undefined : placeholderStyle(species.image_meta)}>
         {species.image_url && !imgError ? (
           <img
             src={species.image_url}
             alt={species.name}
             loading="lazy"
+            decoding="async"
             onError={() => setImgError(true)}
           />
         ) : (
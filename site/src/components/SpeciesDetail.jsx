@@ -2,6 +2,7 @@ import { useState } from 'react';
 import { Link } from 'react-router-dom';
 import { UI_TEXT, getCategoryInfo } from '../utils/translations';
 import SpeciesCard from './SpeciesCard';
+import { placeholderStyle } from '../utils/blurhash';
 
 function formatTextToParagraphs(text) {
   if (!text) return [];
@@ -45,11 +46,12 @@ export default function SpeciesDetail({ species, similarSpecies = [] }) {
       </div>
 
       <div className="species-detail-header">
-        <div className="species-detail-image">
+        <div className="species-detail-image" style={imgError ? undefined : placeholderStyle(species.image_meta)}>
           {species.image_url && !imgError ? (
             <img
               src={species.image_url}
               alt={species.name}
+              decoding="async"
               onError={() => setImgError(true)}
             />
           ) : (
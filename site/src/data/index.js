@@ -110,7 +110,30 @@ export function getUniqueValues(speciesList, field) {
   return Array.from(values).sort();
 }
 
-export function getSimilarSpecies(species, allSpecies, limit = 6) {
+// Neighbour table precomputed by scraper/similar.py: {id: [[id, score], ...]}
+let similarIndex = null;
+
+export async function loadSimilarIndex() {
+  if (similarIndex) return similarIndex;
+  try {
+    const resp = await fetch('/data/similar.json');
+    if (!resp.ok) throw new Error('Failed to load similar.json');
+    similarIndex = await resp.json();
+  } catch (e) {
+    console.error('Error loading similar species index:', e);
+    similarIndex = {};
+  }
+  return similarIndex;
+}
+
+export function getSimilarSpecies(species, allSpecies, limit = 6, index = null) {
+  const neighbours = index && index[species.id];
+  if (neighbours && neighbours.length) {
+    const byId = new Map(allSpecies.map((s) => [String(s.id), s]));
+    const found = neighbours.map(([id]) => byId.get(String(id))).filter(Boolean);
+    if (found.length) return found.slice(0, limit);
+  }
+  // Species added after the last `similar` run: same subcategory or family
   return allSpecies
     .filter((s) => {
       if (s.id === species.id) return false;
@@ -1,7 +1,7 @@
 import { useState, useEffect } from 'react';
 import { useParams } from 'react-router-dom';
 import { UI_TEXT } from '../utils/translations';
-import { getAllSpecies, getSpeciesById, getSimilarSpecies } from '../data';
+import { getAllSpecies, getSpeciesById, getSimilarSpecies, loadSimilarIndex } from '../data';
 import SpeciesDetailComponent from '../components/SpeciesDetail';
 
 export default function SpeciesPage() {
@@ -12,11 +12,11 @@ export default function SpeciesPage() {
 
   useEffect(() => {
     setLoading(true);
-    getAllSpecies().then((allSpecies) => {
+    Promise.all([getAllSpecies(), loadSimilarIndex()]).then(([allSpecies, similarIndex]) => {
       const found = getSpeciesById(allSpecies, id);
       setSpecies(found);
       if (found) {
-        setSimilar(getSimilarSpecies(found, allSpecies));
+        setSimilar(getSimilarSpecies(found, allSpecies, 6, similarIndex));
       }
       setLoading(false);
     });
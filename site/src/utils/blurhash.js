@@ -0,0 +1,100 @@
+// Blurhash decoder for the image_meta placeholders written by scraper/lqip.py
+// (https://github.com/woltapp/blurhash). The decoded preview is drawn on a
+// small canvas and cached as a data URL per hash.
+
+const B83 = '0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~';
+const SIZE = 32;
+const cache = new Map();
+
+function decode83(str) {
+  let value = 0;
+  for (const ch of str) value = value * 83 + B83.indexOf(ch);
+  return value;
+}
+
+function srgbToLinear(value) {
+  const v = value / 255;
+  return v <= 0.04045 ? v / 12.92 : Math.pow((v + 0.055) / 1.055, 2.4);
+}
+
+function linearToSrgb(value) {
+  const v = Math.max(0, Math.min(1, value));
+  return v <= 0.0031308
+    ? Math.trunc(v * 12.92 * 255 + 0.5)
+    : Math.trunc((1.055 * Math.pow(v, 1 / 2.4) - 0.055) * 255 + 0.5);
+}
+
+function signPow(value, exp) {
+  return Math.sign(value) * Math.pow(Math.abs(value), exp);
+}
+
+function decodePixels(hash, width, height) {
+  const sizeFlag = decode83(hash[0]);
+  const nx = (sizeFlag % 9) + 1;
+  const ny = Math.floor(sizeFlag / 9) + 1;
+  const maxValue = (decode83(hash[1]) + 1) / 166;
+  const colors = [];
+  const dc = decode83(hash.slice(2, 6));
+  colors.push([srgbToLinear(dc >> 16), srgbToLinear((dc >> 8) & 255), srgbToLinear(dc & 255)]);
+  for (let i = 1; i < nx * ny; i++) {
+    const ac = decode83(hash.slice(4 + i * 2, 6 + i * 2));
+    colors.push([
+      signPow((Math.floor(ac / 361) - 9) / 9, 2) * maxValue,
+      signPow(((Math.floor(ac / 19) % 19) - 9) / 9, 2) * maxValue,
+      signPow(((ac % 19) - 9) / 9, 2) * maxValue,
+    ]);
+  }
+
+  const pixels = new Uint8ClampedArray(width * height * 4);
+  for (let y = 0; y < height; y++) {
+    for (let x = 0; x < width; x++) {
+      let r = 0, g = 0, b = 0;
+      for (let j = 0; j < ny; j++) {
+        for (let i = 0; i < nx; i++) {
+          const basis = Math.cos((Math.PI * x * i) / width) * Math.cos((Math.PI * y * j) / height);
+          const color = colors[i + j * nx];
+          r += color[0] * basis;
+          g += color[1] * basis;
+          b += color[2] * basis;
+        }
+      }
+      const p = 4 * (x + y * width);
+      pixels[p] = linearToSrgb(r);
+      pixels[p + 1] = linearToSrgb(g);
+      pixels[p + 2] = linearToSrgb(b);
+      pixels[p + 3] = 255;
+    }
+  }
+  return pixels;
+}
+
+// Data URL of the blurred preview, or null if the hash cannot be drawn
+export function blurhashToDataURL(hash) {
+  if (!hash || hash.length < 6 || typeof document === 'undefined') return null;
+  if (cache.has(hash)) return cache.get(hash);
+  let url = null;
+  try {
+    const canvas = document.createElement('canvas');
+    canvas.width = SIZE;
+    canvas.height = SIZE;
+    const ctx = canvas.getContext('2d');
+    ctx.putImageData(new ImageData(decodePixels(hash, SIZE, SIZE), SIZE, SIZE), 0, 0);
+    url = canvas.toDataURL();
+  } catch {
+    url = null;
+  }
+  cache.set(hash, url);
+  return url;
+}
+
+// Inline style for an image container: dominant color at once, blurred
+// preview as soon as it is decoded, real image lazy-loaded on top
+export function placeholderStyle(meta) {
+  if (!meta) return undefined;
+  const preview = blurhashToDataURL(meta.blurhash);
+  return {
+    backgroundColor: meta.color,
+    backgroundImage: preview ? `url(${preview})` : undefined,
+    backgroundSize: 'cover',
+  };
+}